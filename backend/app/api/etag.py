@@ -0,0 +1,65 @@
+"""
+ETag / conditional GET helpers for read endpoints
+
+Polling clients send If-None-Match with the last ETag they saw; when the
+data has not changed we answer 304 with an empty body. Routes that can
+derive a cheap version (a counter or max(updated_at)) check it before
+doing any work; everything else falls back to hashing the payload.
+"""
+import hashlib
+import json
+from typing import Any, Iterable, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a strong ETag from version parts or a payload"""
+    raw = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def not_modified(request: Request, etag: str, cache_control: str = "no-cache") -> Optional[Response]:
+    """Return a 304 response if the client already has this version"""
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    return None
+
+
+def conditional_response(
+    request: Request,
+    payload: Any,
+    etag: Optional[str] = None,
+    exclude: Iterable[str] = (),
+) -> Response:
+    """
+    Serialise a payload with an ETag, or answer 304 if unchanged
+
+    Args:
+        request: Incoming request (for If-None-Match)
+        payload: JSON-compatible response body
+        etag: Precomputed version ETag; hashed from the payload if omitted
+        exclude: Top-level keys left out of the hash (e.g. volatile timestamps)
+    """
+    content = jsonable_encoder(payload)
+    if etag is None:
+        hashed = content
+        if isinstance(content, dict) and exclude:
+            hashed = {k: v for k, v in content.items() if k not in set(exclude)}
+        etag = make_etag(hashed)
+
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    return JSONResponse(content=content, headers={"ETag": etag, "Cache-Control": "no-cache"})
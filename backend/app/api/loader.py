@@ -0,0 +1,125 @@
+"""
+Lazy route loading
+
+Importing the route modules pulls in the SQLAlchemy models, httpx, the
+Plex services and every integration client - most of the time it takes to
+import the app. Only the health routes are registered when app.main is
+imported; the rest are imported in a worker thread once the server has
+started, so /api/health answers while they load. Until they are
+registered, requests for other paths wait for them instead of getting a
+404. A route module that fails to import is recorded in `errors` and the
+warm-up step check() fails, which keeps the server out of readiness.
+"""
+import asyncio
+import importlib
+import time
+from types import ModuleType
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import FastAPI
+from loguru import logger
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# (module in app.api.routes, prefix, tag), in registration order
+ROUTERS: List[Tuple[str, str, str]] = [
+    ("health", "/api", "health"),
+    ("plex", "/api/plex", "plex"),
+    ("library", "/api/library", "library"),
+    ("scanning", "/api/scan", "scanning"),
+    ("dashboard", "/api", "dashboard"),
+    ("integrations", "/api", "integrations"),
+    ("sabnzbd", "/api", "sabnzbd"),
+    ("sonarr", "/api", "sonarr"),
+    ("radarr", "/api", "radarr"),
+    ("prowlarr", "/api", "prowlarr"),
+    ("statistics", "/api", "statistics"),
+    ("crossref", "/api", "crossref"),
+]
+
+# Registered at import - these modules must stay cheap to import
+EAGER = ("health",)
+
+# Paths answered without waiting for the other routers
+ALWAYS_SERVED = ("/api/health",)
+
+
+def _import(names: Iterable[str]) -> Tuple[Dict[str, ModuleType], Dict[str, str]]:
+    """Import route modules, returning (modules, error per module that failed)"""
+    modules, errors = {}, {}
+    for name in names:
+        try:
+            modules[name] = importlib.import_module(f"app.api.routes.{name}")
+        except Exception as e:
+            logger.exception(f"Failed to load {name} routes: {str(e)}")
+            errors[name] = str(e)
+    return modules, errors
+
+
+class RouterLoader:
+    """Registers the route modules on the app, eagerly or in the background"""
+
+    def __init__(self, app: FastAPI):
+        self.app = app
+        self.loaded = False
+        self.errors: Dict[str, str] = {}
+        self._done: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _include(self, modules: Dict[str, ModuleType]):
+        for name, prefix, tag in ROUTERS:
+            if name in modules:
+                self.app.include_router(modules[name].router, prefix=prefix, tags=[tag])
+
+    def include_eager(self):
+        """Register the EAGER routers (at import) - the app can't start without them"""
+        modules, errors = _import(EAGER)
+        if errors:
+            raise RuntimeError(f"Failed to load {', '.join(errors)} routes")
+        self._include(modules)
+
+    def start(self):
+        """Load the remaining routers in the background"""
+        if self._task is None:
+            self._done = asyncio.Event()
+            self._task = asyncio.create_task(self._load())
+
+    async def wait(self):
+        """Wait until all routers are registered (starting the load if needed)"""
+        if not self.loaded:
+            self.start()
+            await self._done.wait()
+
+    async def check(self):
+        """Wait for the routers and fail if any could not be loaded (warm-up step)"""
+        await self.wait()
+        if self.errors:
+            raise RuntimeError("; ".join(f"{name}: {error}" for name, error in self.errors.items()))
+
+    async def _load(self):
+        started = time.perf_counter()
+        names = [name for name, _, _ in ROUTERS if name not in EAGER]
+        try:
+            modules, self.errors = await asyncio.to_thread(_import, names)
+            self._include(modules)
+            self.app.openapi_schema = None  # Rebuilt with the new routes on next request
+            logger.info(f"Loaded {len(modules)} route modules in {time.perf_counter() - started:.2f}s")
+            logger.debug("Registered routes:")
+            for route in self.app.routes:
+                if hasattr(route, 'path'):
+                    logger.debug(f"  {route.methods if hasattr(route, 'methods') else 'N/A'} {route.path}")
+        finally:
+            self.loaded = True
+            self._done.set()
+
+
+class RouterGate:
+    """ASGI middleware holding requests until the routers are registered"""
+
+    def __init__(self, app: ASGIApp, loader: RouterLoader):
+        self.app = app
+        self.loader = loader
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and not self.loader.loaded and not scope["path"].startswith(ALWAYS_SERVED):
+            await self.loader.wait()
+        await self.app(scope, receive, send)
@@ -0,0 +1,48 @@
+"""
+Keyset (cursor) pagination helpers
+
+Pages are anchored on the sort key of the last row a client has seen
+instead of an offset, so fetching page N costs the same as page 1 and
+rows inserted meanwhile never shift or repeat results. Cursors are
+opaque to clients: URL-safe base64 of the last row's (timestamp, id).
+"""
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Cursor pointing just past a row"""
+    raw = f"{timestamp.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Parse a cursor from encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, _, row_id = raw.partition("|")
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor '{cursor}'")
+
+
+def before(timestamp_column, id_column, cursor: Optional[str]):
+    """
+    Filter for rows after a cursor in (timestamp DESC, id DESC) order
+
+    Written as a range on the timestamp plus a tie-break on id, which every
+    planner can serve from a (..., timestamp, id) index.
+    """
+    timestamp, row_id = decode_cursor(cursor)
+    return and_(
+        timestamp_column <= timestamp,
+        or_(timestamp_column < timestamp, id_column < row_id),
+    )
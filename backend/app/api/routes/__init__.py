@@ -1,4 +1,6 @@
-"""API routes module initialization"""
-from . import health, plex, library, scanning, dashboard, integrations, sabnzbd, sonarr, radarr, prowlarr, statistics
+"""API routes module initialization
 
-__all__ = ["health", "plex", "library", "scanning", "dashboard", "integrations", "sabnzbd", "sonarr", "radarr", "prowlarr", "statistics"]
+Route modules are imported on demand - see app.api.loader.
+"""
+
+__all__ = ["health", "plex", "library", "scanning", "dashboard", "integrations", "sabnzbd", "sonarr", "radarr", "prowlarr", "statistics", "crossref"]
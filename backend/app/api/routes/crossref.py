@@ -0,0 +1,62 @@
+"""
+API routes for cross-service catalog comparison
+Reports mismatches between Plex libraries and Radarr / Sonarr catalogs
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Dict, Any
+from loguru import logger
+
+from app.api.routes.radarr import get_radarr_client
+from app.api.routes.sonarr import get_sonarr_client
+from app.services.integrations import RadarrClient, SonarrClient
+from app.services.library.crossref import crossref
+
+router = APIRouter(prefix="/crossref", tags=["crossref"])
+
+
+@router.get("/radarr")
+async def get_radarr_crossref(
+    monitored_only: bool = True,
+    refresh: bool = False,
+    client: RadarrClient = Depends(get_radarr_client)
+) -> Dict[str, Any]:
+    """
+    Compare Radarr movies with Plex movie libraries by tmdb/imdb id
+    
+    Returns movies monitored in Radarr but missing from Plex, and Plex
+    movies Radarr does not manage. The Radarr catalog is cached for a few
+    minutes; pass refresh=true to re-fetch it.
+    """
+    try:
+        movies = await crossref.catalog("radarr", client.url, client.get_movies, refresh=refresh)
+        return await crossref.report("radarr", movies, monitored_only=monitored_only)
+    except Exception as e:
+        logger.error(f"Failed to cross-reference Radarr: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to cross-reference Radarr: {str(e)}"
+        )
+
+
+@router.get("/sonarr")
+async def get_sonarr_crossref(
+    monitored_only: bool = True,
+    refresh: bool = False,
+    client: SonarrClient = Depends(get_sonarr_client)
+) -> Dict[str, Any]:
+    """
+    Compare Sonarr series with Plex TV libraries by tvdb/imdb/tmdb id
+    
+    Returns series monitored in Sonarr but missing from Plex, and Plex
+    shows Sonarr does not manage. The Sonarr catalog is cached for a few
+    minutes; pass refresh=true to re-fetch it.
+    """
+    try:
+        series = await crossref.catalog("sonarr", client.url, client.get_series, refresh=refresh)
+        return await crossref.report("sonarr", series, monitored_only=monitored_only)
+    except Exception as e:
+        logger.error(f"Failed to cross-reference Sonarr: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to cross-reference Sonarr: {str(e)}"
+        )
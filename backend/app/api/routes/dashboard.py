@@ -1,21 +1,25 @@
 """
 Dashboard API routes - Statistics and overview
 """
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from loguru import logger
 
 from app.services.plex.connection import plex_connection
-from app.db.session import get_db
+from app.services.plex.reader import plex_reader
+from app.services.plex.images import image_url
+from app.db.session import get_async_read_db
+from app.api.etag import conditional_response
 from app.models.plex import ScanHistory
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 
 @router.get("/stats")
-async def get_dashboard_stats(db: Session = Depends(get_db)):
+async def get_dashboard_stats(request: Request, db: AsyncSession = Depends(get_async_read_db)):
     """
     Get dashboard statistics overview
     
@@ -25,10 +29,12 @@ async def get_dashboard_stats(db: Session = Depends(get_db)):
         - by_type: Breakdown by library type (movie, show, artist, photo)
         - last_scan: Most recent scan timestamp
         - recent_scans: Count of scans in last 24 hours
+    
+    Supports conditional GET (ETag / If-None-Match).
     """
     try:
-        server = plex_connection.get_connection()
-        libraries = server.library.sections()
+        # Section list and item counts come from one cached, concurrent fetch
+        libraries = await plex_reader.sections()
         
         # Calculate statistics
         total_libraries = len(libraries)
@@ -43,7 +49,7 @@ async def get_dashboard_stats(db: Session = Depends(get_db)):
         
         for library in libraries:
             lib_type = library.type
-            lib_size = library.totalSize or 0
+            lib_size = library.total_size
             total_items += lib_size
             
             if lib_type in by_type:
@@ -52,32 +58,31 @@ async def get_dashboard_stats(db: Session = Depends(get_db)):
                 by_type["other"] += lib_size
         
         # Get last scan from database
-        last_scan_record = (
-            db.query(ScanHistory)
-            .filter(ScanHistory.status == 'completed')
+        last_completed_at = await db.scalar(
+            select(ScanHistory.completed_at)
+            .where(ScanHistory.status == 'completed')
             .order_by(ScanHistory.completed_at.desc())
-            .first()
+            .limit(1)
         )
         
         last_scan = None
-        if last_scan_record and last_scan_record.completed_at:
-            last_scan = last_scan_record.completed_at.isoformat()
+        if last_completed_at:
+            last_scan = last_completed_at.isoformat()
         
         # Count recent scans (last 24 hours)
         twenty_four_hours_ago = datetime.utcnow() - timedelta(hours=24)
-        recent_scans_count = (
-            db.query(ScanHistory)
-            .filter(ScanHistory.started_at >= twenty_four_hours_ago)
-            .count()
+        recent_scans_count = await db.scalar(
+            select(func.count(ScanHistory.id))
+            .where(ScanHistory.started_at >= twenty_four_hours_ago)
         )
         
-        return {
+        return conditional_response(request, {
             "total_libraries": total_libraries,
             "total_items": total_items,
             "by_type": by_type,
             "last_scan": last_scan,
             "recent_scans": recent_scans_count
-        }
+        })
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -94,56 +99,26 @@ async def get_recently_added():
     Returns list of last 10 items added to Plex server
     """
     try:
-        server = plex_connection.get_connection()
-        
-        # Get recently added items across all libraries
-        # Limit to 10 items
         recent_items = []
         
         try:
-            # Get all recently added items from the server - FIXED: maxResults (capital R)
-            all_recent = server.library.recentlyAdded(maxResults=10)
+            # Single container request, capped at 10 items on the Plex side
+            all_recent = await plex_reader.recently_added(limit=10)
             
             for item in all_recent:
-                # Get library name safely
-                library_name = "Unknown"
-                try:
-                    if hasattr(item, 'librarySectionTitle'):
-                        library_name = item.librarySectionTitle
-                    elif hasattr(item, 'section'):
-                        section = item.section()
-                        if section:
-                            library_name = section.title
-                except Exception:
-                    pass
-                
-                # Build item data
-                item_data = {
+                recent_items.append({
                     "title": item.title,
                     "type": item.type,
-                    "library": library_name,
-                    "added_at": item.addedAt.isoformat() if hasattr(item, 'addedAt') and item.addedAt else None,
-                    "year": getattr(item, 'year', None),
-                    "rating": getattr(item, 'rating', None),
-                    "thumb": None
-                }
-                
-                # Get thumbnail URL safely
-                try:
-                    if hasattr(item, 'thumbUrl'):
-                        item_data["thumb"] = item.thumbUrl
-                    elif hasattr(item, 'thumb'):
-                        # Build full URL from relative path
-                        thumb_path = item.thumb
-                        if thumb_path:
-                            server_url = server._baseurl
-                            token = server._token
-                            item_data["thumb"] = f"{server_url}{thumb_path}?X-Plex-Token={token}"
-                except Exception as e:
-                    logger.debug(f"Could not get thumbnail for {item.title}: {e}")
-                
-                recent_items.append(item_data)
+                    "library": item.library_section_title or "Unknown",
+                    "added_at": item.added_at.isoformat() if item.added_at else None,
+                    "year": item.year,
+                    "rating": item.rating,
+                    "rating_key": item.rating_key,
+                    "thumb": image_url(item.rating_key) if item.thumb else None
+                })
         
+        except ValueError:
+            raise
         except Exception as e:
             logger.warning(f"Error getting recently added items: {str(e)}")
             # Return empty list if there's an error
@@ -1,9 +1,11 @@
 """
 Health check routes
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Response, status
 from datetime import datetime
 
+from app.services.warmup import warmup
+
 router = APIRouter()
 
 
@@ -20,6 +22,31 @@ async def health_check():
     }
 
 
+@router.get("/health/live")
+async def liveness():
+    """
+    Liveness probe
+    Answers as soon as the process serves requests - restart it if not
+    """
+    return {
+        "status": "alive",
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+@router.get("/health/ready")
+async def readiness(response: Response):
+    """
+    Readiness probe
+    503 until the startup warm-up (schema, Plex connection, integration
+    connections, caches) has finished - send traffic only once this is 200
+    """
+    state = warmup.status()
+    if not state["ready"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return state
+
+
 @router.get("/")
 async def root():
     """
@@ -3,11 +3,14 @@ API routes for integration management
 Handles CRUD operations for integration configurations
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 from loguru import logger
 
-from app.db.session import get_db
+from app.db.session import get_async_db
+from app.db.writer import db_writer
 from app.models.integrations import IntegrationConfig
 from app.schemas.integrations import (
     IntegrationConfigCreate,
@@ -17,26 +20,14 @@ from app.schemas.integrations import (
     IntegrationTestRequest,
     IntegrationTestResponse,
 )
-from app.services.integrations import (
-    SonarrClient,
-    RadarrClient,
-    SabnzbdClient,
-    ProwlarrClient,
-)
+from app.services.integrations import CLIENTS
 
 router = APIRouter(prefix="/integrations", tags=["integrations"])
 
 
 def get_client(service_type: str, url: str, api_key: str):
     """Get the appropriate client for the service type"""
-    clients = {
-        "sonarr": SonarrClient,
-        "radarr": RadarrClient,
-        "sabnzbd": SabnzbdClient,
-        "prowlarr": ProwlarrClient,
-    }
-    
-    client_class = clients.get(service_type.lower())
+    client_class = CLIENTS.get(service_type.lower())
     if not client_class:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -74,10 +65,7 @@ async def test_integration_connection(request: IntegrationTestRequest):
 
 
 @router.post("", response_model=IntegrationConfigResponse, status_code=status.HTTP_201_CREATED)
-async def create_integration(
-    config: IntegrationConfigCreate,
-    db: Session = Depends(get_db)
-):
+async def create_integration(config: IntegrationConfigCreate):
     """
     Create a new integration configuration
     
@@ -104,9 +92,7 @@ async def create_integration(
     
     # Create the integration
     db_config = IntegrationConfig(**config.model_dump())
-    db.add(db_config)
-    db.commit()
-    db.refresh(db_config)
+    await db_writer.add(db_config)
     
     logger.info(f"Created integration: {config.name} ({config.service_type})")
     
@@ -117,33 +103,33 @@ async def create_integration(
 async def list_integrations(
     service_type: str = None,
     enabled: bool = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List all integration configurations
     
     Optionally filter by service type and/or enabled status.
     """
-    query = db.query(IntegrationConfig)
+    query = select(IntegrationConfig)
     
     if service_type:
-        query = query.filter(IntegrationConfig.service_type == service_type)
+        query = query.where(IntegrationConfig.service_type == service_type)
     
     if enabled is not None:
-        query = query.filter(IntegrationConfig.enabled == enabled)
+        query = query.where(IntegrationConfig.enabled == enabled)
     
-    configs = query.all()
+    configs = (await db.scalars(query)).all()
     return [config.to_dict() for config in configs]
 
 
 @router.get("/{config_id}", response_model=IntegrationConfigFull)
-async def get_integration(config_id: int, db: Session = Depends(get_db)):
+async def get_integration(config_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Get a specific integration configuration
     
     Returns the full configuration including the complete API key.
     """
-    config = db.query(IntegrationConfig).filter(IntegrationConfig.id == config_id).first()
+    config = await db.get(IntegrationConfig, config_id)
     
     if not config:
         raise HTTPException(
@@ -158,7 +144,7 @@ async def get_integration(config_id: int, db: Session = Depends(get_db)):
 async def update_integration(
     config_id: int,
     update: IntegrationConfigUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update an integration configuration
@@ -166,7 +152,7 @@ async def update_integration(
     Only provided fields will be updated. If URL or API key is changed,
     the connection is tested before saving.
     """
-    config = db.query(IntegrationConfig).filter(IntegrationConfig.id == config_id).first()
+    config = await db.get(IntegrationConfig, config_id)
     
     if not config:
         raise HTTPException(
@@ -198,11 +184,19 @@ async def update_integration(
     
     # Update fields
     update_data = update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(config, field, value)
     
-    db.commit()
-    db.refresh(config)
+    def apply_update(writer: Session) -> IntegrationConfig:
+        current = writer.get(IntegrationConfig, config_id)
+        if not current:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Integration with ID {config_id} not found"
+            )
+        for field, value in update_data.items():
+            setattr(current, field, value)
+        return current
+    
+    config = await db_writer.run(apply_update)
     
     logger.info(f"Updated integration: {config.name} (ID: {config.id})")
     
@@ -210,11 +204,11 @@ async def update_integration(
 
 
 @router.delete("/{config_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_integration(config_id: int, db: Session = Depends(get_db)):
+async def delete_integration(config_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Delete an integration configuration
     """
-    config = db.query(IntegrationConfig).filter(IntegrationConfig.id == config_id).first()
+    config = await db.get(IntegrationConfig, config_id)
     
     if not config:
         raise HTTPException(
@@ -224,7 +218,9 @@ async def delete_integration(config_id: int, db: Session = Depends(get_db)):
     
     logger.info(f"Deleting integration: {config.name} (ID: {config.id})")
     
-    db.delete(config)
-    db.commit()
+    def delete_config(writer: Session):
+        writer.execute(delete(IntegrationConfig).where(IntegrationConfig.id == config_id))
+    
+    await db_writer.run(delete_config)
     
     return None
@@ -1,7 +1,9 @@
 """
 Library management routes
 """
-from fastapi import APIRouter, HTTPException
+import time
+from fastapi import APIRouter, HTTPException, Request, Depends
+from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 from loguru import logger
@@ -13,36 +15,65 @@ from app.schemas.plex import (
     PlexMediaItem
 )
 from app.services.plex.connection import plex_connection
+from app.api.etag import conditional_response, make_etag
+from app.services.plex.reader import plex_reader, PlexSectionRecord, PlexItemRecord
+from app.services.plex.aggregates import LibraryAggregate
+from app.services.plex.browser import library_browser
+from app.services.plex.snapshot import library_snapshots
+from app.services.plex.images import image_url, BACKGROUND_SIZE
+from app.services.library.index import library_index
+from app.services.library.inventory import media_inventory
+from app.db.session import get_read_db
 
 router = APIRouter()
 
 
+def _section_to_schema(section: PlexSectionRecord) -> PlexLibrary:
+    """Convert a section record to the PlexLibrary schema"""
+    return PlexLibrary(
+        key=section.key,
+        title=section.title,
+        type=section.type,
+        agent=section.agent,
+        scanner=section.scanner,
+        language=section.language,
+        uuid=section.uuid,
+        updated_at=section.updated_at,
+        created_at=section.created_at,
+        scanned_at=section.scanned_at,
+        content_count=section.total_size
+    )
+
+
+def _item_to_schema(item: PlexItemRecord) -> PlexMediaItem:
+    """Convert an item record to the PlexMediaItem schema"""
+    return PlexMediaItem(
+        key=item.key,
+        title=item.title,
+        type=item.type,
+        year=item.year,
+        rating=item.rating,
+        summary=item.summary,
+        thumb=image_url(item.rating_key) if item.thumb else None,
+        art=image_url(item.rating_key, "art", BACKGROUND_SIZE) if item.art else None,
+        duration=item.duration,
+        added_at=item.added_at,
+        updated_at=item.updated_at,
+    )
+
+
 @router.get("/libraries", response_model=List[PlexLibrary])
-async def get_libraries():
+async def get_libraries(request: Request):
     """
     Get all Plex libraries
     
     Returns a list of all available libraries on the Plex server.
+    Supports conditional GET (ETag / If-None-Match).
     """
     try:
-        server = plex_connection.get_connection()
-        libraries = server.library.sections()
-        result = []
-        for lib in libraries:
-            result.append(PlexLibrary(
-                key=str(lib.key),
-                title=lib.title,
-                type=lib.type,
-                agent=lib.agent if hasattr(lib, 'agent') else None,
-                scanner=lib.scanner if hasattr(lib, 'scanner') else None,
-                language=lib.language if hasattr(lib, 'language') else None,
-                uuid=lib.uuid,
-                updated_at=lib.updatedAt if hasattr(lib, 'updatedAt') else None,
-                created_at=lib.createdAt if hasattr(lib, 'createdAt') else None,
-                scanned_at=lib.scannedAt if hasattr(lib, 'scannedAt') else None,
-                content_count=lib.totalSize if hasattr(lib, 'totalSize') else 0
-            ))
-        return result
+        sections = await plex_reader.sections()
+        result = [_section_to_schema(section) for section in sections]
+        return conditional_response(request, result)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -89,35 +120,191 @@ async def scan_library(request: LibraryScanRequest):
         raise HTTPException(status_code=500, detail=f"Failed to initiate scan: {str(e)}")
 
 
+@router.get("/search")
+def search_libraries(
+    q: str,
+    library_key: Optional[str] = None,
+    limit: int = 20,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Search titles, original titles, years and file paths across all libraries
+    
+    Served from the local library index (FTS5 / tsvector), never from Plex.
+    Every word is matched as a prefix and results are ranked by relevance.
+    Plain def: the query runs on a sync session, in FastAPI's threadpool.
+    """
+    try:
+        limit = max(1, min(limit, 100))
+        started = time.perf_counter()
+        results = library_index.search(db, q, section_key=library_key, limit=limit)
+        return {
+            "query": q,
+            "results": results,
+            "count": len(results),
+            "took_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+    except Exception as e:
+        logger.error(f"Library search failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Library search failed: {str(e)}")
+
+
+@router.get("/changes")
+def get_library_changes(
+    since: Optional[int] = None,
+    library_key: Optional[str] = None,
+    limit: int = 1000,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Change feed: items added, updated and removed since a cursor
+    
+    Call without `since` to get the current cursor, then pass the returned
+    cursor on every poll. Keep polling while has_more is true. If reset is
+    true the cursor is no longer valid and the client should reload full
+    listings before continuing from the returned cursor.
+    """
+    try:
+        limit = max(1, min(limit, 5000))
+        return library_index.changes(db, since=since, section_key=library_key, limit=limit)
+    except Exception as e:
+        logger.error(f"Failed to get library changes: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get library changes: {str(e)}")
+
+
+@router.post("/search/reindex")
+async def reindex_libraries():
+    """
+    Re-sync the local library index with Plex now
+    
+    The index normally follows Plex change notifications and a periodic
+    reconcile; this forces a full pass (e.g. after restoring a database).
+    """
+    try:
+        diffs = await library_index.sync_all()
+        return {
+            "status": "success",
+            "sections": len(diffs),
+            "added": sum(len(d.added) for d in diffs),
+            "updated": sum(len(d.updated) for d in diffs),
+            "removed": sum(len(d.removed) for d in diffs)
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Library reindex failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Library reindex failed: {str(e)}")
+
+
+@router.get("/inventory")
+def get_media_inventory(library_key: Optional[str] = None, db: Session = Depends(get_read_db)):
+    """
+    Per-library media inventory: total size plus how much is 4K, HEVC and remux
+    
+    Served from the local media_parts table, which follows Plex changes.
+    Plain def: the query runs on a sync session, in FastAPI's threadpool.
+    """
+    try:
+        return {"libraries": media_inventory.summary(db, section_key=library_key)}
+    except Exception as e:
+        logger.error(f"Failed to get media inventory: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get media inventory: {str(e)}")
+
+
+@router.get("/inventory/breakdown")
+def get_media_inventory_breakdown(
+    library_key: Optional[str] = None,
+    group_by: str = "video_resolution,video_codec",
+    db: Session = Depends(get_read_db)
+):
+    """
+    Codec / resolution / container breakdown of media files
+    
+    group_by takes one or more of video_resolution, video_codec, container,
+    audio_codec, video_profile (comma separated).
+    """
+    try:
+        fields = [f.strip() for f in group_by.split(',') if f.strip()]
+        return {
+            "library_key": library_key,
+            "breakdown": {field: media_inventory.breakdown(db, field, section_key=library_key) for field in fields}
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to get media breakdown: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get media breakdown: {str(e)}")
+
+
+@router.get("/inventory/largest")
+def get_largest_files(library_key: Optional[str] = None, limit: int = 20, db: Session = Depends(get_read_db)):
+    """
+    Get the largest media files, optionally within one library
+    """
+    try:
+        limit = max(1, min(limit, 500))
+        parts = media_inventory.largest(db, section_key=library_key, limit=limit)
+        return {
+            "files": [
+                {
+                    "rating_key": part.rating_key,
+                    "library_key": part.section_key,
+                    "title": part.title,
+                    "type": part.item_type,
+                    "file": part.file,
+                    "size_bytes": part.size,
+                    "container": part.container,
+                    "video_codec": part.video_codec,
+                    "video_resolution": part.video_resolution,
+                    "bitrate_kbps": part.bitrate,
+                    "remux": part.remux
+                }
+                for part in parts
+            ],
+            "count": len(parts)
+        }
+    except Exception as e:
+        logger.error(f"Failed to get largest files: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get largest files: {str(e)}")
+
+
+@router.post("/inventory/refresh")
+async def refresh_media_inventory(library_key: Optional[str] = None):
+    """
+    Re-sync the media inventory with Plex now (one library or all)
+    
+    Only items whose Plex updatedAt changed are rewritten.
+    """
+    try:
+        if library_key:
+            results = {library_key: await media_inventory.sync_section(library_key)}
+        else:
+            results = await media_inventory.sync_all()
+        return {
+            "status": "success",
+            "libraries": {key: {"updated": changed, "removed": removed} for key, (changed, removed) in results.items()}
+        }
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Media inventory refresh failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Media inventory refresh failed: {str(e)}")
+
+
 @router.get("/libraries/{library_key}")
 async def get_library_details(library_key: str):
     """
     Get detailed information about a specific library
     """
     try:
-        server = plex_connection.get_connection()
-        library = server.library.sectionByID(library_key)
-        
-        if not library:
-            raise HTTPException(status_code=404, detail=f"Library not found: {library_key}")
-        
-        return PlexLibrary(
-            key=str(library.key),
-            title=library.title,
-            type=library.type,
-            agent=library.agent if hasattr(library, 'agent') else None,
-            scanner=library.scanner if hasattr(library, 'scanner') else None,
-            language=library.language if hasattr(library, 'language') else None,
-            uuid=library.uuid,
-            updated_at=library.updatedAt if hasattr(library, 'updatedAt') else None,
-            created_at=library.createdAt if hasattr(library, 'createdAt') else None,
-            scanned_at=library.scannedAt if hasattr(library, 'scannedAt') else None,
-            content_count=library.totalSize if hasattr(library, 'totalSize') else 0
-        )
+        section = await plex_reader.section(library_key)
+        return _section_to_schema(section)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    except HTTPException:
-        raise
     except Exception as e:
         logger.error(f"Failed to get library details: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get library details: {str(e)}")
@@ -131,34 +318,14 @@ async def get_library_content(
 ):
     """
     Get content from a specific library with pagination
+    
+    Only the requested page is fetched from Plex (container paging).
     """
     try:
-        server = plex_connection.get_connection()
-        library = server.library.sectionByID(library_key)
-        
-        # Get all items and paginate
-        all_items = library.all()
-        total_count = len(all_items)
-        paginated_items = all_items[offset:offset + limit]
-        
-        items = []
-        for item in paginated_items:
-            items.append(PlexMediaItem(
-                key=str(item.key),
-                title=item.title,
-                type=item.type,
-                year=item.year if hasattr(item, 'year') else None,
-                rating=item.rating if hasattr(item, 'rating') else None,
-                summary=item.summary if hasattr(item, 'summary') else None,
-                thumb=item.thumb if hasattr(item, 'thumb') else None,
-                art=item.art if hasattr(item, 'art') else None,
-                duration=item.duration if hasattr(item, 'duration') else None,
-                added_at=item.addedAt if hasattr(item, 'addedAt') else None,
-                updated_at=item.updatedAt if hasattr(item, 'updatedAt') else None,
-            ))
+        page, total_count = await plex_reader.items(library_key, start=offset, size=limit)
         
         return {
-            "items": items,
+            "items": [_item_to_schema(item) for item in page],
             "total": total_count,
             "limit": limit,
             "offset": offset,
@@ -171,6 +338,29 @@ async def get_library_content(
         raise HTTPException(status_code=500, detail=f"Failed to get library content: {str(e)}")
 
 
+@router.get("/libraries/{library_key}/recently-added")
+async def get_library_recently_added(library_key: str, limit: int = 10):
+    """
+    Get the most recently added items of a specific library
+    
+    Uses Plex-side sorting (addedAt:desc) with a container size limit,
+    so the cost depends on `limit`, not on library size.
+    """
+    try:
+        limit = max(1, min(limit, 100))
+        items = await plex_reader.section_recently_added(library_key, limit=limit)
+        return {
+            "library_key": library_key,
+            "items": [_item_to_schema(item) for item in items],
+            "count": len(items)
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to get recently added items: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get recently added items: {str(e)}")
+
+
 @router.get("/libraries/{library_key}/stats")
 async def get_library_stats(library_key: str):
     """
@@ -179,34 +369,24 @@ async def get_library_stats(library_key: str):
     Returns detailed statistics including size, count, recently added, etc.
     """
     try:
-        server = plex_connection.get_connection()
-        library = server.library.sectionByID(library_key)
-        
-        all_items = library.all()
-        total_items = len(all_items)
+        section = await plex_reader.section(library_key)
         
-        # Get recently added (last 10 items)
-        recently_added = sorted(
-            all_items, 
-            key=lambda x: x.addedAt if hasattr(x, 'addedAt') and x.addedAt else datetime.min, 
-            reverse=True
-        )[:10]
-        
-        # Calculate total duration/size if applicable
-        total_duration = sum(
-            item.duration for item in all_items 
-            if hasattr(item, 'duration') and item.duration
-        ) / 1000 / 60  # Convert to minutes
+        # Stream the section and fold items into running totals (O(1) memory)
+        aggregate = LibraryAggregate(top_n=10)
+        async for item in plex_reader.stream_items(section.key):
+            aggregate.add(item)
         
         return {
             "library_key": library_key,
-            "library_name": library.title,
-            "library_type": library.type,
-            "total_items": total_items,
-            "total_duration_minutes": int(total_duration),
-            "recently_added_count": len(recently_added),
-            "last_scanned": library.scannedAt.isoformat() if hasattr(library, 'scannedAt') and library.scannedAt else None,
+            "library_name": section.title,
+            "library_type": section.type,
+            "total_items": aggregate.count,
+            "total_duration_minutes": aggregate.total_duration_minutes,
+            "recently_added_count": len(aggregate.recently_added()),
+            "last_scanned": section.scanned_at.isoformat() if section.scanned_at else None,
         }
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -214,79 +394,118 @@ async def get_library_stats(library_key: str):
         raise HTTPException(status_code=500, detail=f"Failed to get library stats: {str(e)}")
 
 
+@router.get("/libraries/{library_key}/analytics")
+async def get_library_analytics(library_key: str, group_by: str = "year"):
+    """
+    Vectorised library analytics from the section's columnar snapshot
+    
+    group_by takes one or more of year, resolution, added_month (comma
+    separated). Each group reports item count, summed duration and summed
+    file size. For TV and music libraries the rows are episodes and tracks.
+    """
+    try:
+        fields = [f.strip() for f in group_by.split(',') if f.strip()]
+        snapshot = await library_snapshots.get(library_key)
+        
+        started = time.perf_counter()
+        groups = {field: snapshot.group_by(field) for field in fields}
+        
+        return {
+            "library_key": library_key,
+            **snapshot.totals(),
+            "groups": groups,
+            "snapshot_age_seconds": round(time.monotonic() - snapshot.built_at, 1),
+            "took_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to get library analytics: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get library analytics: {str(e)}")
+
+
 @router.get("/libraries/{library_key}/directories")
 async def get_library_directories(
     library_key: str,
-    path: str = "/"
+    request: Request,
+    path: str = "/",
+    rating_key: Optional[str] = None,
+    q: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 500,
+    refresh: bool = False
 ):
     """
     Browse library structure using Plex API (not filesystem)
     
     For TV Shows: / → Shows → Seasons
     For Movies: / → Movies (no deeper)
+    
+    Listings come from the library browser tree cache. Passing the show's
+    rating_key skips the title lookup; q filters by title prefix and
+    refresh drops the section's cached listings first. The ETag is the
+    node listing's version plus the page, so If-None-Match gets a 304
+    while the node is unchanged.
     """
     try:
-        server = plex_connection.get_connection()
-        library = server.library.sectionByID(int(library_key))
+        section = await plex_reader.section(library_key)
+        path_parts = [p for p in path.split('/') if p]
         
-        logger.info(f"Browsing library: {library.title} (type: {library.type}), path: {path}")
+        if refresh:
+            library_browser.invalidate(section_key=section.key)
         
-        directories = []
+        logger.debug(f"Browsing library: {section.title} (type: {section.type}), path: {path}")
         
-        if path == '/':
+        listing = None
+        if not path_parts:
             # Root level - list all shows/movies
-            items = library.all()
-            logger.info(f"Found {len(items)} items at root level")
-            
-            for item in items:
-                directories.append({
-                    "name": item.title,
-                    "path": f"/{item.title}",
-                    "full_path": item.title,
-                    "is_directory": True
-                })
-        else:
-            # Navigate deeper
-            path_parts = [p for p in path.split('/') if p]
-            
-            if len(path_parts) == 1 and library.type == 'show':
-                # Show level - list seasons
-                show_title = path_parts[0]
-                items = library.all()
-                show = next((s for s in items if s.title == show_title), None)
-                
-                if show and hasattr(show, 'seasons'):
-                    for season in show.seasons():
-                        directories.append({
-                            "name": season.title,
-                            "path": f"/{show_title}/{season.title}",
-                            "full_path": f"{show_title}/{season.title}",
-                            "is_directory": True
-                        })
-                    logger.info(f"Found {len(directories)} seasons for {show_title}")
+            listing = await library_browser.root(section.key)
+        elif len(path_parts) == 1 and section.type == 'show':
+            # Show level - list seasons
+            if not rating_key:
+                show = await library_browser.resolve(section.key, path_parts[0])
+                rating_key = show.rating_key if show else None
+            if rating_key:
+                listing = await library_browser.children(section.key, rating_key)
+        
+        children, total = listing.page(offset, limit, q) if listing else ([], 0)
         
-        # Sort by name
-        directories.sort(key=lambda x: x['name'].lower())
+        base = '/'.join(path_parts)
+        directories = [
+            {
+                "name": child.title,
+                "path": f"/{base}/{child.title}" if base else f"/{child.title}",
+                "full_path": f"{base}/{child.title}" if base else child.title,
+                "is_directory": True,
+                "rating_key": child.rating_key
+            }
+            for child in children
+        ]
         
         # Calculate parent path
         parent_path = None
-        if path != '/':
-            parts = [p for p in path.split('/') if p]
-            if len(parts) > 1:
-                parent_path = '/' + '/'.join(parts[:-1])
-            else:
-                parent_path = '/'
+        if path_parts:
+            parent_path = '/' + '/'.join(path_parts[:-1])
         
-        logger.info(f"Returning {len(directories)} directories")
-        
-        return {
+        listing_etag = listing.etag if listing else None
+        etag = make_etag("directories", library_key, section.title, path, offset, limit, q, listing_etag)
+        return conditional_response(request, {
             "library_key": library_key,
-            "library_name": library.title,
+            "library_name": section.title,
             "current_path": path,
             "parent_path": parent_path,
-            "directories": directories
-        }
+            "directories": directories,
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "has_more": offset + len(directories) < total,
+            "etag": listing_etag
+        }, etag=etag)
         
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -1,14 +1,23 @@
 """
 Plex server connection and management routes
 """
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+import hmac
+import json
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional
 from loguru import logger
 
 from app.services.plex.connection import plex_connection
+from app.services.plex.reader import plex_reader
+from app.services.plex.events import plex_events, plex_notifications, handle_webhook
+from app.core.config import settings
 from app.db.session import get_db
+from app.db.writer import db_writer
+from app.api.etag import conditional_response, not_modified
+from app.services.plex.images import image_cache, clamp_size, IMAGE_KINDS
 from app.models.plex import PlexServerConfig
 
 router = APIRouter()
@@ -44,8 +53,21 @@ async def test_plex_connection(config: PlexConnectionConfig):
         raise HTTPException(status_code=400, detail=f"Failed to test connection: {str(e)}")
 
 
+def _store_config(db: Session, config: PlexConnectionConfig, test_result: dict):
+    """Insert or update the stored Plex configuration (write job, see app.db.writer)"""
+    db_config = db.query(PlexServerConfig).first()
+    if db_config is None:
+        db_config = PlexServerConfig()
+        db.add(db_config)
+    db_config.url = config.url
+    db_config.token = config.token
+    db_config.name = test_result.get("server_name")
+    db_config.version = test_result.get("version")
+    db_config.platform = test_result.get("platform")
+
+
 @router.post("/config")
-async def save_plex_config(config: PlexConnectionConfig, db: Session = Depends(get_db)):
+async def save_plex_config(config: PlexConnectionConfig):
     """
     Save Plex connection configuration to database
     
@@ -53,34 +75,19 @@ async def save_plex_config(config: PlexConnectionConfig, db: Session = Depends(g
     Also tests the connection before saving.
     """
     try:
-        # Test connection first
-        test_result = plex_connection.test_connection(config.url, config.token)
+        # Test connection first (plexapi is blocking)
+        test_result = await asyncio.to_thread(plex_connection.test_connection, config.url, config.token)
         if not test_result["success"]:
             raise HTTPException(status_code=400, detail=test_result["error"])
         
         # Save to database
-        db_config = db.query(PlexServerConfig).first()
-        if db_config:
-            db_config.url = config.url
-            db_config.token = config.token
-            db_config.name = test_result.get("server_name")
-            db_config.version = test_result.get("version")
-            db_config.platform = test_result.get("platform")
-        else:
-            db_config = PlexServerConfig(
-                url=config.url,
-                token=config.token,
-                name=test_result.get("server_name"),
-                version=test_result.get("version"),
-                platform=test_result.get("platform")
-            )
-            db.add(db_config)
-        
-        db.commit()
-        db.refresh(db_config)
+        await db_writer.run(lambda db: _store_config(db, config, test_result))
         
-        # Update in-memory connection
+        # Update in-memory connection and drop everything cached for the old server
         plex_connection.set_config(config.url, config.token)
+        plex_events.publish(reason="config.changed")
+        if settings.PLEX_NOTIFICATIONS_ENABLED:
+            await plex_notifications.restart()
         
         logger.info(f"Plex config saved: {test_result.get('server_name')}")
         
@@ -97,11 +104,12 @@ async def save_plex_config(config: PlexConnectionConfig, db: Session = Depends(g
 
 
 @router.get("/config")
-async def get_plex_config(db: Session = Depends(get_db)):
+def get_plex_config(db: Session = Depends(get_db)):
     """
     Get current Plex configuration from database
     
     Returns the saved configuration (without the token for security).
+    Plain def: the query runs on a sync session, in FastAPI's threadpool.
     """
     try:
         db_config = db.query(PlexServerConfig).first()
@@ -145,31 +153,31 @@ async def get_server_info():
 
 
 @router.get("/libraries")
-async def get_libraries():
+async def get_libraries(request: Request):
     """
     Get all Plex libraries
     
     Returns a list of all libraries with basic information.
+    Supports conditional GET (ETag / If-None-Match).
     """
     try:
-        server = plex_connection.get_connection()
         libraries = []
         
-        for section in server.library.sections():
+        for section in await plex_reader.sections():
             libraries.append({
                 "key": section.key,
                 "title": section.title,
                 "type": section.type,
-                "total_items": section.totalSize,
+                "total_items": section.total_size,
                 "agent": section.agent,
                 "scanner": section.scanner,
                 "language": section.language,
                 "uuid": section.uuid,
-                "updated_at": section.updatedAt.isoformat() if section.updatedAt else None,
-                "created_at": section.createdAt.isoformat() if section.createdAt else None
+                "updated_at": section.updated_at.isoformat() if section.updated_at else None,
+                "created_at": section.created_at.isoformat() if section.created_at else None
             })
         
-        return {"libraries": libraries}
+        return conditional_response(request, {"libraries": libraries})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -227,3 +235,79 @@ async def scan_library(library_key: str):
     except Exception as e:
         logger.error(f"Failed to scan library: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/webhook")
+async def plex_webhook(request: Request, secret: Optional[str] = None):
+    """
+    Receive Plex webhooks
+    
+    Plex posts multipart/form-data with the event JSON in the `payload`
+    field. library.* events are turned into cache invalidations for the
+    affected section and item; other events are acknowledged and ignored.
+    """
+    # Constant-time comparison (bytes, so non-ASCII input can't raise)
+    if settings.PLEX_WEBHOOK_SECRET and not hmac.compare_digest(
+        (secret or "").encode(), settings.PLEX_WEBHOOK_SECRET.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Invalid webhook secret")
+    
+    try:
+        content_type = request.headers.get("content-type", "")
+        if content_type.startswith("multipart/") or content_type.startswith("application/x-www-form-urlencoded"):
+            form = await request.form()
+            payload = json.loads(form.get("payload") or "{}")
+        else:
+            payload = await request.json()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid webhook payload: {str(e)}")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Invalid webhook payload: expected a JSON object")
+    
+    handled = handle_webhook(payload)
+    logger.debug(f"Plex webhook {payload.get('event')} (invalidated: {handled})")
+    return {"status": "ok", "invalidated": handled}
+
+
+# Artwork URLs are not versioned, so browsers revalidate with the ETag weekly
+IMAGE_CACHE_CONTROL = "private, max-age=604800"
+
+
+@router.get("/image/{rating_key}")
+async def get_plex_image(
+    rating_key: str,
+    request: Request,
+    kind: str = "thumb",
+    width: int = 300,
+    height: int = 450
+):
+    """
+    Resized poster (kind=thumb) or background (kind=art) of a Plex item
+    
+    Images are transcoded by Plex once per size and served from the local
+    disk cache afterwards, without exposing the Plex URL or token.
+    """
+    try:
+        if kind not in IMAGE_KINDS:
+            raise ValueError(f"Invalid kind '{kind}'. Use one of: {', '.join(IMAGE_KINDS)}")
+        width, height = clamp_size(width), clamp_size(height)
+        
+        cached = image_cache.lookup(rating_key, kind, width, height)
+        if cached is not None:
+            unchanged = not_modified(request, cached.etag, cache_control=IMAGE_CACHE_CONTROL)
+            if unchanged is not None:
+                return unchanged
+        
+        content, etag = await image_cache.get(rating_key, kind, width, height)
+        return Response(
+            content=content,
+            media_type="image/jpeg",
+            headers={"ETag": etag, "Cache-Control": IMAGE_CACHE_CONTROL}
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to get image for {rating_key}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get image: {str(e)}")
@@ -3,26 +3,27 @@ API routes for Prowlarr integration
 Handles indexer management and monitoring
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any, List
 from loguru import logger
 
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.integrations import IntegrationConfig
 from app.services.integrations import ProwlarrClient
 
 router = APIRouter(prefix="/prowlarr", tags=["prowlarr"])
 
 
-async def get_prowlarr_client(db: Session = Depends(get_db)) -> ProwlarrClient:
+async def get_prowlarr_client(db: AsyncSession = Depends(get_async_db)) -> ProwlarrClient:
     """Get an enabled Prowlarr client"""
-    config = (
-        db.query(IntegrationConfig)
-        .filter(
+    config = await db.scalar(
+        select(IntegrationConfig)
+        .where(
             IntegrationConfig.service_type == "prowlarr",
             IntegrationConfig.enabled == True
         )
-        .first()
+        .limit(1)
     )
     
     if not config:
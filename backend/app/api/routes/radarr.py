@@ -3,26 +3,27 @@ API routes for Radarr integration
 Handles movie management and missing movie tracking
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any, List
 from loguru import logger
 
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.integrations import IntegrationConfig
 from app.services.integrations import RadarrClient
 
 router = APIRouter(prefix="/radarr", tags=["radarr"])
 
 
-async def get_radarr_client(db: Session = Depends(get_db)) -> RadarrClient:
+async def get_radarr_client(db: AsyncSession = Depends(get_async_db)) -> RadarrClient:
     """Get an enabled Radarr client"""
-    config = (
-        db.query(IntegrationConfig)
-        .filter(
+    config = await db.scalar(
+        select(IntegrationConfig)
+        .where(
             IntegrationConfig.service_type == "radarr",
             IntegrationConfig.enabled == True
         )
-        .first()
+        .limit(1)
     )
     
     if not config:
@@ -3,26 +3,28 @@ API routes for SABnzbd integration
 Handles download queue and history management
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
 from loguru import logger
 
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.integrations import IntegrationConfig
 from app.services.integrations import SabnzbdClient
+from app.services.telemetry import telemetry
 
 router = APIRouter(prefix="/sabnzbd", tags=["sabnzbd"])
 
 
-async def get_sabnzbd_client(db: Session = Depends(get_db)) -> SabnzbdClient:
+async def get_sabnzbd_client(db: AsyncSession = Depends(get_async_db)) -> SabnzbdClient:
     """Get an enabled SABnzbd client"""
-    config = (
-        db.query(IntegrationConfig)
-        .filter(
+    config = await db.scalar(
+        select(IntegrationConfig)
+        .where(
             IntegrationConfig.service_type == "sabnzbd",
             IntegrationConfig.enabled == True
         )
-        .first()
+        .limit(1)
     )
     
     if not config:
@@ -43,6 +45,9 @@ async def get_queue(client: SabnzbdClient = Depends(get_sabnzbd_client)) -> Dict
     """
     try:
         queue_data = await client.get_queue()
+        speed = queue_data.get("queue", {}).get("kbpersec")
+        if speed not in (None, ""):
+            telemetry.record_nowait("sabnzbd_speed_kbps", client.url, float(speed))
         return queue_data
     except Exception as e:
         logger.error(f"Failed to get SABnzbd queue: {str(e)}")
@@ -1,20 +1,33 @@
 """
 Scan history tracking and management
 """
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
+from sqlalchemy import select, func, delete
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional
 from loguru import logger
 from pydantic import BaseModel
 import os
 
 from app.services.plex.connection import plex_connection
-from app.db.session import get_db
-from app.models.plex import ScanHistory
+from app.services.plex.browser import library_browser
+from app.services.plex.events import plex_events
+from app.db.session import get_async_read_db
+from app.db.writer import db_writer
+from app.api.etag import make_etag, not_modified, conditional_response
+from app.api.pagination import encode_cursor, before
+from app.models.plex import ScanHistory, ScanHistoryDaily
+from app.services.scans.analytics import scan_analytics
+from app.services.scans.retention import scan_retention
+from app.services.telemetry import telemetry
 
 router = APIRouter()
 
+# Largest scan history page
+MAX_PAGE_SIZE = 500
+
 
 class ScanRequest(BaseModel):
     path: Optional[str] = None
@@ -23,8 +36,7 @@ class ScanRequest(BaseModel):
 @router.post("/libraries/{library_key}/scan")
 async def scan_library_with_history(
     library_key: str,
-    request: ScanRequest = ScanRequest(),
-    db: Session = Depends(get_db)
+    request: ScanRequest = ScanRequest()
 ):
     """
     Scan library or specific path within library
@@ -49,11 +61,10 @@ async def scan_library_with_history(
                 # User wants to scan a specific show/movie
                 show_title = path_parts[0]
                 
-                # Get the show from Plex to find its filesystem location
-                items = library.all()
-                show = next((s for s in items if s.title == show_title), None)
+                # Find the show's filesystem location via the browser cache
+                show = await library_browser.resolve(str(library.key), show_title)
                 
-                if show and hasattr(show, 'locations') and show.locations:
+                if show and show.locations:
                     # Use the show's actual filesystem location
                     full_path = show.locations[0]
                     logger.info(f"Found show filesystem path: {full_path}")
@@ -85,9 +96,7 @@ async def scan_library_with_history(
             status='started',
             started_at=started_at
         )
-        db.add(scan)
-        db.commit()
-        db.refresh(scan)
+        await db_writer.add(scan)
         
         # Execute scan
         try:
@@ -111,8 +120,14 @@ async def scan_library_with_history(
             scan.duration_seconds = (scan.completed_at - scan.started_at).total_seconds()
             logger.error(f"Scan failed for {library.title}: {str(e)}")
         
-        db.commit()
-        db.refresh(scan)
+        await db_writer.add(scan)
+        
+        if scan.status == 'completed':
+            # Plex has only queued the scan at this point, so this just drops
+            # the cached directory listings and section counts; the changes
+            # themselves are picked up from the notification listener
+            # (timeline / activity-ended events) once Plex has processed them
+            plex_events.publish(section_key=library.key, reason="scan")
         
         return {
             "status": scan.status,
@@ -136,22 +151,56 @@ async def scan_library_with_history(
 
 @router.get("/scan-history")
 async def get_scan_history(
+    request: Request,
     limit: int = 50,
     library_key: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
-    Get scan history with optional library filter
+    Get scan history with optional library filter, newest first
+    
+    Keyset paginated: pass the returned next_cursor to get the following
+    page; next_cursor is null on the last page. `limit` is the page size.
+    
+    Supports conditional GET: the ETag is derived from a cheap version
+    query (row count, max id, max updated_at), so unchanged history is
+    answered with 304 without loading or serialising any rows.
     """
     try:
-        query = db.query(ScanHistory)
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
         
+        version_query = select(
+            func.count(ScanHistory.id),
+            func.max(ScanHistory.id),
+            func.max(ScanHistory.updated_at)
+        )
         if library_key:
-            query = query.filter(ScanHistory.library_key == library_key)
+            version_query = version_query.where(ScanHistory.library_key == library_key)
+        version = (await db.execute(version_query)).one()
+        etag = make_etag("scan-history", limit, library_key, cursor, *version)
         
-        scans = query.order_by(ScanHistory.started_at.desc()).limit(limit).all()
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
         
-        return {
+        query = select(ScanHistory)
+        
+        if library_key:
+            query = query.where(ScanHistory.library_key == library_key)
+        if cursor:
+            query = query.where(before(ScanHistory.started_at, ScanHistory.id, cursor))
+        
+        # One extra row tells whether another page exists
+        query = query.order_by(ScanHistory.started_at.desc(), ScanHistory.id.desc()).limit(limit + 1)
+        scans = (await db.scalars(query)).all()
+        next_cursor = None
+        if len(scans) > limit:
+            scans = scans[:limit]
+            next_cursor = encode_cursor(scans[-1].started_at, scans[-1].id)
+        
+        return conditional_response(request, {
             "scans": [
                 {
                     "id": scan.id,
@@ -168,14 +217,110 @@ async def get_scan_history(
                 }
                 for scan in scans
             ],
-            "total": len(scans)
-        }
+            "total": len(scans),
+            "next_cursor": next_cursor
+        }, etag=etag)
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to get scan history: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/analytics")
+async def get_scan_analytics(
+    group_by: str = "library",
+    days: int = 30,
+    library_key: Optional[str] = None,
+    sort: str = "p95",
+    limit: int = 50,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Scan counts, failure rates and p50/p95 durations per library or path
+    
+    Covers the last `days` days, with the same figures for the `days`
+    before and the change between them (trend). Computed with SQL
+    aggregates - no scan rows are loaded.
+    
+    group_by: 'library' or 'path' (partial scans)
+    sort: 'p95', 'p50', 'trend' (p50 change), 'failure_rate' or 'scans'
+    """
+    try:
+        return await scan_analytics(db, group_by, days, library_key, sort, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to get scan analytics: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/scan-history/daily")
+async def get_scan_history_daily(
+    library_key: Optional[str] = None,
+    days: int = 365,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Daily per-library rollups of scans past the retention age, newest first
+    """
+    try:
+        if days < 1:
+            raise ValueError("days must be at least 1")
+
+        query = select(ScanHistoryDaily).where(
+            ScanHistoryDaily.day >= datetime.utcnow().date() - timedelta(days=days)
+        )
+        if library_key:
+            query = query.where(ScanHistoryDaily.library_key == library_key)
+        query = query.order_by(ScanHistoryDaily.day.desc(), ScanHistoryDaily.library_key)
+        rollups = (await db.scalars(query)).all()
+
+        return {
+            "days": [
+                {
+                    "day": rollup.day.isoformat(),
+                    "library_key": rollup.library_key,
+                    "library_name": rollup.library_name,
+                    "library_type": rollup.library_type,
+                    "scans": rollup.scans,
+                    "completed": rollup.completed,
+                    "failures": rollup.failures,
+                    "total_duration_seconds": rollup.total_duration_seconds,
+                    "p50_duration_seconds": rollup.p50_duration_seconds,
+                    "p95_duration_seconds": rollup.p95_duration_seconds,
+                    "max_duration_seconds": rollup.max_duration_seconds
+                }
+                for rollup in rollups
+            ],
+            "total": len(rollups)
+        }
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to get daily scan history: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/scan-history/retention")
+async def run_scan_history_retention(days: Optional[int] = None):
+    """
+    Roll up and purge scan history older than `days` now
+
+    Defaults to SCAN_HISTORY_RETENTION_DAYS; when that is set it also runs
+    periodically in the background.
+    """
+    try:
+        return await scan_retention.run(days)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to apply scan history retention: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/plex-activities")
 async def get_current_plex_activities():
     """
@@ -201,6 +346,9 @@ async def get_current_plex_activities():
                     "progress": activity.progress if hasattr(activity, 'progress') else 0,
                 }
                 activities.append(activity_data)
+                telemetry.record_nowait(
+                    "plex_activity_progress", activity_data["uuid"] or activity.title, activity_data["progress"]
+                )
                 
         except Exception as e:
             logger.warning(f"Could not fetch Plex activities: {str(e)}")
@@ -214,20 +362,17 @@ async def get_current_plex_activities():
 
 
 @router.delete("/scan-history/{scan_id}")
-async def delete_scan_history(
-    scan_id: int,
-    db: Session = Depends(get_db)
-):
+async def delete_scan_history(scan_id: int):
     """
     Delete a specific scan history record
     """
     try:
-        scan = db.query(ScanHistory).filter(ScanHistory.id == scan_id).first()
-        if not scan:
-            raise HTTPException(status_code=404, detail="Scan history not found")
+        def delete_scan(db: Session) -> int:
+            result = db.execute(delete(ScanHistory).where(ScanHistory.id == scan_id))
+            return result.rowcount
         
-        db.delete(scan)
-        db.commit()
+        if not await db_writer.run(delete_scan):
+            raise HTTPException(status_code=404, detail="Scan history not found")
         
         return {"status": "success", "message": "Scan history deleted"}
         
@@ -3,26 +3,27 @@ API routes for Sonarr integration
 Handles TV show management and missing episode tracking
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any, List
 from loguru import logger
 
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.integrations import IntegrationConfig
 from app.services.integrations import SonarrClient
 
 router = APIRouter(prefix="/sonarr", tags=["sonarr"])
 
 
-async def get_sonarr_client(db: Session = Depends(get_db)) -> SonarrClient:
+async def get_sonarr_client(db: AsyncSession = Depends(get_async_db)) -> SonarrClient:
     """Get an enabled Sonarr client"""
-    config = (
-        db.query(IntegrationConfig)
-        .filter(
+    config = await db.scalar(
+        select(IntegrationConfig)
+        .where(
             IntegrationConfig.service_type == "sonarr",
             IntegrationConfig.enabled == True
         )
-        .first()
+        .limit(1)
     )
     
     if not config:
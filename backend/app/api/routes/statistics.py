@@ -2,34 +2,37 @@
 API routes for aggregate statistics across all integrations
 Provides comprehensive statistics for the Statistics page
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any, List, Optional
 from loguru import logger
 from datetime import datetime, timedelta
 
-from app.db.session import get_db
+from app.db.session import get_async_db
+from app.api.etag import conditional_response
 from app.models.integrations import IntegrationConfig
 from app.services.integrations import RadarrClient, SonarrClient, SabnzbdClient, ProwlarrClient
 
 router = APIRouter(prefix="/statistics", tags=["statistics"])
 
 
-def get_enabled_integration(db: Session, service_type: str) -> Optional[IntegrationConfig]:
+async def get_enabled_integration(db: AsyncSession, service_type: str) -> Optional[IntegrationConfig]:
     """Get an enabled integration config"""
-    return (
-        db.query(IntegrationConfig)
-        .filter(
+    return await db.scalar(
+        select(IntegrationConfig)
+        .where(
             IntegrationConfig.service_type == service_type,
             IntegrationConfig.enabled == True
         )
-        .first()
+        .limit(1)
     )
 
 
-async def get_radarr_statistics(db: Session) -> Optional[Dict[str, Any]]:
+async def get_radarr_statistics(db: AsyncSession) -> Optional[Dict[str, Any]]:
     """Get Radarr statistics"""
-    config = get_enabled_integration(db, "radarr")
+    config = await get_enabled_integration(db, "radarr")
     if not config:
         return None
     
@@ -100,9 +103,9 @@ async def get_radarr_statistics(db: Session) -> Optional[Dict[str, Any]]:
         return {"enabled": True, "error": str(e)}
 
 
-async def get_sonarr_statistics(db: Session) -> Optional[Dict[str, Any]]:
+async def get_sonarr_statistics(db: AsyncSession) -> Optional[Dict[str, Any]]:
     """Get Sonarr statistics"""
-    config = get_enabled_integration(db, "sonarr")
+    config = await get_enabled_integration(db, "sonarr")
     if not config:
         return None
     
@@ -185,9 +188,9 @@ def safe_int(value: Any, default: int = 0) -> int:
     return default
 
 
-async def get_sabnzbd_statistics(db: Session) -> Optional[Dict[str, Any]]:
+async def get_sabnzbd_statistics(db: AsyncSession) -> Optional[Dict[str, Any]]:
     """Get SABnzbd statistics with per-server breakdown including priority"""
-    config = get_enabled_integration(db, "sabnzbd")
+    config = await get_enabled_integration(db, "sabnzbd")
     if not config:
         return None
     
@@ -351,9 +354,9 @@ async def get_sabnzbd_statistics(db: Session) -> Optional[Dict[str, Any]]:
         return {"enabled": True, "error": str(e)}
 
 
-async def get_prowlarr_statistics(db: Session) -> Optional[Dict[str, Any]]:
+async def get_prowlarr_statistics(db: AsyncSession) -> Optional[Dict[str, Any]]:
     """Get Prowlarr statistics including indexer priorities"""
-    config = get_enabled_integration(db, "prowlarr")
+    config = await get_enabled_integration(db, "prowlarr")
     if not config:
         return None
     
@@ -439,11 +442,12 @@ async def get_prowlarr_statistics(db: Session) -> Optional[Dict[str, Any]]:
 
 
 @router.get("/overview")
-async def get_statistics_overview(db: Session = Depends(get_db)) -> Dict[str, Any]:
+async def get_statistics_overview(request: Request, db: AsyncSession = Depends(get_async_db)) -> Response:
     """
     Get comprehensive statistics overview from all enabled integrations
     
-    Returns aggregated statistics from Radarr, Sonarr, SABnzbd, and Prowlarr
+    Returns aggregated statistics from Radarr, Sonarr, SABnzbd, and Prowlarr.
+    Supports conditional GET; the generation timestamp is not part of the ETag.
     """
     try:
         # Gather statistics from all services
@@ -475,14 +479,14 @@ async def get_statistics_overview(db: Session = Depends(get_db)) -> Dict[str, An
             }
         }
         
-        return {
+        return conditional_response(request, {
             "timestamp": now.isoformat(),
             "time_ranges": time_ranges,
             "radarr": radarr_stats,
             "sonarr": sonarr_stats,
             "sabnzbd": sabnzbd_stats,
             "prowlarr": prowlarr_stats
-        }
+        }, exclude=("timestamp", "time_ranges"))
     except Exception as e:
         logger.error(f"Failed to get statistics overview: {str(e)}")
         raise HTTPException(
@@ -492,7 +496,7 @@ async def get_statistics_overview(db: Session = Depends(get_db)) -> Dict[str, An
 
 
 @router.get("/radarr")
-async def get_radarr_stats_endpoint(db: Session = Depends(get_db)) -> Dict[str, Any]:
+async def get_radarr_stats_endpoint(db: AsyncSession = Depends(get_async_db)) -> Dict[str, Any]:
     """Get detailed Radarr statistics"""
     stats = await get_radarr_statistics(db)
     if stats is None:
@@ -504,7 +508,7 @@ async def get_radarr_stats_endpoint(db: Session = Depends(get_db)) -> Dict[str,
 
 
 @router.get("/sonarr")
-async def get_sonarr_stats_endpoint(db: Session = Depends(get_db)) -> Dict[str, Any]:
+async def get_sonarr_stats_endpoint(db: AsyncSession = Depends(get_async_db)) -> Dict[str, Any]:
     """Get detailed Sonarr statistics"""
     stats = await get_sonarr_statistics(db)
     if stats is None:
@@ -516,7 +520,7 @@ async def get_sonarr_stats_endpoint(db: Session = Depends(get_db)) -> Dict[str,
 
 
 @router.get("/sabnzbd")
-async def get_sabnzbd_stats_endpoint(db: Session = Depends(get_db)) -> Dict[str, Any]:
+async def get_sabnzbd_stats_endpoint(db: AsyncSession = Depends(get_async_db)) -> Dict[str, Any]:
     """Get detailed SABnzbd statistics"""
     stats = await get_sabnzbd_statistics(db)
     if stats is None:
@@ -528,7 +532,7 @@ async def get_sabnzbd_stats_endpoint(db: Session = Depends(get_db)) -> Dict[str,
 
 
 @router.get("/prowlarr")
-async def get_prowlarr_stats_endpoint(db: Session = Depends(get_db)) -> Dict[str, Any]:
+async def get_prowlarr_stats_endpoint(db: AsyncSession = Depends(get_async_db)) -> Dict[str, Any]:
     """Get detailed Prowlarr statistics"""
     stats = await get_prowlarr_statistics(db)
     if stats is None:
@@ -27,6 +27,21 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "postgresql://totarr:totarr@db:5432/totarr"
+    # Connection pool per engine (sync and async), PostgreSQL only
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a connection is replaced
+    # Optional PostgreSQL read replica for read-only routes
+    DATABASE_READ_URL: str = ""
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0  # Fall back to the primary beyond this
+    DB_REPLICA_CHECK_INTERVAL: float = 5.0  # Seconds between lag checks
+    # SQLite profile (WAL, pragmas) and single-writer queue
+    SQLITE_TUNING_ENABLED: bool = True
+    SQLITE_SINGLE_WRITER: bool = True
+    SQLITE_BUSY_TIMEOUT_MS: int = 15000
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
     
     # Redis (for Celery)
     REDIS_URL: str = "redis://redis:6379/0"
@@ -43,6 +58,39 @@ class Settings(BaseSettings):
     PLEX_URL: str = ""
     PLEX_TOKEN: str = ""
     
+    # Plex change notifications (cache invalidation)
+    PLEX_NOTIFICATIONS_ENABLED: bool = True
+    PLEX_WEBHOOK_SECRET: str = ""  # If set, webhooks must pass ?secret=<value>; open when empty
+    
+    # Local library index (full-text search)
+    LIBRARY_INDEX_ENABLED: bool = True
+    LIBRARY_CHANGES_RETENTION_DAYS: int = 30  # Change feed history; 0 keeps everything
+    
+    # Scan history retention (older scans are rolled up into daily aggregates)
+    SCAN_HISTORY_RETENTION_DAYS: int = 0  # Opt-in; 0 keeps every scan
+    SCAN_HISTORY_RETENTION_INTERVAL_HOURS: float = 6.0
+    
+    # Resized Plex artwork cache (/api/plex/image)
+    IMAGE_CACHE_DIR: str = "cache/images"
+    IMAGE_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    IMAGE_PREFETCH_ENABLED: bool = True
+    IMAGE_PREFETCH_SIZES: List[str] = ["300x450"]  # Poster sizes warmed for new items
+    IMAGE_PREFETCH_RECENT: int = 50  # Recently added items kept warm
+    IMAGE_PREFETCH_CONCURRENCY: int = 2
+    
+    # Media inventory (codec / resolution / size reports)
+    MEDIA_INVENTORY_ENABLED: bool = True
+    
+    # Telemetry samples (queue speed, activity progress, upstream latency)
+    TELEMETRY_ENABLED: bool = True
+    TELEMETRY_BATCH_SIZE: int = 1000  # Rows per write
+    TELEMETRY_FLUSH_INTERVAL: float = 2.0  # Seconds a sample may wait to be written
+    TELEMETRY_MAX_PENDING: int = 20000  # Buffered rows before new samples are dropped
+    TELEMETRY_RETENTION_DAYS: int = 7  # 0 keeps everything
+    
+    # Startup warm-up (/api/health/ready)
+    WARMUP_TIMEOUT_SECONDS: float = 20.0  # Per step; a slow upstream doesn't hold readiness
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
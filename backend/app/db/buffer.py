@@ -0,0 +1,145 @@
+"""
+Write-behind buffer for high-frequency rows
+
+Telemetry (queue speed, activity progress, upstream latency samples) is
+produced far more often than it is worth committing. Rows are appended to
+an in-memory buffer and written in batches - when batch_size rows have
+accumulated or flush_interval has passed, whichever comes first. A batch
+is one statement: COPY on PostgreSQL (psycopg2), an executemany of a
+single prepared INSERT elsewhere, applied through the single-writer queue
+so it group-commits with other writes on SQLite.
+
+Adding a row is a list append. When the database falls behind and
+max_pending rows are waiting, add() blocks until a batch has been taken -
+producers slow down instead of memory growing without bound. Producers on
+a request path use add_nowait(), which never waits: it drops the row and
+counts it in `dropped` instead. close() writes whatever is left.
+"""
+import asyncio
+import csv
+import io
+from typing import Iterable, List, Optional
+
+from loguru import logger
+from sqlalchemy import Table
+from sqlalchemy.orm import Session
+
+from app.db.writer import db_writer
+
+# COPY NULL marker (an unquoted empty field stays an empty string)
+_COPY_NULL = r"\N"
+
+
+class WriteBuffer:
+    """Batches rows for one table and writes them behind the producer's back"""
+
+    def __init__(self, table: Table, batch_size: int = 1000, flush_interval: float = 1.0, max_pending: int = 10000):
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max(max_pending, batch_size)
+        self.written = 0
+        self.dropped = 0
+        self._rows: List[dict] = []
+        self._closing = False
+        self._full: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def pending(self) -> int:
+        """Rows waiting to be written"""
+        return len(self._rows)
+
+    def _ensure_flusher(self):
+        loop = asyncio.get_running_loop()
+        if self._flusher is None or self._flusher.done() or self._loop is not loop:
+            self._loop = loop
+            self._closing = False
+            self._full = asyncio.Event()
+            self._space = asyncio.Event()
+            self._flusher = loop.create_task(self._run())
+
+    async def add(self, row: dict):
+        """Buffer one row (waits while the buffer is full)"""
+        self._ensure_flusher()
+        while len(self._rows) >= self.max_pending:
+            self._space.clear()
+            await self._space.wait()
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self._full.set()
+
+    def add_nowait(self, row: dict) -> bool:
+        """Buffer one row, or drop it when the buffer is full (returns whether it was kept)"""
+        self._ensure_flusher()
+        if len(self._rows) >= self.max_pending:
+            self.dropped += 1
+            return False
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self._full.set()
+        return True
+
+    async def add_many(self, rows: Iterable[dict]):
+        """Buffer several rows"""
+        for row in rows:
+            await self.add(row)
+
+    async def close(self):
+        """Write everything buffered, then stop the flusher"""
+        if self._flusher is None or self._flusher.done():
+            return
+        self._closing = True
+        self._full.set()
+        await self._flusher
+        self._flusher = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            while self._rows:
+                batch, self._rows = self._rows[:self.batch_size], self._rows[self.batch_size:]
+                self._space.set()
+                try:
+                    await db_writer.run(lambda db: self._insert(db, batch))
+                    self.written += len(batch)
+                except Exception as e:
+                    self.dropped += len(batch)
+                    logger.error(f"Dropped {len(batch)} buffered {self.table.name} rows: {str(e)}")
+                if len(self._rows) < self.batch_size and not self._closing:
+                    break  # Partial batch - wait for more rows or the interval
+            if self._closing and not self._rows:
+                return
+
+    def _insert(self, db: Session, rows: List[dict]):
+        """Write one batch (write job, see app.db.writer)"""
+        connection = db.connection()
+        if connection.dialect.name == "postgresql":
+            cursor = connection.connection.cursor()
+            try:
+                if hasattr(cursor, "copy_expert"):
+                    self._copy(cursor, rows)
+                    return
+            finally:
+                cursor.close()
+        db.execute(self.table.insert(), rows)
+
+    def _copy(self, cursor, rows: List[dict]):
+        """COPY rows in as CSV (psycopg2)"""
+        columns = list(rows[0])
+        data = io.StringIO()
+        writer = csv.writer(data)
+        for row in rows:
+            writer.writerow([_COPY_NULL if row.get(c) is None else row.get(c) for c in columns])
+        data.seek(0)
+        cursor.copy_expert(
+            f"COPY {self.table.name} ({', '.join(columns)}) FROM STDIN "
+            f"WITH (FORMAT csv, NULL '{_COPY_NULL}')",
+            data,
+        )
@@ -0,0 +1,112 @@
+"""
+Schema migrations
+
+create_all creates missing tables (with their indexes) but never changes
+an existing one. Changes to existing tables are migrations: named steps in
+MIGRATIONS, applied once, in order, and recorded in schema_migrations.
+
+Every migration must be idempotent - it inspects before it alters - since
+a database may have been created by create_all with the change already in
+place, or fixed earlier by one of the standalone migrate_* scripts.
+"""
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+
+from loguru import logger
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+
+# Bookkeeping tables - not part of the models' metadata or fingerprint
+bookkeeping = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations", bookkeeping,
+    Column("name", String, primary_key=True),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+class Migration(NamedTuple):
+    name: str
+    apply: Callable[[Connection], None]
+    # False for statements that cannot run inside a transaction
+    transactional: bool = True
+
+
+def _scan_history_columns(conn: Connection):
+    """Columns added to scan_history after its first release"""
+    inspector = inspect(conn)
+    if not inspector.has_table("scan_history"):
+        return
+    existing = {column["name"] for column in inspector.get_columns("scan_history")}
+    for name, definition in (
+        ("library_type", "VARCHAR"),
+        ("scan_type", "VARCHAR DEFAULT 'full'"),
+        ("path", "VARCHAR"),
+        ("duration_seconds", "FLOAT"),
+    ):
+        if name not in existing:
+            logger.info(f"Adding scan_history.{name}")
+            conn.execute(text(f"ALTER TABLE scan_history ADD COLUMN {name} {definition}"))
+
+
+def _scan_history_indexes(conn: Connection):
+    """Composite indexes for scan history pagination and the dashboard"""
+    from app.models.plex import ScanHistory
+
+    table = ScanHistory.__tablename__
+    inspector = inspect(conn)
+    if not inspector.has_table(table):
+        return
+    existing = {index["name"] for index in inspector.get_indexes(table)}
+    # CONCURRENTLY keeps a large table writable; it needs autocommit
+    concurrently = "CONCURRENTLY " if conn.dialect.name == "postgresql" else ""
+    created = False
+    for index in ScanHistory.__table__.indexes:
+        if index.name in existing:
+            continue
+        columns = ", ".join(column.name for column in index.columns)
+        logger.info(f"Creating {index.name} ({columns})")
+        conn.execute(text(f"CREATE INDEX {concurrently}IF NOT EXISTS {index.name} ON {table} ({columns})"))
+        created = True
+    if created:
+        # Refresh planner statistics so the new indexes are picked up
+        conn.execute(text(f"ANALYZE {table}"))
+
+
+MIGRATIONS: List[Migration] = [
+    Migration("0001_scan_history_columns", _scan_history_columns),
+    Migration("0002_scan_history_indexes", _scan_history_indexes, transactional=False),
+]
+
+
+def applied_migrations(engine: Engine) -> List[str]:
+    """Names of the migrations already applied"""
+    schema_migrations.create(engine, checkfirst=True)
+    with engine.connect() as conn:
+        return list(conn.execute(select(schema_migrations.c.name)).scalars())
+
+
+def run_migrations(engine: Engine) -> List[str]:
+    """
+    Apply pending migrations in order
+
+    Returns:
+        Names of the migrations applied
+    """
+    done = set(applied_migrations(engine))
+    applied = []
+    for migration in MIGRATIONS:
+        if migration.name in done:
+            continue
+        logger.info(f"Applying migration {migration.name}")
+        if migration.transactional:
+            with engine.begin() as conn:
+                migration.apply(conn)
+                conn.execute(insert(schema_migrations).values(name=migration.name, applied_at=datetime.utcnow()))
+        else:
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                migration.apply(conn)
+                conn.execute(insert(schema_migrations).values(name=migration.name, applied_at=datetime.utcnow()))
+        applied.append(migration.name)
+    return applied
@@ -0,0 +1,78 @@
+"""
+Read replica health
+
+Read-only routes may be served from a PostgreSQL streaming replica
+(DATABASE_READ_URL). A replica that has fallen too far behind would serve
+stale data, so its replay lag is checked - at most every check_interval
+seconds, cached in between - and reads fall back to the primary while the
+lag exceeds max_lag or the replica is unreachable.
+"""
+import time
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Seconds the replica is behind. A replica that has replayed everything it
+# received is current even if the last transaction is old (idle primary);
+# a server that is not in recovery is the primary itself.
+LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+
+class ReplicaHealth:
+    """Cached replay lag of the read replica"""
+
+    def __init__(self, max_lag: float, check_interval: float):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag: Optional[float] = None  # None = unknown or unreachable
+        self._checked_at: Optional[float] = None
+
+    @property
+    def usable(self) -> bool:
+        """Whether reads may go to the replica"""
+        return self.lag is not None and self.lag <= self.max_lag
+
+    def _due(self) -> bool:
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now  # Claim the check so concurrent requests don't repeat it
+        return True
+
+    def _update(self, lag: Optional[float], error: Optional[Exception] = None):
+        was_usable = self.usable
+        self.lag = lag
+        if was_usable and not self.usable:
+            reason = f"unreachable: {str(error)}" if error else f"{lag:.1f}s behind"
+            logger.warning(f"Read replica {reason} - serving reads from the primary")
+        elif self.usable and not was_usable:
+            logger.info(f"Read replica in sync ({lag:.1f}s behind) - serving reads from the replica")
+
+    def check(self, engine: Engine) -> bool:
+        """Refresh the lag if due (sync engine) and return whether the replica is usable"""
+        if self._due():
+            try:
+                with engine.connect() as conn:
+                    self._update(float(conn.execute(LAG_QUERY).scalar()))
+            except Exception as e:
+                self._update(None, e)
+        return self.usable
+
+    async def check_async(self, engine: AsyncEngine) -> bool:
+        """Refresh the lag if due (async engine) and return whether the replica is usable"""
+        if self._due():
+            try:
+                async with engine.connect() as conn:
+                    self._update(float((await conn.execute(LAG_QUERY)).scalar()))
+            except Exception as e:
+                self._update(None, e)
+        return self.usable
@@ -0,0 +1,101 @@
+"""
+Versioned schema bootstrap
+
+create_all checks every table on each start, and on a remote PostgreSQL
+each check is a round trip. Instead, a fingerprint of the schema the code
+expects - the CREATE TABLE / CREATE INDEX DDL of every model for the
+database's dialect, plus the names of all migrations - is stored in
+schema_state once the database matches it. On startup a single query
+compares the two; only when they differ (first run, new model, new
+migration) are create_all and the migration runner invoked.
+
+Instances starting together on PostgreSQL serialize the slow path on an
+advisory lock, so only one of them builds the schema.
+"""
+import hashlib
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import Column, DateTime, Integer, String, Table, delete, insert, select, text
+from sqlalchemy.engine import Dialect, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.db.migrations import MIGRATIONS, bookkeeping, run_migrations
+from app.models.base import Base
+
+schema_state = Table(
+    "schema_state", bookkeeping,
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+# pg_advisory_lock key for schema bootstrap
+SCHEMA_LOCK_KEY = 0x746F7461
+
+
+def schema_fingerprint(dialect: Dialect) -> str:
+    """Hash of the DDL of all models (as imported) and the migration names"""
+    digest = hashlib.sha256()
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    for migration in MIGRATIONS:
+        digest.update(migration.name.encode())
+    return digest.hexdigest()
+
+
+def stored_fingerprint(engine: Engine) -> Optional[str]:
+    """Fingerprint recorded by the last bootstrap (None if never bootstrapped)"""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(schema_state.c.fingerprint).where(schema_state.c.id == 1)).scalar()
+    except DBAPIError:
+        return None  # No schema_state table yet
+
+
+def _store_fingerprint(engine: Engine, fingerprint: str):
+    schema_state.create(engine, checkfirst=True)
+    with engine.begin() as conn:
+        conn.execute(delete(schema_state))
+        conn.execute(insert(schema_state).values(id=1, fingerprint=fingerprint, updated_at=datetime.utcnow()))
+
+
+@contextmanager
+def _advisory_lock(engine: Engine):
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SCHEMA_LOCK_KEY})
+
+
+def bootstrap_schema(engine: Engine) -> bool:
+    """
+    Bring the database up to the models' schema unless it already is
+
+    Models must be imported first. Returns True if the schema was checked
+    and built (create_all and migrations ran), False if the stored
+    fingerprint matched and nothing had to be done.
+    """
+    fingerprint = schema_fingerprint(engine.dialect)
+    if stored_fingerprint(engine) == fingerprint:
+        return False
+
+    lock = _advisory_lock(engine) if engine.dialect.name == "postgresql" else nullcontext()
+    with lock:
+        if stored_fingerprint(engine) == fingerprint:
+            return False  # Another instance finished it while we waited
+        Base.metadata.create_all(bind=engine)
+        applied = run_migrations(engine)
+        _store_fingerprint(engine, fingerprint)
+    logger.info(
+        f"Database schema updated (fingerprint {fingerprint[:12]}"
+        + (f", migrations: {', '.join(applied)})" if applied else ")")
+    )
+    return True
@@ -1,10 +1,48 @@
 """
 Database configuration and session management
 Handles both PostgreSQL and SQLite
+
+Two engines share one database: request handlers use the async engine
+(asyncpg / aiosqlite) through get_async_db, so waiting on the database
+never blocks the event loop. The sync engine remains for startup, scripts
+and the write queue (app.db.writer), which applies writes in a worker
+thread.
+
+Read-only routes use get_read_db / get_async_read_db instead. With
+DATABASE_READ_URL set (PostgreSQL replica) those sessions go to the
+replica while its replay lag is within DB_REPLICA_MAX_LAG_SECONDS, and to
+the primary otherwise; without it they are ordinary primary sessions.
 """
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.replica import ReplicaHealth
+from app.db.sqlite import tune_engine
+
+# Async drivers per backend
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def async_database_url(url: str) -> str:
+    """Same database, async driver (e.g. postgresql:// -> postgresql+asyncpg://)"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver for database '{parsed.get_backend_name()}'")
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+def _pool_options() -> dict:
+    """Connection pool sizing (server databases only)"""
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
 
 # Configure engine based on database type
 if settings.DATABASE_URL.startswith('sqlite'):
@@ -14,14 +52,57 @@ if settings.DATABASE_URL.startswith('sqlite'):
         connect_args={"check_same_thread": False},  # Needed for SQLite
         pool_pre_ping=True
     )
+    async_engine = create_async_engine(
+        async_database_url(settings.DATABASE_URL),
+        pool_pre_ping=True
+    )
+    if settings.SQLITE_TUNING_ENABLED:
+        tune_engine(engine)
+        tune_engine(async_engine.sync_engine)
 else:
     # PostgreSQL configuration
     engine = create_engine(
         settings.DATABASE_URL,
-        pool_pre_ping=True
+        pool_pre_ping=True,
+        **_pool_options()
+    )
+    async_engine = create_async_engine(
+        async_database_url(settings.DATABASE_URL),
+        pool_pre_ping=True,
+        **_pool_options()
+    )
+
+# Optional read replica (server databases only)
+if settings.DATABASE_READ_URL and not settings.DATABASE_URL.startswith('sqlite'):
+    read_engine = create_engine(
+        settings.DATABASE_READ_URL,
+        pool_pre_ping=True,
+        **_pool_options()
+    )
+    async_read_engine = create_async_engine(
+        async_database_url(settings.DATABASE_READ_URL),
+        pool_pre_ping=True,
+        **_pool_options()
     )
+else:
+    read_engine, async_read_engine = engine, async_engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# expire_on_commit=False: attributes stay loaded after commit, since lazy
+# refreshes are not possible outside an await
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(
+    async_read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+replica = ReplicaHealth(settings.DB_REPLICA_MAX_LAG_SECONDS, settings.DB_REPLICA_CHECK_INTERVAL)
+
+
+def has_replica() -> bool:
+    """Whether a separate read replica is configured"""
+    return read_engine is not engine
 
 
 def get_db():
@@ -33,9 +114,37 @@ def get_db():
         db.close()
 
 
-def init_db():
-    """Initialize database tables"""
-    from app.models.base import Base
-    from app.models import plex, integrations  # Import all models
-    
-    Base.metadata.create_all(bind=engine)
+async def get_async_db():
+    """Dependency for getting an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db():
+    """Dependency for read-only routes: the replica unless it lags behind"""
+    use_replica = has_replica() and replica.check(read_engine)
+    db = (ReadSessionLocal if use_replica else SessionLocal)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    """Dependency for read-only routes (async): the replica unless it lags behind"""
+    use_replica = has_replica() and await replica.check_async(async_read_engine)
+    async with (AsyncReadSessionLocal if use_replica else AsyncSessionLocal)() as db:
+        yield db
+
+
+def init_db() -> bool:
+    """
+    Initialize database tables and apply migrations
+
+    Skipped when the stored schema fingerprint matches (see app.db.schema).
+    Returns True if the schema had to be built.
+    """
+    from app.models import plex, integrations, library, telemetry  # Import all models
+    from app.db.schema import bootstrap_schema
+
+    return bootstrap_schema(engine)
@@ -0,0 +1,50 @@
+"""
+SQLite production profile
+
+Per-connection pragmas for the SQLite backend:
+- WAL journal: readers never block the writer and the writer never blocks
+  readers.
+- synchronous=NORMAL: safe with WAL and fsyncs only at checkpoints.
+- A larger page cache and memory-mapped reads.
+- A busy timeout, so a connection waits for the write lock instead of
+  failing with "database is locked".
+
+Concurrent writers still take turns, which is what app.db.writer arranges.
+"""
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+
+def sqlite_pragmas() -> Dict[str, object]:
+    """Pragmas applied to every new connection, in order"""
+    return {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB,  # Negative = KiB, not pages
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "temp_store": "MEMORY",
+    }
+
+
+def apply_pragmas(dbapi_connection, connection_record):
+    """Engine connect listener (works for pysqlite and aiosqlite)"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def tune_engine(engine: Engine):
+    """
+    Apply the profile to every connection of an engine
+
+    For an AsyncEngine pass its sync_engine.
+    """
+    event.listen(engine, "connect", apply_pragmas)
@@ -0,0 +1,168 @@
+"""
+Single-writer queue for database writes
+
+SQLite allows one writer at a time. Concurrent writers hold transactions
+against each other, spin on the busy timeout and eventually fail with
+"database is locked". Instead, writes are queued and applied by a single
+worker while reads, which go through their own sessions, stay fully
+concurrent under WAL.
+
+A write job is a plain function taking a sync Session. The worker
+group-commits: whatever queued up while the previous batch was being
+written is applied in one worker-thread hop, in one BEGIN IMMEDIATE
+transaction, with each job in its own SAVEPOINT so a failing job only
+rolls back itself. On PostgreSQL the queue is a pass-through - every job
+simply gets its own session and transaction in a worker thread.
+"""
+import asyncio
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.db.session import engine
+
+T = TypeVar("T")
+Job = Callable[[Session], T]
+
+_STOP = object()
+
+
+def _resolve(future: asyncio.Future, result=None, error: Optional[BaseException] = None):
+    if future.done():
+        return  # Caller gave up (cancelled)
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class WriteQueue:
+    """Queue of write jobs applied by one worker"""
+
+    # Most jobs committed in one transaction
+    MAX_BATCH = 100
+
+    def __init__(self, session_factory: Callable[[], Session], serialize: bool):
+        self._session_factory = session_factory
+        self.serialize = serialize
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def pending(self) -> int:
+        """Jobs waiting for the worker"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _enqueue(self, job: Job) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        future = loop.create_future()
+        self._queue.put_nowait((job, future))
+        return future
+
+    async def run(self, job: Job) -> T:
+        """
+        Apply a write job and return its result
+
+        The job runs in a worker thread, receives a session and must do all
+        of its reads-for-update and mutations through it; it is committed
+        by the queue. Keep slow work (network calls) out of jobs.
+        """
+        if not self.serialize:
+            return await asyncio.to_thread(self._apply_one, job)
+        # Once queued the write happens, even if the caller goes away
+        return await asyncio.shield(self._enqueue(job))
+
+    async def add(self, *objects):
+        """Insert or update ORM objects (ids are populated on return)"""
+        def job(db: Session):
+            db.add_all(objects)
+            db.flush()
+        await self.run(job)
+
+    async def close(self):
+        """Apply everything queued, then stop the worker"""
+        if self._worker is None or self._worker.done():
+            return
+        self._queue.put_nowait(_STOP)
+        await self._worker
+        self._worker = None
+
+    async def _run(self):
+        while True:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+            batch, stop = [item], False
+            while len(batch) < self.MAX_BATCH and not self._queue.empty():
+                queued = self._queue.get_nowait()
+                if queued is _STOP:
+                    stop = True
+                    break
+                batch.append(queued)
+            try:
+                outcomes = await asyncio.to_thread(self._apply, [job for job, _ in batch])
+            except Exception as e:
+                logger.error(f"Database write batch of {len(batch)} failed: {str(e)}")
+                outcomes = [(None, e)] * len(batch)
+            for (_, future), (result, error) in zip(batch, outcomes):
+                _resolve(future, result, error)
+            if stop:
+                return
+
+    def _apply_one(self, job: Job) -> T:
+        """Run one job in its own transaction (worker thread)"""
+        db = self._session_factory()
+        try:
+            result = job(db)
+            db.commit()
+            return result
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _apply(self, jobs: List[Job]) -> List[Tuple[object, Optional[Exception]]]:
+        """Run a batch of jobs in one transaction (worker thread)"""
+        db = self._session_factory()
+        try:
+            # Take the write lock up front instead of upgrading later
+            db.execute(text("BEGIN IMMEDIATE"))
+            if len(jobs) == 1:
+                # Nothing to isolate - a failing job rolls back the transaction
+                try:
+                    outcomes = [(jobs[0](db), None)]
+                except Exception as e:
+                    db.rollback()
+                    return [(None, e)]
+            else:
+                outcomes = []
+                for job in jobs:
+                    try:
+                        with db.begin_nested():
+                            outcomes.append((job(db), None))
+                    except Exception as e:
+                        outcomes.append((None, e))
+            db.commit()
+            return outcomes
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+# Global singleton instance
+# expire_on_commit=False: callers keep using the objects they handed over
+db_writer = WriteQueue(
+    sessionmaker(bind=engine, autoflush=False, expire_on_commit=False),
+    serialize=settings.DATABASE_URL.startswith("sqlite") and settings.SQLITE_SINGLE_WRITER,
+)
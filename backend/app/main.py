@@ -15,7 +15,7 @@ if not initialize():
     sys.exit(1)
 
 from app.core.config import settings
-from app.api.routes import health, plex, library, scanning, dashboard, integrations, sabnzbd, sonarr, radarr, prowlarr, statistics
+from app.api.loader import RouterGate, RouterLoader
 
 # Configure logger - create logs directory if it doesn't exist
 os.makedirs("logs", exist_ok=True)
@@ -42,20 +42,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
-# Include routers
-app.include_router(health.router, prefix="/api", tags=["health"])
-app.include_router(plex.router, prefix="/api/plex", tags=["plex"])
-app.include_router(library.router, prefix="/api/library", tags=["library"])
-app.include_router(scanning.router, prefix="/api/scan", tags=["scanning"])
-app.include_router(dashboard.router, prefix="/api", tags=["dashboard"])
-app.include_router(integrations.router, prefix="/api", tags=["integrations"])
-app.include_router(sabnzbd.router, prefix="/api", tags=["sabnzbd"])
-app.include_router(sonarr.router, prefix="/api", tags=["sonarr"])
-app.include_router(radarr.router, prefix="/api", tags=["radarr"])
-app.include_router(prowlarr.router, prefix="/api", tags=["prowlarr"])
-app.include_router(statistics.router, prefix="/api", tags=["statistics"])
+# Include routers - health now, the rest in the background once started
+routers = RouterLoader(app)
+routers.include_eager()
+app.add_middleware(RouterGate, loader=routers)
 
 
 @app.on_event("startup")
@@ -64,47 +57,54 @@ async def startup_event():
     logger.info("Starting Totarr application")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Database: {settings.DATABASE_URL.split('@')[1] if '@' in settings.DATABASE_URL else 'SQLite'}")
+    if not settings.PLEX_WEBHOOK_SECRET:
+        logger.warning("PLEX_WEBHOOK_SECRET is not set - /api/plex/webhook accepts posts from anyone who can reach the backend")
     
-    # Log all registered routes for debugging
-    logger.info("Registered routes:")
-    for route in app.routes:
-        if hasattr(route, 'path'):
-            logger.info(f"  {route.methods if hasattr(route, 'methods') else 'N/A'} {route.path}")
+    # Import and register the remaining routers (routes are logged at DEBUG)
+    routers.start()
     
-    # Initialize database tables
-    try:
-        from app.db.session import init_db
-        init_db()
-        logger.info("Database initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize database: {e}")
-        # Don't raise - allow app to start even if DB init fails
-        # This way we can still access API docs
-    
-    # Load Plex configuration from database
-    try:
-        from app.db.session import SessionLocal
-        from app.models.plex import PlexServerConfig
-        from app.services.plex.connection import plex_connection
-        
-        db = SessionLocal()
-        try:
-            config = db.query(PlexServerConfig).first()
-            if config:
-                plex_connection.set_config(config.url, config.token)
-                logger.info(f"Loaded Plex config from database: {config.name}")
-            else:
-                logger.info("No Plex configuration found in database")
-        finally:
-            db.close()
-    except Exception as e:
-        logger.error(f"Failed to load Plex config: {e}")
+    # Schema, Plex connection, integration pools and caches in the background;
+    # /api/health/ready reports when it is done
+    from app.services.warmup import warmup
+    warmup.start(routes=routers.check)
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Application shutdown tasks"""
     logger.info("Shutting down Totarr application")
+    
+    from app.services.warmup import warmup
+    await warmup.stop()
+    
+    from app.services.plex.events import plex_notifications
+    await plex_notifications.stop()
+    
+    from app.services.library.index import library_index
+    await library_index.stop()
+    
+    from app.services.library.inventory import media_inventory
+    await media_inventory.stop()
+    
+    from app.services.library.prefetch import poster_prefetcher
+    await poster_prefetcher.stop()
+    
+    from app.services.scans.retention import scan_retention
+    await scan_retention.stop()
+    
+    from app.services.telemetry import telemetry
+    await telemetry.stop()
+    
+    from app.services.http import close_http_client
+    await close_http_client()
+    
+    from app.db.writer import db_writer
+    await db_writer.close()
+    
+    from app.db.session import async_engine, async_read_engine
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
 
 
 if __name__ == "__main__":
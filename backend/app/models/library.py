@@ -0,0 +1,148 @@
+"""
+Local index of Plex library items
+
+A compact copy of every top-level item (movie, show, artist) across all
+sections. It backs full-text search without touching Plex: SQLite gets an
+FTS5 external-content table kept in sync by triggers, PostgreSQL a GIN
+index over a tsvector expression.
+
+library_item_guids maps indexed items to their external ids (tmdb, tvdb,
+imdb) for cross-referencing with Radarr and Sonarr. library_changes is an
+append-only log of index changes whose id is the change feed cursor.
+media_parts holds one compact row per media file for inventory reports.
+"""
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, DDL, Index, event
+from datetime import datetime
+from app.models.base import Base, TimestampMixin
+
+
+class LibraryItem(Base, TimestampMixin):
+    """
+    One indexed Plex item
+    """
+    __tablename__ = "library_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    rating_key = Column(String, nullable=False, unique=True, index=True)
+    section_key = Column(String, nullable=False, index=True)
+    type = Column(String, nullable=False)  # 'movie', 'show', 'artist', ...
+    title = Column(String, nullable=False)
+    original_title = Column(String, nullable=True)
+    year = Column(Integer, nullable=True)
+    file_path = Column(String, nullable=True)  # Media file (movies) or folder (shows)
+    plex_added_at = Column(DateTime, nullable=True)
+    plex_updated_at = Column(DateTime, nullable=True)
+
+
+class LibraryItemGuid(Base):
+    """
+    External id of an indexed item, e.g. provider='tmdb', external_id='603'
+    """
+    __tablename__ = "library_item_guids"
+    __table_args__ = (
+        Index("ix_library_item_guids_lookup", "provider", "external_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    rating_key = Column(String, nullable=False, index=True)
+    provider = Column(String, nullable=False)  # 'tmdb', 'tvdb', 'imdb'
+    external_id = Column(String, nullable=False)
+
+
+class LibraryChange(Base):
+    """
+    One added / updated / removed item in the library change feed
+
+    The autoincrement id is the feed cursor; AUTOINCREMENT on SQLite keeps
+    ids from being reused after old entries are pruned.
+    """
+    __tablename__ = "library_changes"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True)
+    section_key = Column(String, nullable=False, index=True)
+    rating_key = Column(String, nullable=False)
+    change = Column(String, nullable=False)  # 'added', 'updated', 'removed'
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+class MediaPart(Base, TimestampMixin):
+    """
+    One media file (Plex Media/Part) of a movie, episode or track
+    """
+    __tablename__ = "media_parts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    rating_key = Column(String, nullable=False, index=True)
+    section_key = Column(String, nullable=False, index=True)
+    item_type = Column(String, nullable=False)
+    title = Column(String, nullable=False)
+    file = Column(String, nullable=True)
+    container = Column(String, nullable=True)  # 'mkv', 'mp4', ...
+    video_codec = Column(String, nullable=True)  # 'hevc', 'h264', ...
+    video_resolution = Column(String, nullable=True)  # '4k', '1080', ...
+    video_profile = Column(String, nullable=True)
+    audio_codec = Column(String, nullable=True)
+    audio_channels = Column(Integer, nullable=True)
+    bitrate = Column(Integer, nullable=True)  # kbps
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    duration = Column(BigInteger, nullable=True)  # ms
+    size = Column(BigInteger, nullable=True, index=True)  # bytes
+    remux = Column(Boolean, nullable=False, default=False)
+    plex_updated_at = Column(DateTime, nullable=True)
+
+
+SEARCH_COLUMNS = "title, original_title, year, file_path"
+
+# tsvector expression used by both the PostgreSQL index and search queries -
+# they must match exactly for the planner to use the index. Path separators
+# are turned into spaces so folder and file names become separate words.
+PG_SEARCH_VECTOR = (
+    "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(original_title, '') || ' ' || "
+    "coalesce(CAST(year AS TEXT), '') || ' ' || "
+    "regexp_replace(coalesce(file_path, ''), '[/\\\\._-]+', ' ', 'g'))"
+)
+
+_sqlite_search_ddl = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS library_search USING fts5(
+        {SEARCH_COLUMNS},
+        content='library_items', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS library_items_ai AFTER INSERT ON library_items BEGIN
+        INSERT INTO library_search(rowid, {SEARCH_COLUMNS})
+        VALUES (new.id, new.title, new.original_title, new.year, new.file_path);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS library_items_ad AFTER DELETE ON library_items BEGIN
+        INSERT INTO library_search(library_search, rowid, {SEARCH_COLUMNS})
+        VALUES ('delete', old.id, old.title, old.original_title, old.year, old.file_path);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS library_items_au AFTER UPDATE ON library_items BEGIN
+        INSERT INTO library_search(library_search, rowid, {SEARCH_COLUMNS})
+        VALUES ('delete', old.id, old.title, old.original_title, old.year, old.file_path);
+        INSERT INTO library_search(rowid, {SEARCH_COLUMNS})
+        VALUES (new.id, new.title, new.original_title, new.year, new.file_path);
+    END
+    """,
+]
+
+for statement in _sqlite_search_ddl:
+    event.listen(
+        LibraryItem.__table__, "after_create",
+        DDL(statement).execute_if(dialect="sqlite")
+    )
+
+event.listen(
+    LibraryItem.__table__, "after_create",
+    DDL(
+        f"CREATE INDEX IF NOT EXISTS ix_library_items_search ON library_items USING GIN ({PG_SEARCH_VECTOR})"
+    ).execute_if(dialect="postgresql")
+)
@@ -1,7 +1,7 @@
 """
 Plex server configuration model
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, Float, Index, UniqueConstraint
 from app.models.base import Base, TimestampMixin
 
 
@@ -26,8 +26,17 @@ class PlexServerConfig(Base, TimestampMixin):
 class ScanHistory(Base, TimestampMixin):
     """
     Stores history of library scans
+    
+    The composite indexes match the access paths: history per library
+    newest first (keyset paginated on started_at, id), recent scans across
+    all libraries, and the latest completed scan.
     """
     __tablename__ = "scan_history"
+    __table_args__ = (
+        Index("ix_scan_history_library_started", "library_key", "started_at", "id"),
+        Index("ix_scan_history_started", "started_at", "id"),
+        Index("ix_scan_history_status_completed", "status", "completed_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     library_key = Column(String, nullable=False)
@@ -42,6 +51,33 @@ class ScanHistory(Base, TimestampMixin):
     duration_seconds = Column(Float, nullable=True)  # NEW: Duration in seconds
 
 
+class ScanHistoryDaily(Base, TimestampMixin):
+    """
+    Daily per-library rollup of scan_history
+
+    Scan history rows past the retention age are folded into one row per
+    library and day before they are purged. Percentiles are over completed
+    scans with a recorded duration.
+    """
+    __tablename__ = "scan_history_daily"
+    __table_args__ = (
+        UniqueConstraint("day", "library_key", name="uq_scan_history_daily_day_library"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)
+    library_key = Column(String, nullable=False)
+    library_name = Column(String, nullable=False)
+    library_type = Column(String, nullable=False)
+    scans = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    failures = Column(Integer, nullable=False, default=0)
+    total_duration_seconds = Column(Float, nullable=False, default=0.0)
+    p50_duration_seconds = Column(Float, nullable=True)
+    p95_duration_seconds = Column(Float, nullable=True)
+    max_duration_seconds = Column(Float, nullable=True)
+
+
 class UserSettings(Base, TimestampMixin):
     """
     Stores user preferences and settings
@@ -0,0 +1,27 @@
+"""
+Telemetry samples
+High-frequency measurements (queue speed, activity progress, upstream
+latency), written in batches through app.db.buffer
+"""
+from sqlalchemy import Column, BigInteger, Integer, String, Float, DateTime, Index
+from app.models.base import Base
+
+
+class TelemetrySample(Base):
+    """
+    One measurement of a metric from a source
+
+    No timestamp mixin - rows are append-only and written by the thousand,
+    recorded_at is the only time that matters.
+    """
+    __tablename__ = "telemetry_samples"
+    __table_args__ = (
+        Index("ix_telemetry_samples_metric_recorded", "metric", "source", "recorded_at"),
+        Index("ix_telemetry_samples_recorded", "recorded_at"),
+    )
+    
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    metric = Column(String, nullable=False)  # e.g. 'upstream_latency_ms'
+    source = Column(String, nullable=False)  # e.g. 'plex', 'sonarr', an activity id
+    value = Column(Float, nullable=False)
+    recorded_at = Column(DateTime, nullable=False)
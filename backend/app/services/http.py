@@ -0,0 +1,37 @@
+"""
+Shared HTTP client pool
+A single pooled httpx.AsyncClient reused for outbound calls instead of
+opening a fresh connection for every request
+"""
+import httpx
+from typing import Optional
+from loguru import logger
+
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get (or lazily create) the shared async HTTP client"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+    return _client
+
+
+def set_http_client(client: Optional[httpx.AsyncClient]):
+    """Replace the shared client (used by tests to inject a mock transport)"""
+    global _client
+    _client = client
+
+
+async def close_http_client():
+    """Close the shared client on shutdown"""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+        logger.info("Shared HTTP client closed")
+    _client = None
@@ -7,7 +7,16 @@ from .radarr import RadarrClient
 from .sabnzbd import SabnzbdClient
 from .prowlarr import ProwlarrClient
 
+# IntegrationConfig.service_type -> client class
+CLIENTS = {
+    "sonarr": SonarrClient,
+    "radarr": RadarrClient,
+    "sabnzbd": SabnzbdClient,
+    "prowlarr": ProwlarrClient,
+}
+
 __all__ = [
+    "CLIENTS",
     "BaseIntegrationClient",
     "SonarrClient",
     "RadarrClient",
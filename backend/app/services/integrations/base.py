@@ -1,15 +1,22 @@
 """
 Base client for integration services
-Provides common functionality for API calls
+Provides common functionality for API calls (over the shared HTTP pool)
 """
 import httpx
+import time
 from typing import Optional, Dict, Any
 from loguru import logger
 
+from app.services.http import get_http_client
+from app.services.telemetry import telemetry
+
 
 class BaseIntegrationClient:
     """Base class for integration clients"""
     
+    # Service name used for telemetry (sonarr, radarr, ...)
+    service = "integration"
+    
     def __init__(self, url: str, api_key: str):
         """
         Initialize the client
@@ -55,21 +62,27 @@ class BaseIntegrationClient:
         headers = self._get_headers()
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.request(
-                    method=method,
-                    url=url,
-                    headers=headers,
-                    params=params,
-                    json=json_data,
-                )
-                response.raise_for_status()
-                return response.json()
-                
+            started = time.perf_counter()
+            response = await get_http_client().request(
+                method=method,
+                url=url,
+                headers=headers,
+                params=params,
+                json=json_data,
+                timeout=self.timeout,
+            )
+            self._record_latency(started)
+            response.raise_for_status()
+            return response.json()
+            
         except httpx.HTTPError as e:
             logger.error(f"Request to {url} failed: {str(e)}")
             raise
     
+    def _record_latency(self, started: float):
+        """Record the response time of an upstream request (never waits)"""
+        telemetry.record_nowait("upstream_latency_ms", self.service, (time.perf_counter() - started) * 1000)
+    
     async def test_connection(self) -> tuple[bool, str, Optional[str]]:
         """
         Test connection to the service
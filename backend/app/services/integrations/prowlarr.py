@@ -9,6 +9,8 @@ from .base import BaseIntegrationClient
 class ProwlarrClient(BaseIntegrationClient):
     """Client for Prowlarr API v1"""
     
+    service = "prowlarr"
+    
     async def test_connection(self) -> tuple[bool, str, Optional[str]]:
         """Test connection to Prowlarr"""
         try:
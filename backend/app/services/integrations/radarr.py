@@ -9,6 +9,8 @@ from .base import BaseIntegrationClient
 class RadarrClient(BaseIntegrationClient):
     """Client for Radarr API v3"""
     
+    service = "radarr"
+    
     async def test_connection(self) -> tuple[bool, str, Optional[str]]:
         """Test connection to Radarr"""
         try:
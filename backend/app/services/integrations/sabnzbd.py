@@ -3,13 +3,17 @@ SABnzbd client for download queue and history management
 """
 from typing import Optional, Dict, Any, List
 import httpx
+import time
 from loguru import logger
+from app.services.http import get_http_client
 from .base import BaseIntegrationClient
 
 
 class SabnzbdClient(BaseIntegrationClient):
     """Client for SABnzbd API"""
     
+    service = "sabnzbd"
+    
     async def _request(
         self,
         method: str,
@@ -30,16 +34,18 @@ class SabnzbdClient(BaseIntegrationClient):
         params["apikey"] = self.api_key
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.request(
-                    method=method,
-                    url=url,
-                    params=params,
-                    json=json_data,
-                )
-                response.raise_for_status()
-                return response.json()
-                
+            started = time.perf_counter()
+            response = await get_http_client().request(
+                method=method,
+                url=url,
+                params=params,
+                json=json_data,
+                timeout=self.timeout,
+            )
+            self._record_latency(started)
+            response.raise_for_status()
+            return response.json()
+            
         except httpx.HTTPError as e:
             logger.error(f"Request to {url} failed: {str(e)}")
             raise
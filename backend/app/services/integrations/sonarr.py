@@ -9,6 +9,8 @@ from .base import BaseIntegrationClient
 class SonarrClient(BaseIntegrationClient):
     """Client for Sonarr API v3"""
     
+    service = "sonarr"
+    
     async def test_connection(self) -> tuple[bool, str, Optional[str]]:
         """Test connection to Sonarr"""
         try:
@@ -0,0 +1 @@
+"""Library index services module initialization"""
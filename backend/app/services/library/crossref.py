@@ -0,0 +1,235 @@
+"""
+Cross-service GUID index - Plex library vs Radarr and Sonarr catalogs
+
+Plex items are keyed by their external ids (tmdb/tvdb/imdb) from the local
+library index. Each report is a hash join: the Plex side is a dict from
+external id to ratingKey, and every Radarr/Sonarr entry probes it with its
+own ids, so a comparison is O(n + m) instead of O(n * m). An external id
+maps to every Plex item carrying it - the same movie may be in several
+libraries (e.g. HD and 4K). The Plex side is loaded once, in a worker
+thread, and then patched from library index diffs; the *arr catalogs are
+cached briefly since they have no change feed.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.db.session import SessionLocal
+from app.models.library import LibraryItem, LibraryItemGuid
+from app.services.library.index import library_index, IndexDiff
+
+# Plex item type -> *arr service that manages it
+SERVICE_TYPES = {"radarr": "movie", "sonarr": "show"}
+# External id fields in *arr catalog entries, in probe order
+SERVICE_IDS = {
+    "radarr": (("tmdb", "tmdbId"), ("imdb", "imdbId")),
+    "sonarr": (("tvdb", "tvdbId"), ("imdb", "imdbId"), ("tmdb", "tmdbId")),
+}
+
+
+class PlexGuidIndex:
+    """In-memory external id -> ratingKeys hash tables per Plex item type"""
+
+    def __init__(self):
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        # Diffs received while loading, replayed once loaded
+        self._pending: Optional[List[IndexDiff]] = None
+        self.items: Dict[str, dict] = {}
+        self._keys: Dict[str, Dict[Tuple[str, str], Set[str]]] = {}
+
+    @staticmethod
+    def _read() -> Dict[str, dict]:
+        """Load Plex items and their external ids (blocking - run in a thread)"""
+        items = {}
+        db = SessionLocal()
+        try:
+            for item in db.query(
+                LibraryItem.rating_key, LibraryItem.section_key, LibraryItem.type, LibraryItem.title, LibraryItem.year
+            ).filter(LibraryItem.type.in_(SERVICE_TYPES.values())):
+                items[item.rating_key] = {
+                    "rating_key": item.rating_key,
+                    "library_key": item.section_key,
+                    "type": item.type,
+                    "title": item.title,
+                    "year": item.year,
+                    "guids": [],
+                }
+            for rating_key, provider, external_id in db.query(
+                LibraryItemGuid.rating_key, LibraryItemGuid.provider, LibraryItemGuid.external_id
+            ):
+                item = items.get(rating_key)
+                if item is not None:
+                    item["guids"].append(f"{provider}://{external_id}")
+        finally:
+            db.close()
+        return items
+
+    def _add_keys(self, item: dict):
+        keys = self._keys.setdefault(item["type"], {})
+        for guid in item["guids"]:
+            provider, _, external_id = guid.partition("://")
+            keys.setdefault((provider, external_id), set()).add(item["rating_key"])
+
+    def _remove(self, rating_key: str):
+        item = self.items.pop(rating_key, None)
+        if item is None:
+            return
+        keys = self._keys.get(item["type"], {})
+        for guid in item["guids"]:
+            provider, _, external_id = guid.partition("://")
+            rating_keys = keys.get((provider, external_id))
+            if rating_keys is not None:
+                rating_keys.discard(rating_key)
+                if not rating_keys:
+                    del keys[(provider, external_id)]
+
+    async def ensure_loaded(self):
+        """Load from the library index on first use (off the event loop)"""
+        async with self._lock:
+            if self._loaded:
+                return
+            self._pending = []
+            try:
+                self.items = await asyncio.to_thread(self._read)
+                self._keys = {}
+                for item in self.items.values():
+                    self._add_keys(item)
+                self._loaded = True
+                # Writes that raced the load; applying one twice is harmless
+                for diff in self._pending:
+                    self.on_index_diff(diff)
+            finally:
+                self._pending = None
+
+    def on_index_diff(self, diff: IndexDiff):
+        """Library index listener - patch the hash tables"""
+        if not self._loaded:
+            if self._pending is not None:
+                self._pending.append(diff)
+            return  # Otherwise loaded from the database on first use
+        for row in diff.removed:
+            self._remove(row["rating_key"])
+        for row in diff.added + diff.updated:
+            self._remove(row["rating_key"])
+            if row["type"] not in SERVICE_TYPES.values():
+                continue
+            item = {
+                "rating_key": row["rating_key"],
+                "library_key": row["section_key"],
+                "type": row["type"],
+                "title": row["title"],
+                "year": row["year"],
+                "guids": list(row["guids"]),
+            }
+            self.items[item["rating_key"]] = item
+            self._add_keys(item)
+
+    def lookup(self, item_type: str) -> Dict[Tuple[str, str], Set[str]]:
+        """Hash table for one item type (after ensure_loaded)"""
+        return self._keys.get(item_type, {})
+
+    def of_type(self, item_type: str) -> List[dict]:
+        """Plex items of one type (after ensure_loaded)"""
+        return [item for item in self.items.values() if item["type"] == item_type]
+
+
+def catalog_keys(service: str, entry: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """External ids of a Radarr/Sonarr entry in probe order"""
+    keys = []
+    for provider, field in SERVICE_IDS[service]:
+        value = entry.get(field)
+        if value not in (None, "", 0):
+            keys.append((provider, str(value)))
+    return keys
+
+
+def _catalog_entry(service: str, entry: Dict[str, Any]) -> dict:
+    """Compact view of a Radarr movie / Sonarr series for reports"""
+    if service == "radarr":
+        has_file = bool(entry.get("hasFile"))
+    else:
+        has_file = (entry.get("statistics") or {}).get("episodeFileCount", 0) > 0
+    return {
+        "id": entry.get("id"),
+        "title": entry.get("title"),
+        "year": entry.get("year"),
+        "monitored": bool(entry.get("monitored")),
+        "has_file": has_file,
+        "guids": [f"{provider}://{value}" for provider, value in catalog_keys(service, entry)],
+    }
+
+
+class CrossReference:
+    """Joins the Plex GUID index with Radarr and Sonarr catalogs"""
+
+    CATALOG_TTL = 300.0
+
+    def __init__(self):
+        self.plex = PlexGuidIndex()
+        self._catalogs: Dict[str, Tuple[str, float, List[Dict[str, Any]]]] = {}
+
+    async def catalog(
+        self,
+        service: str,
+        source: str,
+        fetch: Callable[[], Awaitable[List[Dict[str, Any]]]],
+        refresh: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Cached *arr catalog
+
+        Args:
+            service: 'radarr' or 'sonarr'
+            source: Identifies the configured instance (its URL)
+            fetch: Coroutine function returning the full catalog
+            refresh: Bypass the cache
+        """
+        cached = self._catalogs.get(service)
+        if not refresh and cached and cached[0] == source and time.monotonic() - cached[1] <= self.CATALOG_TTL:
+            return cached[2]
+        entries = await fetch()
+        self._catalogs[service] = (source, time.monotonic(), entries)
+        return entries
+
+    async def report(self, service: str, catalog: List[Dict[str, Any]], monitored_only: bool = True) -> dict:
+        """
+        Mismatch report between Plex and one *arr catalog
+
+        missing_from_plex: in the *arr catalog (monitored, unless
+        monitored_only=False) but not in any Plex library.
+        unmanaged_in_plex: in Plex but not in the *arr catalog.
+        """
+        if service not in SERVICE_TYPES:
+            raise ValueError(f"Unknown service '{service}'. Use one of: {', '.join(SERVICE_TYPES)}")
+        item_type = SERVICE_TYPES[service]
+        await self.plex.ensure_loaded()
+        plex_keys = self.plex.lookup(item_type)
+
+        matched: Set[str] = set()
+        missing = []
+        for entry in catalog:
+            # Every Plex copy carrying any of the entry's ids is managed
+            rating_keys = set().union(*(plex_keys.get(key, ()) for key in catalog_keys(service, entry)))
+            if rating_keys:
+                matched |= rating_keys
+            elif entry.get("monitored") or not monitored_only:
+                missing.append(_catalog_entry(service, entry))
+
+        plex_items = self.plex.of_type(item_type)
+        unmanaged = [item for item in plex_items if item["rating_key"] not in matched]
+
+        return {
+            "service": service,
+            "plex_items": len(plex_items),
+            "catalog_items": len(catalog),
+            "matched": len(matched),
+            "missing_from_plex": sorted(missing, key=lambda e: (e["title"] or "").casefold()),
+            "unmanaged_in_plex": sorted(unmanaged, key=lambda i: i["title"].casefold()),
+            "plex_items_without_ids": sum(1 for item in plex_items if not item["guids"]),
+        }
+
+
+# Global singleton instance
+crossref = CrossReference()
+library_index.subscribe(crossref.plex.on_index_diff)
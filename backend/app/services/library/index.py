@@ -0,0 +1,371 @@
+"""
+Local library index - full-text search over every Plex section
+
+Top-level items of all sections are mirrored into the library_items table
+(see app.models.library) and searched with SQLite FTS5 or a PostgreSQL
+tsvector index, so a search never touches Plex. The index is filled by
+streaming each section once and then kept current from the invalidation
+bus: item events re-fetch just those items (batched), section events
+re-sync the section, and a periodic reconcile catches anything missed
+(see app.services.library.sync). External ids (tmdb/tvdb/imdb) are kept
+alongside in library_item_guids.
+
+Every write also appends its diff to library_changes in the same
+transaction, which backs the cursor-based change feed.
+"""
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, List, Optional, Set
+
+from loguru import logger
+from sqlalchemy import text, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import engine
+from app.db.writer import db_writer
+from app.models.library import LibraryItem, LibraryItemGuid, LibraryChange, PG_SEARCH_VECTOR
+from app.services.plex.reader import plex_reader, PlexItemRecord
+from app.services.plex.events import plex_events
+from app.services.library.sync import BackgroundSync
+
+# Columns compared to decide whether an indexed row changed
+_TRACKED = ("section_key", "type", "title", "original_title", "year", "file_path", "plex_added_at", "plex_updated_at")
+
+# Legacy Plex agents embed the external id in the item guid
+_LEGACY_AGENTS = {
+    "com.plexapp.agents.imdb": "imdb",
+    "com.plexapp.agents.themoviedb": "tmdb",
+    "com.plexapp.agents.thetvdb": "tvdb",
+}
+_PROVIDERS = {"imdb", "tmdb", "tvdb"}
+
+
+class IndexDiff:
+    """Rows added, updated and removed by one index write"""
+    __slots__ = ("section_key", "added", "updated", "removed")
+
+    def __init__(self, section_key: str):
+        self.section_key = section_key
+        self.added: List[dict] = []
+        self.updated: List[dict] = []
+        self.removed: List[dict] = []
+
+    def __bool__(self):
+        return bool(self.added or self.updated or self.removed)
+
+    def __repr__(self):
+        return (
+            f"<IndexDiff(section={self.section_key}, added={len(self.added)}, "
+            f"updated={len(self.updated)}, removed={len(self.removed)})>"
+        )
+
+
+def _row(item: PlexItemRecord, section_key: str) -> dict:
+    """Convert a Plex item record to a library_items row"""
+    return {
+        "rating_key": item.rating_key,
+        "section_key": section_key,
+        "type": item.type,
+        "title": item.title,
+        "original_title": item.original_title,
+        "year": item.year,
+        "file_path": item.file or (item.locations[0] if item.locations else None),
+        "plex_added_at": item.added_at,
+        "plex_updated_at": item.updated_at,
+        "guids": external_ids(item.guids),
+    }
+
+
+def parse_guid(guid: str) -> Optional[str]:
+    """
+    Normalise a Plex guid to 'provider://id' for tmdb, tvdb and imdb
+
+    Handles both new-agent ids (imdb://tt0133093) and legacy agent guids
+    (com.plexapp.agents.imdb://tt0133093?lang=en). Returns None otherwise.
+    """
+    scheme, sep, rest = guid.partition("://")
+    if not sep:
+        return None
+    provider = _LEGACY_AGENTS.get(scheme, scheme)
+    if provider not in _PROVIDERS:
+        return None
+    # Strip ?lang=... and episode suffixes (tvdb://<show>/<season>/<episode>)
+    external_id = rest.split("?", 1)[0].split("/", 1)[0]
+    return f"{provider}://{external_id}" if external_id else None
+
+
+def external_ids(guids: Iterable[str]) -> List[str]:
+    """Sorted, de-duplicated external ids of an item"""
+    return sorted({parsed for parsed in map(parse_guid, guids) if parsed})
+
+
+def search_terms(query: str) -> List[str]:
+    """Split a search string into lowercase word tokens (punctuation dropped)"""
+    return re.findall(r"\w+", query.casefold())
+
+
+class LibraryIndex(BackgroundSync):
+    """Keeps library_items in sync with Plex and answers searches"""
+
+    name = "Library index sync"
+    # Items that are indexed when they show up in item-level events
+    TOP_LEVEL_TYPES = {"movie", "show", "artist"}
+    WRITE_BATCH = 1000
+
+    def __init__(self):
+        super().__init__()
+        self._listeners: List[Callable[[IndexDiff], None]] = []
+        self.last_full_sync: Optional[float] = None
+
+    def subscribe(self, callback: Callable[[IndexDiff], None]):
+        """Register a callback for every non-empty index change"""
+        self._listeners.append(callback)
+
+    def _write(self, db: Session, section_key: str, rows: List[dict], complete: bool, missing: Iterable[str] = ()) -> IndexDiff:
+        """
+        Apply rows to the index (write job, see app.db.writer)
+
+        Args:
+            db: Writer session
+            section_key: Section being written
+            rows: Current Plex state of the items
+            complete: rows are the whole section - indexed items not in rows are removed
+            missing: rating keys known to be gone (item-level sync)
+        """
+        diff = IndexDiff(section_key)
+        missing = set(missing)
+        columns = [LibraryItem.id, LibraryItem.rating_key] + [getattr(LibraryItem, c) for c in _TRACKED]
+        query = db.query(*columns)
+        guid_query = db.query(LibraryItemGuid.rating_key, LibraryItemGuid.provider, LibraryItemGuid.external_id)
+        existing, guid_rows = {}, []
+        if complete:
+            existing = {r.rating_key: r for r in query.filter(LibraryItem.section_key == section_key)}
+            guid_rows = guid_query.join(
+                LibraryItem, LibraryItem.rating_key == LibraryItemGuid.rating_key
+            ).filter(LibraryItem.section_key == section_key).all()
+        else:
+            keys = [row["rating_key"] for row in rows] + list(missing)
+            for start in range(0, len(keys), self.WRITE_BATCH):
+                batch = keys[start:start + self.WRITE_BATCH]
+                existing.update({r.rating_key: r for r in query.filter(LibraryItem.rating_key.in_(batch))})
+                guid_rows.extend(guid_query.filter(LibraryItemGuid.rating_key.in_(batch)))
+        existing_guids = {}
+        for rating_key, provider, external_id in guid_rows:
+            existing_guids.setdefault(rating_key, []).append(f"{provider}://{external_id}")
+
+        for row in rows:
+            current = existing.pop(row["rating_key"], None)
+            if current is None:
+                diff.added.append(row)
+            elif (
+                any(getattr(current, c) != row[c] for c in _TRACKED)
+                or sorted(existing_guids.get(row["rating_key"], [])) != row["guids"]
+            ):
+                diff.updated.append(dict(row, id=current.id))
+
+        gone = existing.values() if complete else [r for k, r in existing.items() if k in missing]
+        diff.removed = [{"id": r.id, "rating_key": r.rating_key, "section_key": r.section_key} for r in gone]
+
+        def columns_only(row):
+            return {k: v for k, v in row.items() if k != "guids"}
+
+        if diff.added:
+            db.bulk_insert_mappings(LibraryItem, [columns_only(row) for row in diff.added])
+        if diff.updated:
+            db.bulk_update_mappings(LibraryItem, [columns_only(row) for row in diff.updated])
+        removed_ids = [r["id"] for r in diff.removed]
+        for start in range(0, len(removed_ids), self.WRITE_BATCH):
+            db.query(LibraryItem).filter(
+                LibraryItem.id.in_(removed_ids[start:start + self.WRITE_BATCH])
+            ).delete(synchronize_session=False)
+
+        # Rewrite external ids of every touched item
+        touched = [row["rating_key"] for row in diff.updated] + [r["rating_key"] for r in diff.removed]
+        for start in range(0, len(touched), self.WRITE_BATCH):
+            db.query(LibraryItemGuid).filter(
+                LibraryItemGuid.rating_key.in_(touched[start:start + self.WRITE_BATCH])
+            ).delete(synchronize_session=False)
+        new_guids = [
+            {"rating_key": row["rating_key"], "provider": provider, "external_id": external_id}
+            for row in diff.added + diff.updated
+            for provider, _, external_id in (guid.partition("://") for guid in row["guids"])
+        ]
+        if new_guids:
+            db.bulk_insert_mappings(LibraryItemGuid, new_guids)
+
+        # Change feed entries, in the same transaction as the data
+        changes = [
+            {"section_key": row["section_key"], "rating_key": row["rating_key"], "change": change}
+            for change, changed_rows in (("added", diff.added), ("updated", diff.updated), ("removed", diff.removed))
+            for row in changed_rows
+        ]
+        for start in range(0, len(changes), self.WRITE_BATCH):
+            db.bulk_insert_mappings(LibraryChange, changes[start:start + self.WRITE_BATCH])
+        return diff
+
+    def _drop_sections(self, db: Session, keep: Set[str]) -> List[IndexDiff]:
+        """Remove sections that no longer exist on the server (write job)"""
+        stale = [k for (k,) in db.query(LibraryItem.section_key).distinct() if k not in keep]
+        return [self._write(db, section_key, [], complete=True) for section_key in stale]
+
+    def _prune_changes(self, db: Session, days: int) -> int:
+        """Delete change feed entries older than `days` (write job)"""
+        return db.query(LibraryChange).filter(
+            LibraryChange.created_at < datetime.utcnow() - timedelta(days=days)
+        ).delete(synchronize_session=False)
+
+    def _notify(self, diff: IndexDiff):
+        """Pass a non-empty diff to registered listeners"""
+        if not diff:
+            return
+        logger.debug(f"Library index updated: {diff}")
+        for listener in self._listeners:
+            try:
+                listener(diff)
+            except Exception as e:
+                logger.error(f"Library index listener {listener.__name__} failed: {str(e)}")
+
+    async def sync_section(self, section_key: str) -> IndexDiff:
+        """Stream a whole section and reconcile it with the index"""
+        rows = [_row(item, section_key) async for item in plex_reader.stream_items(section_key, {"includeGuids": 1})]
+        async with self._lock:
+            diff = await db_writer.run(lambda db: self._write(db, section_key, rows, True))
+        self._notify(diff)
+        return diff
+
+    async def sync_items(self, section_key: str, rating_keys: Iterable[str]) -> IndexDiff:
+        """Re-fetch specific items (batched) and update just those rows"""
+        rating_keys = list(rating_keys)
+        rows = []
+        for start in range(0, len(rating_keys), self.METADATA_BATCH):
+            for item in await plex_reader.metadata(rating_keys[start:start + self.METADATA_BATCH]):
+                if item.type in self.TOP_LEVEL_TYPES:
+                    rows.append(_row(item, item.library_section_id or section_key))
+        found = {row["rating_key"] for row in rows}
+        missing = [key for key in rating_keys if key not in found]
+        async with self._lock:
+            diff = await db_writer.run(lambda db: self._write(db, section_key, rows, False, missing))
+        self._notify(diff)
+        return diff
+
+    async def sync_all(self) -> List[IndexDiff]:
+        """Sync every section of the current server"""
+        sections = await plex_reader.sections()
+        diffs = []
+        for section in sections:
+            diffs.append(await self.sync_section(section.key))
+        keep = {s.key for s in sections}
+        async with self._lock:
+            dropped = await db_writer.run(lambda db: self._drop_sections(db, keep))
+        for diff in dropped:
+            self._notify(diff)
+        if settings.LIBRARY_CHANGES_RETENTION_DAYS > 0:
+            days = settings.LIBRARY_CHANGES_RETENTION_DAYS
+            await db_writer.run(lambda db: self._prune_changes(db, days))
+        self.last_full_sync = time.monotonic()
+        total = sum(len(d.added) + len(d.updated) + len(d.removed) for d in diffs + dropped)
+        logger.info(f"Library index synced: {len(sections)} sections, {total} changed items")
+        return diffs + dropped
+
+    def changes(self, db: Session, since: Optional[int] = None, section_key: Optional[str] = None, limit: int = 1000) -> dict:
+        """
+        Items added, updated and removed after a cursor
+
+        Without `since` only the current cursor is returned, as a baseline
+        for a client that has just loaded a full listing. `reset` means the
+        cursor is older than the retained history (or from another
+        database) and the client must reload everything.
+        """
+        latest = db.query(func.max(LibraryChange.id)).scalar() or 0
+        result = {"cursor": latest, "changes": [], "has_more": False, "reset": False}
+        if since is None:
+            return result
+
+        oldest = db.query(func.min(LibraryChange.id)).scalar()
+        if since > latest or (oldest is not None and since < oldest - 1):
+            result["reset"] = True
+            return result
+
+        query = db.query(LibraryChange, LibraryItem).outerjoin(
+            LibraryItem, LibraryItem.rating_key == LibraryChange.rating_key
+        ).filter(LibraryChange.id > since)
+        if section_key is not None:
+            query = query.filter(LibraryChange.section_key == section_key)
+        rows = query.order_by(LibraryChange.id).limit(limit + 1).all()
+
+        if len(rows) > limit:
+            rows = rows[:limit]
+            result["has_more"] = True
+            result["cursor"] = rows[-1][0].id
+        elif rows:
+            # Changes committed after `latest` was read may be in rows
+            result["cursor"] = max(latest, rows[-1][0].id)
+
+        for change, item in rows:
+            current = None
+            if item is not None and change.change != "removed":
+                current = {
+                    "type": item.type,
+                    "title": item.title,
+                    "original_title": item.original_title,
+                    "year": item.year,
+                    "file_path": item.file_path,
+                    "added_at": item.plex_added_at.isoformat() if item.plex_added_at else None,
+                    "updated_at": item.plex_updated_at.isoformat() if item.plex_updated_at else None,
+                }
+            result["changes"].append({
+                "cursor": change.id,
+                "change": change.change,
+                "library_key": change.section_key,
+                "rating_key": change.rating_key,
+                "item": current,
+            })
+        return result
+
+    def search(self, db: Session, query: str, section_key: Optional[str] = None, limit: int = 20) -> List[dict]:
+        """
+        Ranked prefix search over title, original title, year and file path
+
+        Every word must match (as a prefix); results are ordered by relevance,
+        with title matches weighted above file path matches.
+        """
+        terms = search_terms(query)
+        if not terms:
+            return []
+
+        params = {"limit": limit}
+        section_filter = ""
+        if section_key is not None:
+            section_filter = "AND li.section_key = :section_key"
+            params["section_key"] = section_key
+
+        if engine.dialect.name == "sqlite":
+            params["query"] = " ".join(f'"{term}"*' for term in terms)
+            sql = f"""
+                SELECT li.rating_key, li.section_key, li.type, li.title, li.original_title,
+                       li.year, li.file_path, bm25(library_search, 10.0, 5.0, 2.0, 1.0) AS rank
+                FROM library_search
+                JOIN library_items li ON li.id = library_search.rowid
+                WHERE library_search MATCH :query {section_filter}
+                ORDER BY rank
+                LIMIT :limit
+            """
+        else:
+            params["query"] = " & ".join(f"{term}:*" for term in terms)
+            sql = f"""
+                SELECT li.rating_key, li.section_key, li.type, li.title, li.original_title,
+                       li.year, li.file_path, ts_rank({PG_SEARCH_VECTOR}, q) AS rank
+                FROM library_items li, to_tsquery('simple', :query) q
+                WHERE {PG_SEARCH_VECTOR} @@ q {section_filter}
+                ORDER BY rank DESC
+                LIMIT :limit
+            """
+
+        return [dict(row._mapping) for row in db.execute(text(sql), params)]
+
+
+# Global singleton instance
+library_index = LibraryIndex()
+plex_events.subscribe(library_index.on_invalidation)
@@ -0,0 +1,255 @@
+"""
+Media inventory - codec, resolution and size of every media file
+
+Walks the Media/Part metadata of each section's leaf items (movies,
+episodes, tracks) and stores one compact media_parts row per file. Section
+listings already carry Media/Part attributes, so a full pass is a single
+streamed request per section; item events are refreshed with batched
+multi-ratingKey /library/metadata requests. Only items whose Plex
+updatedAt changed are rewritten.
+"""
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from loguru import logger
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+
+from app.db.writer import db_writer
+from app.models.library import MediaPart
+from app.services.plex.reader import plex_reader, PlexItemRecord, _to_int
+from app.services.plex.snapshot import LEAF_TYPES, LEAF_PARAMS
+from app.services.plex.events import plex_events
+from app.services.library.sync import BackgroundSync
+
+# Dimensions the breakdown report can group by
+BREAKDOWNS = ("video_resolution", "video_codec", "container", "audio_codec", "video_profile")
+
+# A file counts as a remux when it says so, or when an untouched-disc
+# container carries a disc-like bitrate (kbps) for its resolution
+REMUX_CONTAINERS = {"mkv", "m2ts", "ts"}
+REMUX_MIN_BITRATE = {"4k": 40000, "1080": 18000}
+
+
+def is_remux(file: Optional[str], container: Optional[str], resolution: Optional[str], bitrate: Optional[int]) -> bool:
+    """Heuristic remux detection from the file name, container and bitrate"""
+    if file and "remux" in file.lower():
+        return True
+    threshold = REMUX_MIN_BITRATE.get(resolution or "")
+    return bool(threshold and bitrate and container in REMUX_CONTAINERS and bitrate >= threshold)
+
+
+def part_rows(item: PlexItemRecord, section_key: str) -> List[dict]:
+    """One media_parts row per Media/Part of an item"""
+    rows = []
+    for media, part in item.parts:
+        container = part.get("container") or media.get("container")
+        resolution = media.get("videoResolution")
+        bitrate = _to_int(media.get("bitrate"))
+        rows.append({
+            "rating_key": item.rating_key,
+            "section_key": section_key,
+            "item_type": item.type,
+            "title": item.title,
+            "file": part.get("file"),
+            "container": container,
+            "video_codec": media.get("videoCodec"),
+            "video_resolution": resolution,
+            "video_profile": media.get("videoProfile"),
+            "audio_codec": media.get("audioCodec"),
+            "audio_channels": _to_int(media.get("audioChannels")),
+            "bitrate": bitrate,
+            "width": _to_int(media.get("width")),
+            "height": _to_int(media.get("height")),
+            "duration": _to_int(part.get("duration")) or _to_int(media.get("duration")),
+            "size": _to_int(part.get("size")),
+            "remux": is_remux(part.get("file"), container, resolution, bitrate),
+            "plex_updated_at": item.updated_at,
+        })
+    return rows
+
+
+class MediaInventory(BackgroundSync):
+    """Keeps media_parts in sync with Plex and builds inventory reports"""
+
+    name = "Media inventory sync"
+    WRITE_BATCH = 1000
+
+    def __init__(self):
+        super().__init__()
+        self.last_full_sync: Optional[float] = None
+
+    def _write(
+        self,
+        db: Session,
+        section_key: str,
+        items: List[Tuple[str, object, List[dict]]],
+        complete: bool,
+        missing: Iterable[str] = (),
+    ) -> Tuple[int, int]:
+        """
+        Rewrite parts of changed items (write job, see app.db.writer)
+
+        Args:
+            db: Writer session
+            section_key: Section being written
+            items: (rating_key, plex updatedAt, part rows) per item
+            complete: items are the whole section - anything else is removed
+            missing: rating keys known to be gone (item-level sync)
+
+        Returns:
+            Tuple of (items rewritten, items removed)
+        """
+        query = db.query(MediaPart.rating_key, func.max(MediaPart.plex_updated_at)).group_by(MediaPart.rating_key)
+        if complete:
+            existing = dict(query.filter(MediaPart.section_key == section_key).all())
+        else:
+            keys = [rating_key for rating_key, _, _ in items] + list(missing)
+            existing = {}
+            for start in range(0, len(keys), self.WRITE_BATCH):
+                existing.update(query.filter(MediaPart.rating_key.in_(keys[start:start + self.WRITE_BATCH])).all())
+
+        # Items without parts have nothing stored - only their removal is a change
+        changed = [
+            (rating_key, rows) for rating_key, updated_at, rows in items
+            if (rating_key not in existing and rows) or (rating_key in existing and existing[rating_key] != updated_at)
+        ]
+        seen = {rating_key for rating_key, _, _ in items}
+        if complete:
+            removed = [key for key in existing if key not in seen]
+        else:
+            removed = [key for key in missing if key in existing and key not in seen]
+
+        stale_keys = [key for key, _ in changed if key in existing] + removed
+        for start in range(0, len(stale_keys), self.WRITE_BATCH):
+            db.query(MediaPart).filter(
+                MediaPart.rating_key.in_(stale_keys[start:start + self.WRITE_BATCH])
+            ).delete(synchronize_session=False)
+        new_rows = [row for _, rows in changed for row in rows]
+        for start in range(0, len(new_rows), self.WRITE_BATCH):
+            db.bulk_insert_mappings(MediaPart, new_rows[start:start + self.WRITE_BATCH])
+        return len(changed), len(removed)
+
+    def _drop_sections(self, db: Session, keep: Set[str]) -> int:
+        """Remove parts of sections that no longer exist (write job)"""
+        return db.query(MediaPart).filter(MediaPart.section_key.notin_(keep)).delete(synchronize_session=False)
+
+    async def sync_section(self, section_key: str) -> Tuple[int, int]:
+        """Stream a section's leaf items and rewrite the ones that changed"""
+        section = await plex_reader.section(section_key)
+        items = [
+            (item.rating_key, item.updated_at, part_rows(item, section.key))
+            async for item in plex_reader.stream_items(section.key, LEAF_PARAMS.get(section.type))
+        ]
+        async with self._lock:
+            changed, removed = await db_writer.run(lambda db: self._write(db, section.key, items, True))
+        if changed or removed:
+            logger.debug(f"Media inventory section {section.key}: {changed} items updated, {removed} removed")
+        return changed, removed
+
+    async def sync_items(self, section_key: str, rating_keys: Iterable[str]) -> Tuple[int, int]:
+        """Re-fetch specific items with batched multi-ratingKey requests"""
+        rating_keys = list(rating_keys)
+        leaf_types = set(LEAF_TYPES.values())
+        items, found = [], set()
+        for start in range(0, len(rating_keys), self.METADATA_BATCH):
+            for item in await plex_reader.metadata(rating_keys[start:start + self.METADATA_BATCH]):
+                found.add(item.rating_key)
+                if item.type in leaf_types:
+                    items.append((item.rating_key, item.updated_at, part_rows(item, item.library_section_id or section_key)))
+        missing = [key for key in rating_keys if key not in found]
+        async with self._lock:
+            return await db_writer.run(lambda db: self._write(db, section_key, items, False, missing))
+
+    async def sync_all(self) -> Dict[str, Tuple[int, int]]:
+        """Sync every section of the current server"""
+        sections = await plex_reader.sections()
+        results = {}
+        for section in sections:
+            results[section.key] = await self.sync_section(section.key)
+        keep = {s.key for s in sections}
+        async with self._lock:
+            await db_writer.run(lambda db: self._drop_sections(db, keep))
+        self.last_full_sync = time.monotonic()
+        changed = sum(c for c, _ in results.values())
+        removed = sum(r for _, r in results.values())
+        logger.info(f"Media inventory synced: {len(sections)} sections, {changed} items updated, {removed} removed")
+        return results
+
+    @staticmethod
+    def _filtered(query, section_key: Optional[str]):
+        if section_key is not None:
+            query = query.filter(MediaPart.section_key == section_key)
+        return query
+
+    def summary(self, db: Session, section_key: Optional[str] = None) -> List[dict]:
+        """Per-library totals with 4K, HEVC and remux counts and sizes"""
+        size = func.coalesce(MediaPart.size, 0)
+
+        def flagged(condition):
+            return (
+                func.sum(case((condition, 1), else_=0)),
+                func.sum(case((condition, size), else_=0)),
+            )
+
+        query = db.query(
+            MediaPart.section_key,
+            func.count(MediaPart.id),
+            func.count(func.distinct(MediaPart.rating_key)),
+            func.sum(size),
+            *flagged(MediaPart.video_resolution == "4k"),
+            *flagged(MediaPart.video_codec == "hevc"),
+            *flagged(MediaPart.remux.is_(True)),
+        ).group_by(MediaPart.section_key).order_by(MediaPart.section_key)
+
+        return [
+            {
+                "library_key": row[0],
+                "parts": row[1],
+                "items": row[2],
+                "size_bytes": int(row[3] or 0),
+                "uhd_4k": {"parts": int(row[4] or 0), "size_bytes": int(row[5] or 0)},
+                "hevc": {"parts": int(row[6] or 0), "size_bytes": int(row[7] or 0)},
+                "remux": {"parts": int(row[8] or 0), "size_bytes": int(row[9] or 0)},
+            }
+            for row in self._filtered(query, section_key)
+        ]
+
+    def breakdown(self, db: Session, field: str, section_key: Optional[str] = None) -> List[dict]:
+        """
+        Part count, item count, size and average bitrate per value of a field
+
+        Raises:
+            ValueError: For an unknown field
+        """
+        if field not in BREAKDOWNS:
+            raise ValueError(f"Invalid breakdown '{field}'. Use one of: {', '.join(BREAKDOWNS)}")
+        column = getattr(MediaPart, field)
+        query = db.query(
+            column,
+            func.count(MediaPart.id),
+            func.count(func.distinct(MediaPart.rating_key)),
+            func.sum(func.coalesce(MediaPart.size, 0)),
+            func.avg(MediaPart.bitrate),
+        ).group_by(column)
+        rows = self._filtered(query, section_key).order_by(func.sum(func.coalesce(MediaPart.size, 0)).desc())
+        return [
+            {
+                "key": value,
+                "parts": parts,
+                "items": items,
+                "size_bytes": int(total or 0),
+                "avg_bitrate_kbps": int(bitrate) if bitrate is not None else None,
+            }
+            for value, parts, items, total, bitrate in rows
+        ]
+
+    def largest(self, db: Session, section_key: Optional[str] = None, limit: int = 20) -> List[MediaPart]:
+        """Top-N largest files"""
+        query = self._filtered(db.query(MediaPart), section_key)
+        return query.filter(MediaPart.size.isnot(None)).order_by(MediaPart.size.desc()).limit(limit).all()
+
+
+# Global singleton instance
+media_inventory = MediaInventory()
+plex_events.subscribe(media_inventory.on_invalidation)
@@ -0,0 +1,106 @@
+"""
+Background poster prefetch for recently added items
+
+The first viewer of a newly imported item would otherwise wait for Plex to
+transcode its poster. The prefetcher warms the artwork cache instead:
+recently added items are polled on startup and periodically, section events
+(a scan finished) trigger a re-poll, and item events prefetch the item that
+changed - its cached artwork was just invalidated. Fetches run a few at a
+time and back off while interactive image requests are waiting on Plex.
+"""
+import asyncio
+from typing import Iterable, List, Tuple
+
+from loguru import logger
+
+from app.core.config import settings
+from app.services.plex.reader import plex_reader
+from app.services.plex.events import plex_events
+from app.services.plex.images import image_cache, parse_size
+from app.services.library.sync import BackgroundSync
+
+
+class PosterPrefetcher(BackgroundSync):
+    """Keeps posters of recently added items in the image cache"""
+
+    name = "Poster prefetch"
+    SYNC_DELAY = 10.0
+    RECONCILE_INTERVAL = (300.0, 3600.0)
+    # Poll interval while interactive transcodes are in flight
+    BACKOFF_DELAY = 0.25
+
+    def __init__(self, sizes: Iterable[str], recent: int, concurrency: int):
+        super().__init__()
+        self.sizes: List[Tuple[int, int]] = [parse_size(size) for size in sizes]
+        self.recent = recent
+        self.concurrency = max(1, concurrency)
+        self._active = 0
+        self.fetched = 0
+
+    async def _fetch(self, rating_key: str, size: Tuple[int, int]) -> bool:
+        # Low priority - let interactive requests have Plex first
+        while image_cache.inflight > self._active:
+            await asyncio.sleep(self.BACKOFF_DELAY)
+        self._active += 1
+        try:
+            await image_cache.get(rating_key, "thumb", *size)
+            return True
+        except LookupError:
+            return False  # No artwork, or the item is gone
+        finally:
+            self._active -= 1
+
+    async def prefetch(self, rating_keys: Iterable[str]) -> int:
+        """
+        Cache posters of the given items at every prefetch size
+
+        Returns:
+            Number of images fetched from Plex (cache hits are skipped)
+        """
+        todo = [
+            (rating_key, size)
+            for rating_key in dict.fromkeys(rating_keys)
+            for size in self.sizes
+            if image_cache.lookup(rating_key, "thumb", *size) is None
+        ]
+        if not todo:
+            return 0
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(rating_key: str, size: Tuple[int, int]) -> bool:
+            async with semaphore:
+                try:
+                    return await self._fetch(rating_key, size)
+                except Exception as e:
+                    logger.debug(f"Poster prefetch of {rating_key} failed: {str(e)}")
+                    return False
+
+        async with self._lock:
+            results = await asyncio.gather(*(fetch(rating_key, size) for rating_key, size in todo))
+        fetched = sum(results)
+        self.fetched += fetched
+        if fetched:
+            logger.debug(f"Prefetched {fetched} posters")
+        return fetched
+
+    async def sync_all(self) -> int:
+        """Prefetch posters of the most recently added items"""
+        items = await plex_reader.recently_added(limit=self.recent)
+        return await self.prefetch(item.rating_key for item in items if item.thumb)
+
+    async def sync_section(self, section_key: str) -> int:
+        # A scan finished - whatever it added shows up in recently added
+        return await self.sync_all()
+
+    async def sync_items(self, section_key: str, rating_keys: Iterable[str]) -> int:
+        return await self.prefetch(rating_keys)
+
+
+# Global singleton instance
+poster_prefetcher = PosterPrefetcher(
+    settings.IMAGE_PREFETCH_SIZES,
+    settings.IMAGE_PREFETCH_RECENT,
+    settings.IMAGE_PREFETCH_CONCURRENCY,
+)
+plex_events.subscribe(poster_prefetcher.on_invalidation)
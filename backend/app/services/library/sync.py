@@ -0,0 +1,117 @@
+"""
+Background sync scheduling shared by the local library stores
+
+Stores that mirror Plex data (search index, media inventory) follow the
+same pattern: a full pass on startup and periodically, plus debounced
+partial syncs driven by the invalidation bus - batched item re-fetches for
+item events, section re-syncs for section events.
+"""
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Optional, Set
+
+from loguru import logger
+
+from app.services.plex.events import plex_events, Invalidation
+
+
+class BackgroundSync(ABC):
+    """
+    Debounced, bus-driven sync scheduler
+
+    Subclasses implement sync_all, sync_section and sync_items.
+    """
+
+    name = "Library sync"
+    # Wait for a burst of notifications to settle before syncing
+    SYNC_DELAY = 5.0
+    METADATA_BATCH = 100
+    # Full reconcile interval (polling, while notifications are live)
+    RECONCILE_INTERVAL = (1800.0, 6 * 3600.0)
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._pending_sections: Set[str] = set()
+        self._pending_items: Dict[str, Set[str]] = {}
+        self._pending_all = False
+        self._flush_task: Optional[asyncio.Task] = None
+        self._reconcile_task: Optional[asyncio.Task] = None
+
+    @abstractmethod
+    async def sync_all(self):
+        """Sync every section"""
+
+    @abstractmethod
+    async def sync_section(self, section_key: str):
+        """Sync one whole section"""
+
+    @abstractmethod
+    async def sync_items(self, section_key: str, rating_keys: Iterable[str]):
+        """Sync specific items of a section"""
+
+    def on_invalidation(self, event: Invalidation):
+        """Invalidation bus subscriber - queue a debounced sync"""
+        if event.section_key is None:
+            self._pending_all = True
+        elif event.rating_key:
+            self._pending_items.setdefault(event.section_key, set()).add(event.rating_key)
+        else:
+            self._pending_sections.add(event.section_key)
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No loop (e.g. a worker thread) - the reconcile loop picks it up
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.SYNC_DELAY)
+        await self.flush()
+
+    async def flush(self):
+        """Run the queued syncs now"""
+        sync_all, self._pending_all = self._pending_all, False
+        sections, self._pending_sections = self._pending_sections, set()
+        items, self._pending_items = self._pending_items, {}
+        try:
+            if sync_all:
+                await self.sync_all()
+                return
+            for section_key in sections:
+                await self.sync_section(section_key)
+            for section_key, rating_keys in items.items():
+                if section_key not in sections:
+                    await self.sync_items(section_key, rating_keys)
+        except ValueError:
+            pass  # Plex not configured
+        except Exception as e:
+            logger.error(f"{self.name} failed: {str(e)}")
+
+    def start(self):
+        """Start the background reconcile loop (initial full sync included)"""
+        if self._reconcile_task is None or self._reconcile_task.done():
+            self._reconcile_task = asyncio.create_task(self._reconcile())
+
+    async def stop(self):
+        """Stop background syncing"""
+        for task in (self._reconcile_task, self._flush_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._reconcile_task = self._flush_task = None
+
+    async def _reconcile(self):
+        while True:
+            try:
+                await self.sync_all()
+            except ValueError:
+                pass  # Plex not configured yet
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"{self.name} reconcile failed: {str(e)}")
+            await asyncio.sleep(plex_events.ttl(*self.RECONCILE_INTERVAL))
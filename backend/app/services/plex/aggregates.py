@@ -0,0 +1,48 @@
+"""
+Incremental aggregation over streamed Plex items
+Keeps O(1) state no matter how large the library is
+"""
+import heapq
+import itertools
+from typing import List, Tuple
+
+from app.services.plex.reader import PlexItemRecord
+
+
+class LibraryAggregate:
+    """
+    Running totals for a stream of items
+
+    Tracks item count, summed duration and the top-N most recently added
+    items using a bounded min-heap keyed by addedAt.
+    """
+
+    def __init__(self, top_n: int = 10):
+        self.top_n = top_n
+        self.count = 0
+        self.total_duration_ms = 0
+        self._recent: List[Tuple[float, int, PlexItemRecord]] = []
+        self._tiebreak = itertools.count()
+
+    def add(self, item: PlexItemRecord):
+        """Fold one item into the aggregate"""
+        self.count += 1
+        if item.duration:
+            self.total_duration_ms += item.duration
+
+        if item.added_at is None or self.top_n <= 0:
+            return
+        entry = (item.added_at.timestamp(), next(self._tiebreak), item)
+        if len(self._recent) < self.top_n:
+            heapq.heappush(self._recent, entry)
+        elif entry[0] > self._recent[0][0]:
+            heapq.heapreplace(self._recent, entry)
+
+    @property
+    def total_duration_minutes(self) -> int:
+        """Summed duration in whole minutes"""
+        return int(self.total_duration_ms / 1000 / 60)
+
+    def recently_added(self) -> List[PlexItemRecord]:
+        """Top-N items, newest first"""
+        return [item for _, _, item in sorted(self._recent, reverse=True)]
@@ -0,0 +1,156 @@
+"""
+Hierarchical library browser cache - section → show → season
+
+Each node's child listing is loaded lazily by ratingKey and cached with its
+own TTL and ETag, so navigating the DirectoryBrowser only hits Plex for
+listings that are not cached yet. Listings are kept sorted by title, which
+makes pagination and prefix search cheap slices.
+"""
+import asyncio
+import bisect
+import hashlib
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.services.plex.reader import plex_reader
+from app.services.plex.events import plex_events, Invalidation
+
+
+class BrowserNode:
+    """A single browsable entry (show, movie or season)"""
+    __slots__ = ("rating_key", "title", "type", "locations")
+
+    def __init__(self, rating_key: str, title: str, type: str, locations: List[str]):
+        self.rating_key = rating_key
+        self.title = title
+        self.type = type
+        self.locations = locations
+
+
+class NodeListing:
+    """Cached, title-sorted children of one node"""
+    __slots__ = ("children", "sort_keys", "fetched_at", "ttl", "etag")
+
+    def __init__(self, children: List[BrowserNode], ttl: Tuple[float, float]):
+        self.children = sorted(children, key=lambda c: c.title.casefold())
+        self.sort_keys = [c.title.casefold() for c in self.children]
+        self.fetched_at = time.monotonic()
+        self.ttl = ttl
+        digest = hashlib.sha1()
+        for child in self.children:
+            digest.update(f"{child.rating_key}\0{child.title}\n".encode())
+        self.etag = digest.hexdigest()[:16]
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() - self.fetched_at > plex_events.ttl(*self.ttl)
+
+    def page(self, offset: int = 0, limit: Optional[int] = None, prefix: Optional[str] = None) -> Tuple[List[BrowserNode], int]:
+        """
+        Get a page of children, optionally restricted to a title prefix
+
+        Returns:
+            Tuple of (children in page, total matching children)
+        """
+        lo, hi = 0, len(self.children)
+        if prefix:
+            needle = prefix.casefold()
+            lo = bisect.bisect_left(self.sort_keys, needle)
+            hi = bisect.bisect_left(self.sort_keys, needle + "\U0010ffff", lo)
+        total = hi - lo
+        start = lo + max(offset, 0)
+        end = hi if limit is None else min(hi, start + max(limit, 0))
+        return self.children[start:end], total
+
+
+class LibraryBrowser:
+    """Tree cache of library sections and their show/season nodes"""
+
+    # (polling TTL, TTL while change notifications are live)
+    ROOT_TTL = (300.0, 3600.0)
+    CHILD_TTL = (900.0, 3600.0)
+
+    def __init__(self):
+        self._listings: Dict[Tuple[str, str], NodeListing] = {}
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    async def _load(self, cache_key: Tuple[str, str], loader, ttl: Tuple[float, float]) -> NodeListing:
+        """Return a cached listing or load it, letting only one caller fetch"""
+        listing = self._listings.get(cache_key)
+        if listing and not listing.expired:
+            return listing
+
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            listing = NodeListing(await loader(), ttl)
+            self._listings[cache_key] = listing
+            future.set_result(listing)
+            return listing
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved - waiters (if any) re-raise it
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            del self._inflight[cache_key]
+
+    async def root(self, section_key: str) -> NodeListing:
+        """Top-level items of a section (shows or movies)"""
+        async def load():
+            nodes = []
+            async for item in plex_reader.stream_items(section_key):
+                nodes.append(BrowserNode(item.rating_key, item.title, item.type, item.locations))
+            return nodes
+
+        return await self._load((section_key, ""), load, self.ROOT_TTL)
+
+    async def children(self, section_key: str, rating_key: str) -> NodeListing:
+        """Children of a node (e.g. the seasons of a show) - one small Plex request"""
+        async def load():
+            items = await plex_reader.children(rating_key)
+            return [BrowserNode(item.rating_key, item.title, item.type, item.locations) for item in items]
+
+        return await self._load((section_key, rating_key), load, self.CHILD_TTL)
+
+    async def resolve(self, section_key: str, title: str) -> Optional[BrowserNode]:
+        """Find a top-level node by exact title using the cached root listing"""
+        listing = await self.root(section_key)
+        index = bisect.bisect_left(listing.sort_keys, title.casefold())
+        while index < len(listing.children) and listing.sort_keys[index] == title.casefold():
+            if listing.children[index].title == title:
+                return listing.children[index]
+            index += 1
+        return None
+
+    def invalidate(self, section_key: Optional[str] = None, rating_key: Optional[str] = None):
+        """Drop cached listings for a section, a single node, or everything"""
+        if section_key is None and rating_key is None:
+            self._listings.clear()
+            return
+        for key in list(self._listings):
+            if section_key is not None and key[0] != section_key:
+                continue
+            if rating_key is not None and key[1] != rating_key:
+                continue
+            del self._listings[key]
+
+    def on_invalidation(self, event: Invalidation):
+        """Invalidation bus subscriber"""
+        if event.section_key is None:
+            self.invalidate(rating_key=event.rating_key)
+            return
+        # New/removed items change the section root; the item itself may have new children
+        self.invalidate(event.section_key, "")
+        if event.rating_key:
+            self.invalidate(event.section_key, event.rating_key)
+
+
+# Global singleton instance
+library_browser = LibraryBrowser()
+plex_events.subscribe(library_browser.on_invalidation)
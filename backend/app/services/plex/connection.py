@@ -1,11 +1,21 @@
 """
 Plex connection service - Singleton pattern for global Plex connection
 """
-from plexapi.server import PlexServer
-from plexapi.exceptions import Unauthorized, BadRequest
-from typing import Optional
+import os
+
+# Never let plexapi silently reload partial objects (one hidden HTTP call per
+# item when an attribute is missing from the listing XML). Missing attributes
+# read as None instead. Set PLEXAPI_PLEXAPI_AUTORELOAD=true to opt back in.
+os.environ.setdefault("PLEXAPI_PLEXAPI_AUTORELOAD", "false")
+
+from typing import TYPE_CHECKING, Optional, Tuple
 from loguru import logger
 
+# plexapi (and requests under it) is imported on first connection, not at
+# startup - most requests are served by the direct HTTP reader
+if TYPE_CHECKING:
+    from plexapi.server import PlexServer
+
 
 class PlexConnection:
     """Singleton service for managing Plex server connection"""
@@ -13,7 +23,7 @@ class PlexConnection:
     def __init__(self):
         self._url: Optional[str] = None
         self._token: Optional[str] = None
-        self._server: Optional[PlexServer] = None
+        self._server: Optional["PlexServer"] = None
     
     def set_config(self, url: str, token: str):
         """Set Plex server configuration"""
@@ -22,8 +32,11 @@ class PlexConnection:
         self._server = None  # Reset connection
         logger.info(f"Plex config updated: {url}")
     
-    def get_connection(self) -> PlexServer:
+    def get_connection(self) -> "PlexServer":
         """Get or create Plex server connection"""
+        from plexapi.server import PlexServer
+        from plexapi.exceptions import Unauthorized, BadRequest
+        
         if not self._url or not self._token:
             raise ValueError("Plex server not configured. Please configure in Settings.")
         
@@ -42,6 +55,9 @@ class PlexConnection:
     
     def test_connection(self, url: str, token: str) -> dict:
         """Test connection to Plex server"""
+        from plexapi.server import PlexServer
+        from plexapi.exceptions import Unauthorized, BadRequest
+        
         try:
             server = PlexServer(url, token)
             return {
@@ -70,7 +86,13 @@ class PlexConnection:
     def is_configured(self) -> bool:
         """Check if Plex is configured"""
         return self._url is not None and self._token is not None
-    
+
+    def get_credentials(self) -> Tuple[str, str]:
+        """Get the configured (url, token) pair for direct HTTP access"""
+        if not self._url or not self._token:
+            raise ValueError("Plex server not configured. Please configure in Settings.")
+        return self._url.rstrip("/"), self._token
+
     def get_server_info(self) -> dict:
         """Get basic server information"""
         if not self.is_configured():
@@ -0,0 +1,183 @@
+"""
+Plex change notifications and cache invalidation bus
+
+Plex pushes timeline and activity events over its notification websocket
+and can POST webhooks (library.new, ...). Both are turned into precise
+invalidation events - section id and/or ratingKey - that every cache of
+Plex-derived data subscribes to. While the websocket is connected caches
+may use long TTLs, because changes are pushed to them.
+"""
+import asyncio
+import json
+from typing import Callable, List, Optional
+
+from loguru import logger
+
+from app.services.plex.connection import plex_connection
+
+try:
+    import websockets
+except ImportError:  # Optional - only needed for live notifications
+    websockets = None
+
+
+class Invalidation:
+    """
+    A single invalidation event
+
+    section_key=None and rating_key=None means "anything may have changed".
+    """
+    __slots__ = ("section_key", "rating_key", "reason")
+
+    def __init__(self, section_key: Optional[str] = None, rating_key: Optional[str] = None, reason: str = ""):
+        self.section_key = section_key
+        self.rating_key = rating_key
+        self.reason = reason
+
+    def __repr__(self):
+        return f"<Invalidation(section={self.section_key}, item={self.rating_key}, reason={self.reason})>"
+
+
+class InvalidationBus:
+    """In-process publish/subscribe bus for cache invalidation"""
+
+    def __init__(self):
+        self._subscribers: List[Callable[[Invalidation], None]] = []
+        self.live = False  # True while a push source (websocket) is connected
+
+    def subscribe(self, callback: Callable[[Invalidation], None]):
+        """Register a cache invalidation callback"""
+        self._subscribers.append(callback)
+
+    def publish(self, section_key: Optional[str] = None, rating_key: Optional[str] = None, reason: str = ""):
+        """Deliver an invalidation to every subscriber"""
+        event = Invalidation(
+            str(section_key) if section_key is not None else None,
+            str(rating_key) if rating_key is not None else None,
+            reason,
+        )
+        logger.debug(f"Publishing {event}")
+        for callback in self._subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Invalidation subscriber {callback.__name__} failed: {str(e)}")
+
+    def ttl(self, short: float, long: float) -> float:
+        """Pick a cache TTL - long while changes are being pushed to us"""
+        return long if self.live else short
+
+
+class PlexNotificationListener:
+    """Consumes the Plex notification websocket and feeds the bus"""
+
+    RECONNECT_DELAY_MAX = 60.0
+    # Timeline states: 5 = processing finished, 9 = deleted
+    TIMELINE_STATES = {5, 9}
+
+    def __init__(self, bus: InvalidationBus):
+        self._bus = bus
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start listening in the background"""
+        if websockets is None:
+            logger.warning("websockets package not installed - Plex notifications disabled")
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop listening"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._bus.live = False
+
+    async def restart(self):
+        """Reconnect, e.g. after the Plex server configuration changed"""
+        await self.stop()
+        self.start()
+
+    async def _run(self):
+        delay = 1.0
+        while True:
+            try:
+                base_url, token = plex_connection.get_credentials()
+            except ValueError:
+                # Not configured yet - check again later
+                await asyncio.sleep(30)
+                continue
+
+            ws_url = base_url.replace("http", "ws", 1) + f"/:/websockets/notifications?X-Plex-Token={token}"
+            try:
+                async with websockets.connect(ws_url) as ws:
+                    logger.info("Connected to Plex notification websocket")
+                    self._bus.live = True
+                    delay = 1.0
+                    # Anything may have changed while we were disconnected
+                    self._bus.publish(reason="notifications.connected")
+                    async for message in ws:
+                        self.handle_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Plex notification websocket error: {str(e)}")
+            finally:
+                self._bus.live = False
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.RECONNECT_DELAY_MAX)
+
+    def handle_message(self, message: str):
+        """Translate one websocket notification into invalidations"""
+        try:
+            container = json.loads(message).get("NotificationContainer", {})
+        except (ValueError, AttributeError):
+            return
+
+        kind = container.get("type")
+        if kind == "timeline":
+            for entry in container.get("TimelineEntry", []):
+                section_id = entry.get("sectionID")
+                if entry.get("state") not in self.TIMELINE_STATES or section_id in (None, -1, "-1"):
+                    continue
+                self._bus.publish(section_id, entry.get("itemID"), reason="timeline")
+        elif kind == "activity":
+            for notification in container.get("ActivityNotification", []):
+                activity = notification.get("Activity", {})
+                if notification.get("event") != "ended" or not activity.get("type", "").startswith("library."):
+                    continue
+                section_id = activity.get("Context", {}).get("librarySectionID")
+                self._bus.publish(section_id, reason="activity")
+        elif kind == "library.new":
+            # Not sent by every server version, but handle it when present
+            for entry in container.get("Metadata", []):
+                self._bus.publish(entry.get("librarySectionID"), entry.get("ratingKey"), reason="library.new")
+
+
+def handle_webhook(payload: dict) -> bool:
+    """
+    Translate a Plex webhook payload into an invalidation
+
+    Returns:
+        True if the event invalidated anything
+    """
+    # Unauthenticated input: any field may be missing, null or the wrong type
+    event = str(payload.get("event") or "")
+    if not event.startswith("library."):
+        return False  # playback events etc. don't change library data
+    metadata = payload.get("Metadata") or {}
+    if not isinstance(metadata, dict):
+        metadata = {}
+    plex_events.publish(metadata.get("librarySectionID"), metadata.get("ratingKey"), reason=event)
+    return True
+
+
+# Global singleton instances
+plex_events = InvalidationBus()
+plex_notifications = PlexNotificationListener(plex_events)
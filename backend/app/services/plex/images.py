@@ -0,0 +1,249 @@
+"""
+Resized Plex artwork served from a byte-bounded on-disk LRU cache
+
+Posters and backgrounds are requested from Plex's photo transcoder at the
+size the client asked for, written to disk and evicted least-recently-used
+once the cache exceeds its byte budget. Browsers never see the Plex URL or
+token, and each size of each image is transcoded by Plex only once.
+Concurrent requests for the same image share one transcode.
+"""
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from loguru import logger
+
+from app.core.config import settings
+from app.services.plex.connection import plex_connection
+from app.services.plex.reader import plex_reader
+from app.services.plex.events import plex_events, Invalidation
+
+# Artwork kinds (poster, background) - /library/metadata/<ratingKey>/<kind>
+IMAGE_KINDS = ("thumb", "art")
+MIN_SIZE = 16
+MAX_SIZE = 2000
+# Poster size used by the dashboard and library grids (and prefetched)
+POSTER_SIZE = (300, 450)
+BACKGROUND_SIZE = (1280, 720)
+
+
+class CachedImage:
+    """An image on disk"""
+    __slots__ = ("path", "size", "etag")
+
+    def __init__(self, path: str, size: int, etag: str):
+        self.path = path
+        self.size = size
+        self.etag = etag
+
+
+class ImageCache:
+    """On-disk image store with LRU eviction by total bytes"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, CachedImage]" = OrderedDict()
+        self._by_item: Dict[str, Set[str]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._loaded = False
+
+    @staticmethod
+    def _key(base_url: str, rating_key: str, kind: str, width: int, height: int) -> str:
+        raw = f"{base_url}|{rating_key}|{kind}|{width}x{height}"
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    @staticmethod
+    def _etag(key: str, mtime: float) -> str:
+        return f'"{key[:20]}-{int(mtime)}"'
+
+    def _path(self, key: str, rating_key: str) -> str:
+        # <dir>/<ab>/<key>.<ratingKey> - the rating key suffix lets a restart
+        # rebuild the per-item index used for invalidation
+        return os.path.join(self.directory, key[:2], f"{key}.{rating_key}")
+
+    def _load(self):
+        """Index existing files, least recently used first (by mtime)"""
+        files = []
+        if os.path.isdir(self.directory):
+            for root, _, names in os.walk(self.directory):
+                for name in names:
+                    if name.endswith(".tmp"):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, name, path, stat.st_size))
+        for mtime, name, path, size in sorted(files):
+            key, _, rating_key = name.partition(".")
+            self._add(key, rating_key, CachedImage(path, size, self._etag(key, mtime)))
+        self._loaded = True
+        if files:
+            logger.info(f"Image cache: {len(files)} files, {self.total_bytes / 1024 / 1024:.1f} MB")
+        self._evict()
+
+    def _add(self, key: str, rating_key: str, entry: CachedImage):
+        self._entries[key] = entry
+        self._by_item.setdefault(rating_key, set()).add(key)
+        self.total_bytes += entry.size
+
+    def _forget(self, key: str) -> Optional[CachedImage]:
+        """Drop an entry from the index, leaving the file alone"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self.total_bytes -= entry.size
+        rating_key = os.path.basename(entry.path).partition(".")[2]
+        keys = self._by_item.get(rating_key)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_item[rating_key]
+        return entry
+
+    def _remove(self, key: str):
+        """Drop an entry and delete its file"""
+        entry = self._forget(key)
+        if entry is None:
+            return
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Drop least recently used images until the cache fits its budget"""
+        while self.total_bytes > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+
+    def _store(self, key: str, rating_key: str, content: bytes) -> CachedImage:
+        """Write an image atomically (runs in a worker thread)"""
+        path = self._path(key, rating_key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        return CachedImage(path, len(content), self._etag(key, os.path.getmtime(path)))
+
+    @staticmethod
+    def _read(entry: CachedImage) -> bytes:
+        # Bump mtime so the LRU order survives restarts
+        os.utime(entry.path)
+        with open(entry.path, "rb") as f:
+            return f.read()
+
+    def lookup(self, rating_key: str, kind: str, width: int, height: int) -> Optional[CachedImage]:
+        """Cached entry without fetching, None on a miss"""
+        if not self._loaded:
+            self._load()
+        base_url, _ = plex_connection.get_credentials()
+        return self._entries.get(self._key(base_url, rating_key, kind, width, height))
+
+    async def get(self, rating_key: str, kind: str = "thumb", width: int = 300, height: int = 450) -> Tuple[bytes, str]:
+        """
+        Get a resized image, transcoding it through Plex on a cache miss
+
+        Returns:
+            Tuple of (JPEG bytes, ETag)
+
+        Raises:
+            ValueError: If Plex is not configured
+            LookupError: If the item or its artwork does not exist
+        """
+        if not self._loaded:
+            self._load()
+        base_url, _ = plex_connection.get_credentials()
+        key = self._key(base_url, rating_key, kind, width, height)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            try:
+                content = await asyncio.to_thread(self._read, entry)
+                self._entries.move_to_end(key)
+                return content, entry.etag
+            except OSError:
+                self._remove(key)  # Deleted behind our back - fetch again
+
+        # One transcode per image, however many requests arrive at once
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            content = await plex_reader.transcode_image(
+                f"/library/metadata/{rating_key}/{kind}", width, height
+            )
+            entry = await asyncio.to_thread(self._store, key, rating_key, content)
+            self._forget(key)
+            self._add(key, rating_key, entry)
+            self._evict()
+            result = (content, entry.etag)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved - waiters (if any) re-raise it
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            del self._inflight[key]
+
+    @property
+    def inflight(self) -> int:
+        """Transcodes currently waiting on Plex"""
+        return len(self._inflight)
+
+    def invalidate(self, rating_key: Optional[str] = None):
+        """Drop cached images of one item (artwork may have changed)"""
+        if not self._loaded:
+            return
+        keys = list(self._entries) if rating_key is None else list(self._by_item.get(rating_key, ()))
+        for key in keys:
+            self._remove(key)
+
+    def on_invalidation(self, event: Invalidation):
+        """Invalidation bus subscriber - only item events can change artwork"""
+        if event.rating_key:
+            self.invalidate(event.rating_key)
+
+    def stats(self) -> dict:
+        """File count and bytes used"""
+        if not self._loaded:
+            self._load()
+        return {
+            "files": len(self._entries),
+            "total_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def clamp_size(value: int) -> int:
+    """Keep requested dimensions within what is worth transcoding"""
+    return max(MIN_SIZE, min(int(value), MAX_SIZE))
+
+
+def parse_size(value: str) -> Tuple[int, int]:
+    """Parse a 'WIDTHxHEIGHT' setting"""
+    width, sep, height = value.lower().partition("x")
+    if not sep:
+        raise ValueError(f"Invalid image size '{value}'. Use WIDTHxHEIGHT, e.g. 300x450")
+    return clamp_size(int(width)), clamp_size(int(height))
+
+
+def image_url(rating_key: str, kind: str = "thumb", size: Tuple[int, int] = POSTER_SIZE) -> str:
+    """Proxy URL of an item's artwork (see /api/plex/image)"""
+    return f"/api/plex/image/{rating_key}?kind={kind}&width={size[0]}&height={size[1]}"
+
+
+# Global singleton instance
+image_cache = ImageCache(settings.IMAGE_CACHE_DIR, settings.IMAGE_CACHE_MAX_BYTES)
+plex_events.subscribe(image_cache.on_invalidation)
@@ -0,0 +1,450 @@
+"""
+Lean async Plex reader - bypasses plexapi for hot read paths
+
+plexapi builds a full PlexObject tree (with lazy reloads) for every item,
+while the read endpoints only need a handful of attributes. This reader
+talks to the Plex HTTP API directly over the shared httpx pool, pages
+through containers and parses the XML incrementally into slotted records.
+"""
+import asyncio
+import itertools
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple, Iterator, AsyncIterator
+
+import httpx
+from loguru import logger
+
+from app.services.http import get_http_client
+from app.services.plex.connection import plex_connection
+from app.services.plex.events import plex_events, Invalidation
+from app.services.telemetry import telemetry
+
+
+def _to_int(value: Optional[str]) -> Optional[int]:
+    """Convert an XML attribute to int, None if missing or invalid"""
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return int(float(value))
+        except ValueError:
+            return None
+
+
+def _to_float(value: Optional[str]) -> Optional[float]:
+    """Convert an XML attribute to float, None if missing or invalid"""
+    if value in (None, ""):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _to_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Convert a Plex epoch attribute to datetime (same as plexapi.utils.toDatetime)"""
+    epoch = _to_int(value)
+    if epoch is None:
+        return None
+    try:
+        return datetime.fromtimestamp(epoch)
+    except (OverflowError, OSError, ValueError):
+        return None
+
+
+class PlexSectionRecord:
+    """Lightweight library section record"""
+    __slots__ = (
+        "key", "title", "type", "agent", "scanner", "language", "uuid",
+        "updated_at", "created_at", "scanned_at", "refreshing", "locations",
+        "total_size",
+    )
+
+    def __init__(self, attrib: Dict[str, str], locations: List[str]):
+        self.key = attrib.get("key", "")
+        self.title = attrib.get("title", "")
+        self.type = attrib.get("type", "")
+        self.agent = attrib.get("agent")
+        self.scanner = attrib.get("scanner")
+        self.language = attrib.get("language")
+        self.uuid = attrib.get("uuid", "")
+        self.updated_at = _to_datetime(attrib.get("updatedAt"))
+        self.created_at = _to_datetime(attrib.get("createdAt"))
+        self.scanned_at = _to_datetime(attrib.get("scannedAt"))
+        self.refreshing = attrib.get("refreshing") == "1"
+        self.locations = locations
+        self.total_size = 0
+
+
+class PlexItemRecord:
+    """Lightweight media item record (movie, show, season, episode, ...)"""
+    __slots__ = (
+        "rating_key", "key", "title", "original_title", "type", "year", "rating",
+        "summary", "thumb", "art", "duration", "added_at", "updated_at",
+        "library_section_id", "library_section_title", "locations", "file",
+        "size", "video_resolution", "parts", "guids",
+    )
+
+    def __init__(self, attrib: Dict[str, str], container: Dict[str, str], elem: Optional[ET.Element] = None):
+        self.rating_key = attrib.get("ratingKey", "")
+        self.key = attrib.get("key", "")
+        self.title = attrib.get("title", "")
+        self.original_title = attrib.get("originalTitle")
+        self.type = attrib.get("type", "")
+        self.year = _to_int(attrib.get("year"))
+        self.rating = _to_float(attrib.get("rating"))
+        self.summary = attrib.get("summary")
+        self.thumb = attrib.get("thumb")
+        self.art = attrib.get("art")
+        self.duration = _to_int(attrib.get("duration"))
+        self.added_at = _to_datetime(attrib.get("addedAt"))
+        self.updated_at = _to_datetime(attrib.get("updatedAt"))
+        # Section info is on the item for hubs/recentlyAdded, on the container for section listings
+        self.library_section_id = attrib.get("librarySectionID") or container.get("librarySectionID")
+        self.library_section_title = attrib.get("librarySectionTitle") or container.get("librarySectionTitle")
+        # Shows carry their folder(s) as <Location path="..."/> children
+        self.locations = [loc.get("path") for loc in elem.findall("Location")] if elem is not None else []
+        # Agent guid plus external ids (<Guid id="imdb://..."/>, needs includeGuids=1 in listings)
+        self.guids = [attrib["guid"]] if attrib.get("guid") else []
+        if elem is not None:
+            self.guids.extend(guid.get("id") for guid in elem.findall("Guid") if guid.get("id"))
+        # Every <Media><Part/></Media> pair as raw (media attrib, part attrib)
+        self.parts = [
+            (media.attrib, part.attrib)
+            for media in elem.findall("Media")
+            for part in media.findall("Part")
+        ] if elem is not None else []
+        # First media file for movies/episodes
+        media_attrib, part_attrib = self.parts[0] if self.parts else ({}, {})
+        self.file = part_attrib.get("file")
+        self.size = _to_int(part_attrib.get("size"))
+        self.video_resolution = media_attrib.get("videoResolution")
+
+
+class ContainerParser:
+    """
+    Incremental MediaContainer parser fed with byte chunks
+
+    Yields each direct child of the container as soon as its closing tag has
+    been parsed and detaches it from the tree afterwards, so memory stays
+    bounded by the largest single item rather than the whole listing.
+    """
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root: Optional[ET.Element] = None
+        self._depth = 0
+        self.container: Dict[str, str] = {}
+
+    def feed(self, data: bytes):
+        """Feed the next chunk of the response body"""
+        self._parser.feed(data)
+
+    def close(self):
+        """Signal the end of the body"""
+        self._parser.close()
+
+    def children(self) -> Iterator[Tuple[Dict[str, str], ET.Element]]:
+        """Yield (attributes, element) for every child completed so far"""
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                self._depth += 1
+                if self._depth == 1:
+                    self._root = elem
+                    self.container = dict(elem.attrib)
+                continue
+            self._depth -= 1
+            if self._depth == 1:
+                yield dict(elem.attrib), elem
+                self._root.remove(elem)
+
+
+def iter_container(content: bytes) -> Tuple[Dict[str, str], Iterator[Tuple[Dict[str, str], ET.Element]]]:
+    """
+    Parse a complete MediaContainer document
+
+    Returns the container attributes and an iterator of (attributes, element)
+    for each direct child.
+    """
+    parser = ContainerParser()
+    parser.feed(content)
+    parser.close()
+    children = parser.children()
+    first = next(children, None)
+    return parser.container, itertools.chain([first] if first else [], children)
+
+
+class PlexReader:
+    """Async read-only client for the Plex HTTP API"""
+
+    SECTIONS_TTL = 60.0
+    RECENT_TTL = 30.0
+    # TTLs while Plex pushes change notifications to the invalidation bus
+    LIVE_TTL = 900.0
+    MAX_CONCURRENCY = 8
+
+    def __init__(self):
+        # (base_url, fetched_at, sections) - section list with item counts
+        self._sections_cache: Optional[Tuple[str, float, List[PlexSectionRecord]]] = None
+        self._sections_lock = asyncio.Lock()
+        # limit -> (base_url, fetched_at, items) - dashboard recently-added snapshot
+        self._recent_cache: Dict[int, Tuple[str, float, List["PlexItemRecord"]]] = {}
+
+    def url(self, path: str, include_token: bool = True) -> str:
+        """Build an absolute Plex URL for a relative path"""
+        base_url, token = plex_connection.get_credentials()
+        if not include_token:
+            return f"{base_url}{path}"
+        delimiter = "&" if "?" in path else "?"
+        return f"{base_url}{path}{delimiter}X-Plex-Token={token}"
+
+    def _headers(self) -> Dict[str, str]:
+        """Get request headers for Plex"""
+        _, token = plex_connection.get_credentials()
+        return {
+            "X-Plex-Token": token,
+            "Accept": "application/xml",
+        }
+
+    @staticmethod
+    def _handle_error(path: str, e: httpx.HTTPError):
+        """Map Plex HTTP errors onto the exceptions routes already handle"""
+        if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 401:
+            raise ValueError("Invalid Plex token")
+        logger.error(f"Plex request {path} failed: {str(e)}")
+        raise e
+
+    async def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> bytes:
+        """
+        GET a Plex endpoint and return the raw XML body
+
+        Raises:
+            ValueError: If Plex is not configured or rejects the token
+            httpx.HTTPError: On other transport or HTTP errors
+        """
+        base_url, _ = plex_connection.get_credentials()
+        try:
+            started = time.perf_counter()
+            response = await get_http_client().get(f"{base_url}{path}", params=params, headers=self._headers())
+            telemetry.record_nowait("upstream_latency_ms", "plex", (time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+            return response.content
+        except httpx.HTTPError as e:
+            self._handle_error(path, e)
+
+    async def _stream(self, path: str, params: Optional[Dict[str, Any]] = None) -> AsyncIterator[PlexItemRecord]:
+        """
+        Stream a MediaContainer endpoint and yield items as they are parsed
+
+        The body is never held in memory as a whole - each network chunk is
+        fed to the pull parser and completed items are yielded immediately.
+        """
+        base_url, _ = plex_connection.get_credentials()
+        parser = ContainerParser()
+        try:
+            async with get_http_client().stream(
+                "GET", f"{base_url}{path}", params=params, headers=self._headers()
+            ) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    parser.feed(chunk)
+                    for attrib, elem in parser.children():
+                        yield PlexItemRecord(attrib, parser.container, elem)
+        except httpx.HTTPError as e:
+            self._handle_error(path, e)
+        parser.close()
+        for attrib, elem in parser.children():
+            yield PlexItemRecord(attrib, parser.container, elem)
+
+    @staticmethod
+    def _page_params(start: int, size: int, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Add container paging parameters"""
+        paged = dict(params or {})
+        paged["X-Plex-Container-Start"] = start
+        paged["X-Plex-Container-Size"] = size
+        return paged
+
+    def _cached_sections(self) -> Optional[List[PlexSectionRecord]]:
+        """Cached section list if it is fresh and for the current server"""
+        if self._sections_cache is None:
+            return None
+        base_url, fetched_at, sections = self._sections_cache
+        if base_url != plex_connection.get_credentials()[0]:
+            return None
+        if time.monotonic() - fetched_at > plex_events.ttl(self.SECTIONS_TTL, self.LIVE_TTL):
+            return None
+        return sections
+
+    async def sections(self) -> List[PlexSectionRecord]:
+        """
+        Get all library sections including their item counts
+
+        Plex has no bulk endpoint for per-section totals, so the counts are
+        fetched concurrently (container size 0) right after the section list
+        and cached together with it. Warm calls cost no upstream requests.
+        """
+        sections = self._cached_sections()
+        if sections is not None:
+            return sections
+
+        async with self._sections_lock:
+            sections = self._cached_sections()
+            if sections is not None:
+                return sections
+
+            base_url, _ = plex_connection.get_credentials()
+            content = await self._get("/library/sections")
+            _, children = iter_container(content)
+            sections = []
+            for attrib, elem in children:
+                locations = [loc.get("path") for loc in elem.iter("Location") if loc.get("path")]
+                sections.append(PlexSectionRecord(attrib, locations))
+
+            semaphore = asyncio.Semaphore(self.MAX_CONCURRENCY)
+
+            async def fetch_total(section: PlexSectionRecord):
+                async with semaphore:
+                    section.total_size = await self.section_total(section.key)
+
+            await asyncio.gather(*(fetch_total(section) for section in sections))
+
+            self._sections_cache = (base_url, time.monotonic(), sections)
+            return sections
+
+    def invalidate_sections(self):
+        """Drop the cached section list and counts"""
+        self._sections_cache = None
+
+    async def section(self, section_key: str) -> PlexSectionRecord:
+        """
+        Get a single library section
+
+        Raises:
+            LookupError: If the section does not exist
+        """
+        for section in await self.sections():
+            if section.key == str(section_key):
+                return section
+        raise LookupError(f"Library not found: {section_key}")
+
+    async def section_total(self, section_key: str, params: Optional[Dict[str, Any]] = None) -> int:
+        """Get the item count of a section without fetching any items"""
+        content = await self._get(
+            f"/library/sections/{section_key}/all",
+            params=self._page_params(0, 0, params),
+        )
+        container, _ = iter_container(content)
+        return _to_int(container.get("totalSize")) or 0
+
+    async def items(
+        self,
+        section_key: str,
+        start: int = 0,
+        size: int = 50,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[List[PlexItemRecord], int]:
+        """
+        Get one page of items from a section
+
+        Returns:
+            Tuple of (items, total item count in the section)
+        """
+        content = await self._get(
+            f"/library/sections/{section_key}/all",
+            params=self._page_params(start, size, params),
+        )
+        container, children = iter_container(content)
+        items = [PlexItemRecord(attrib, container, elem) for attrib, elem in children]
+        total = _to_int(container.get("totalSize"))
+        return items, total if total is not None else start + len(items)
+
+    def stream_items(self, section_key: str, params: Optional[Dict[str, Any]] = None) -> AsyncIterator[PlexItemRecord]:
+        """Stream every item of a section with constant memory"""
+        return self._stream(f"/library/sections/{section_key}/all", params)
+
+    async def section_recently_added(self, section_key: str, limit: int = 10) -> List[PlexItemRecord]:
+        """
+        Get the newest items of one section
+
+        Sorting and limiting happen on the Plex side, so only `limit` items
+        cross the wire regardless of library size.
+        """
+        items, _ = await self.items(section_key, start=0, size=limit, params={"sort": "addedAt:desc"})
+        return items[:limit]
+
+    async def children(self, rating_key: str) -> List[PlexItemRecord]:
+        """Get the direct children of an item (e.g. the seasons of a show)"""
+        content = await self._get(f"/library/metadata/{rating_key}/children")
+        container, children = iter_container(content)
+        return [PlexItemRecord(attrib, container, elem) for attrib, elem in children]
+
+    async def metadata(self, rating_keys: List[str]) -> List[PlexItemRecord]:
+        """
+        Get several items in one request (/library/metadata/1,2,3)
+
+        Items that no longer exist are simply missing from the result.
+        """
+        if not rating_keys:
+            return []
+        try:
+            content = await self._get(f"/library/metadata/{','.join(rating_keys)}")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return []
+            raise
+        container, children = iter_container(content)
+        return [PlexItemRecord(attrib, container, elem) for attrib, elem in children]
+
+    async def transcode_image(self, path: str, width: int, height: int) -> bytes:
+        """
+        Resize artwork with Plex's photo transcoder
+
+        Args:
+            path: Plex image path, e.g. /library/metadata/123/thumb
+
+        Raises:
+            LookupError: If Plex has no such image
+        """
+        try:
+            return await self._get("/photo/:/transcode", params={
+                "url": path,
+                "width": width,
+                "height": height,
+                "minSize": 1,
+                "upscale": 1,
+                "format": "jpeg",
+            })
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in (400, 404):
+                raise LookupError(f"Image {path} not found")
+            raise
+
+    async def recently_added(self, limit: int = 10) -> List[PlexItemRecord]:
+        """Get the most recently added items across all libraries (cached snapshot)"""
+        base_url, _ = plex_connection.get_credentials()
+        cached = self._recent_cache.get(limit)
+        if cached and cached[0] == base_url and time.monotonic() - cached[1] <= plex_events.ttl(self.RECENT_TTL, self.LIVE_TTL):
+            return cached[2]
+
+        content = await self._get(
+            "/library/recentlyAdded",
+            params=self._page_params(0, limit),
+        )
+        container, children = iter_container(content)
+        items = [PlexItemRecord(attrib, container, elem) for attrib, elem in children][:limit]
+        self._recent_cache[limit] = (base_url, time.monotonic(), items)
+        return items
+
+    def on_invalidation(self, event: Invalidation):
+        """Invalidation bus subscriber - counts and snapshots may be stale"""
+        self._sections_cache = None
+        self._recent_cache.clear()
+
+
+# Global singleton instance
+plex_reader = PlexReader()
+plex_events.subscribe(plex_reader.on_invalidation)
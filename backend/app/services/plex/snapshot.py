@@ -0,0 +1,254 @@
+"""
+Columnar in-memory library snapshots for vectorised analytics
+
+Each section's leaf items (movies, episodes or tracks) are held as NumPy
+columns - duration, addedAt epoch, year, file size and resolution code -
+plus a title string table. Histograms are computed with vectorised
+grouping instead of looping over Python objects. Snapshots are built once
+per section and patched in place from item-level invalidation events;
+section-level events mark them stale for a rebuild on next use. NumPy is
+imported with the first snapshot, not when the routes are loaded.
+"""
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional
+
+from app.services.plex.reader import plex_reader, PlexItemRecord
+from app.services.plex.events import plex_events, Invalidation
+
+# Resolution string table; code 0 is "unknown"
+RESOLUTIONS = ("unknown", "sd", "480", "576", "720", "1080", "2k", "4k")
+_RESOLUTION_CODES = {name: code for code, name in enumerate(RESOLUTIONS)}
+
+# Leaf item type per section type, and the listing filter that returns it
+# (Plex type ids: 4 = episode, 10 = track)
+LEAF_TYPES = {"movie": "movie", "show": "episode", "artist": "track"}
+LEAF_PARAMS = {
+    "show": {"type": 4},
+    "artist": {"type": 10},
+}
+
+GROUP_BY = ("year", "resolution", "added_month")
+
+
+def resolution_code(value: Optional[str]) -> int:
+    """Map a Plex videoResolution value onto the resolution string table"""
+    return _RESOLUTION_CODES.get((value or "").lower(), 0)
+
+
+class SectionSnapshot:
+    """Column arrays for one section's items"""
+
+    def __init__(self, section_key: str, items: Iterable[PlexItemRecord], leaf_type: Optional[str] = None):
+        import numpy as np
+
+        self.section_key = section_key
+        self.leaf_type = leaf_type
+        self.built_at = time.monotonic()
+        self.stale = False
+        self.rating_keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self.titles: List[str] = []
+        self._title_codes: Dict[str, int] = {}
+
+        columns = self._columns(items)
+        self.title = np.array(columns[0], dtype=np.int32)
+        self.duration = np.array(columns[1], dtype=np.int64)
+        self.added_at = np.array(columns[2], dtype=np.int64)
+        self.year = np.array(columns[3], dtype=np.int16)
+        self.size = np.array(columns[4], dtype=np.int64)
+        self.resolution = np.array(columns[5], dtype=np.int8)
+        self.alive = np.ones(len(self.rating_keys), dtype=bool)
+
+    def _title_code(self, title: str) -> int:
+        code = self._title_codes.get(title)
+        if code is None:
+            code = self._title_codes[title] = len(self.titles)
+            self.titles.append(title)
+        return code
+
+    def _columns(self, items: Iterable[PlexItemRecord]):
+        """Append items to the row index and return their column values"""
+        titles, durations, added, years, sizes, resolutions = [], [], [], [], [], []
+        for item in items:
+            self._rows[item.rating_key] = len(self.rating_keys)
+            self.rating_keys.append(item.rating_key)
+            titles.append(self._title_code(item.title))
+            durations.append(item.duration or 0)
+            added.append(int(item.added_at.timestamp()) if item.added_at else 0)
+            years.append(item.year or 0)
+            sizes.append(item.size or 0)
+            resolutions.append(resolution_code(item.video_resolution))
+        return titles, durations, added, years, sizes, resolutions
+
+    def __len__(self):
+        return int(self.alive.sum())
+
+    def patch(self, items: List[PlexItemRecord], missing: Iterable[str] = ()):
+        """Update changed rows in place, append new ones and drop missing ones"""
+        import numpy as np
+
+        new_items = []
+        for item in items:
+            if self.leaf_type and item.type != self.leaf_type:
+                continue  # e.g. an event for the show rather than an episode
+            row = self._rows.get(item.rating_key)
+            if row is None:
+                new_items.append(item)
+                continue
+            self.title[row] = self._title_code(item.title)
+            self.duration[row] = item.duration or 0
+            self.added_at[row] = int(item.added_at.timestamp()) if item.added_at else 0
+            self.year[row] = item.year or 0
+            self.size[row] = item.size or 0
+            self.resolution[row] = resolution_code(item.video_resolution)
+            self.alive[row] = True
+
+        for rating_key in missing:
+            row = self._rows.get(rating_key)
+            if row is not None:
+                self.alive[row] = False
+
+        if new_items:
+            columns = self._columns(new_items)
+            self.title = np.concatenate([self.title, np.array(columns[0], dtype=np.int32)])
+            self.duration = np.concatenate([self.duration, np.array(columns[1], dtype=np.int64)])
+            self.added_at = np.concatenate([self.added_at, np.array(columns[2], dtype=np.int64)])
+            self.year = np.concatenate([self.year, np.array(columns[3], dtype=np.int16)])
+            self.size = np.concatenate([self.size, np.array(columns[4], dtype=np.int64)])
+            self.resolution = np.concatenate([self.resolution, np.array(columns[5], dtype=np.int8)])
+            self.alive = np.concatenate([self.alive, np.ones(len(new_items), dtype=bool)])
+
+    def totals(self) -> dict:
+        """Item count, summed duration and summed file size"""
+        alive = self.alive
+        return {
+            "total_items": int(alive.sum()),
+            "total_duration_ms": int(self.duration[alive].sum()),
+            "total_size_bytes": int(self.size[alive].sum()),
+        }
+
+    def group_by(self, field: str) -> List[dict]:
+        """
+        Histogram of count, duration and size per group
+
+        Args:
+            field: 'year', 'resolution' or 'added_month'
+
+        Raises:
+            ValueError: For an unknown field
+        """
+        import numpy as np
+
+        alive = self.alive
+        if field == "year":
+            keys = self.year[alive]
+        elif field == "resolution":
+            keys = self.resolution[alive]
+        elif field == "added_month":
+            # Epoch seconds -> months since 1970-01 (0 = unknown addedAt)
+            added = self.added_at[alive]
+            keys = np.where(added > 0, added.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64) + 1, 0)
+        else:
+            raise ValueError(f"Invalid group_by '{field}'. Use one of: {', '.join(GROUP_BY)}")
+
+        groups, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(groups))
+        durations = np.bincount(inverse, weights=self.duration[alive], minlength=len(groups))
+        sizes = np.bincount(inverse, weights=self.size[alive], minlength=len(groups))
+
+        return [
+            {
+                "key": self._group_label(field, int(group)),
+                "count": int(count),
+                "duration_ms": int(duration),
+                "size_bytes": int(size),
+            }
+            for group, count, duration, size in zip(groups, counts, durations, sizes)
+        ]
+
+    @staticmethod
+    def _group_label(field: str, group: int):
+        import numpy as np
+
+        if field == "resolution":
+            return RESOLUTIONS[group] if 0 <= group < len(RESOLUTIONS) else "unknown"
+        if group == 0:
+            return None  # Missing year / addedAt
+        if field == "added_month":
+            return str(np.datetime64(group - 1, "M"))
+        return group
+
+
+class SnapshotStore:
+    """Builds, caches and incrementally refreshes section snapshots"""
+
+    # Rebuild interval (polling, while notifications are live)
+    TTL = (900.0, 6 * 3600.0)
+    METADATA_BATCH = 100
+
+    def __init__(self):
+        self._snapshots: Dict[str, SectionSnapshot] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pending: Dict[str, set] = {}
+
+    async def _build(self, section_key: str) -> SectionSnapshot:
+        section = await plex_reader.section(section_key)
+        params = LEAF_PARAMS.get(section.type)
+        items = [item async for item in plex_reader.stream_items(section.key, params)]
+        return SectionSnapshot(section.key, items, LEAF_TYPES.get(section.type))
+
+    async def get(self, section_key: str) -> SectionSnapshot:
+        """Current snapshot of a section, built or patched as needed"""
+        # One build or patch per section at a time; concurrent callers share it
+        inflight = self._inflight.get(section_key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[section_key] = future
+        try:
+            snapshot = await self._refresh(section_key)
+            future.set_result(snapshot)
+            return snapshot
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved - waiters (if any) re-raise it
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            del self._inflight[section_key]
+
+    async def _refresh(self, section_key: str) -> SectionSnapshot:
+        snapshot = self._snapshots.get(section_key)
+        expired = snapshot is not None and time.monotonic() - snapshot.built_at > plex_events.ttl(*self.TTL)
+        if snapshot is None or snapshot.stale or expired:
+            self._pending.pop(section_key, None)
+            snapshot = self._snapshots[section_key] = await self._build(section_key)
+            return snapshot
+
+        pending = list(self._pending.pop(section_key, ()))
+        if pending:
+            items = []
+            for start in range(0, len(pending), self.METADATA_BATCH):
+                items.extend(await plex_reader.metadata(pending[start:start + self.METADATA_BATCH]))
+            found = {item.rating_key for item in items}
+            snapshot.patch(items, [key for key in pending if key not in found])
+        return snapshot
+
+    def on_invalidation(self, event: Invalidation):
+        """Invalidation bus subscriber - queue item patches or mark sections stale"""
+        if event.section_key is None:
+            for snapshot in self._snapshots.values():
+                snapshot.stale = True
+        elif event.rating_key:
+            if event.section_key in self._snapshots:
+                self._pending.setdefault(event.section_key, set()).add(event.rating_key)
+        elif event.section_key in self._snapshots:
+            self._snapshots[event.section_key].stale = True
+
+
+# Global singleton instance
+library_snapshots = SnapshotStore()
+plex_events.subscribe(library_snapshots.on_invalidation)
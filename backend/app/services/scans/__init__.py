@@ -0,0 +1 @@
+"""Scan history services module initialization"""
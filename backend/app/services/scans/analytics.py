@@ -0,0 +1,182 @@
+"""
+Scan performance analytics computed in SQL
+
+Scan counts, failure rates and duration percentiles per library (or per
+scanned path), for a period and the one before it, so slowing libraries
+stand out without pulling raw scan_history rows out of the database.
+
+Percentiles are linearly interpolated, as percentile_cont. PostgreSQL
+computes them natively (percentile_cont ... WITHIN GROUP); SQLite has no
+ordered-set aggregates, so there the completed scans of each group are
+ranked with window functions (row_number, count) and the two rows around
+each percentile position are interpolated.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import Integer, and_, case, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.plex import ScanHistory
+
+# Grouping -> scan_history columns
+GROUPINGS = {
+    "library": ("library_key",),
+    "path": ("library_key", "path"),
+}
+PERCENTILES = {"p50": 0.5, "p95": 0.95}
+SORTS = ("p95", "p50", "trend", "failure_rate", "scans")
+MAX_DAYS = 365
+MAX_GROUPS = 500
+
+
+def _percentile_query(dialect: str, group_columns: list, period, window):
+    """Duration percentiles of completed scans per group and period"""
+    completed = and_(ScanHistory.status == "completed", ScanHistory.duration_seconds.isnot(None))
+    if dialect == "postgresql":
+        durations = case((completed, ScanHistory.duration_seconds))  # NULLs are ignored
+        return select(
+            *group_columns,
+            period.label("period"),
+            *[
+                func.percentile_cont(fraction).within_group(durations).label(name)
+                for name, fraction in PERCENTILES.items()
+            ],
+        ).where(window).group_by(*group_columns, period)
+
+    partition = [*group_columns, period]
+    ranked = select(
+        *group_columns,
+        period.label("period"),
+        ScanHistory.duration_seconds.label("duration"),
+        func.row_number().over(partition_by=partition, order_by=ScanHistory.duration_seconds).label("rn"),
+        func.count().over(partition_by=partition).label("n"),
+    ).where(window, completed).subquery()
+
+    percentiles = []
+    for name, fraction in PERCENTILES.items():
+        position = fraction * (ranked.c.n - 1)  # 0-based, fractional
+        lower = cast(position, Integer) + 1
+        lower_value = func.max(case((ranked.c.rn == lower, ranked.c.duration)))
+        upper_value = func.coalesce(func.max(case((ranked.c.rn == lower + 1, ranked.c.duration))), lower_value)
+        weight = func.max(position - cast(position, Integer))
+        percentiles.append((lower_value + weight * (upper_value - lower_value)).label(name))
+    keys = [ranked.c[column.name] for column in group_columns]
+    return select(*keys, ranked.c.period, *percentiles).group_by(*keys, ranked.c.period)
+
+
+def _change(current: Optional[float], previous: Optional[float]) -> Optional[float]:
+    """Relative change, e.g. 0.25 for 25% slower"""
+    if current is None or not previous:
+        return None
+    return round((current - previous) / previous, 3)
+
+
+async def scan_analytics(
+    db: AsyncSession,
+    group_by: str = "library",
+    days: int = 30,
+    library_key: Optional[str] = None,
+    sort: str = "p95",
+    limit: int = 50,
+) -> dict:
+    """
+    Scan statistics for the last `days` days, compared with the `days` before
+
+    Args:
+        db: Database session
+        group_by: 'library' or 'path' (partial scans of a path)
+        days: Period length in days
+        library_key: Only this library
+        sort: Order of the groups, descending - 'p95', 'p50', 'trend'
+              (p50 change vs the previous period), 'failure_rate' or 'scans'
+        limit: Most groups returned
+    """
+    if group_by not in GROUPINGS:
+        raise ValueError(f"group_by must be one of: {', '.join(GROUPINGS)}")
+    if sort not in SORTS:
+        raise ValueError(f"sort must be one of: {', '.join(SORTS)}")
+    if not 1 <= days <= MAX_DAYS:
+        raise ValueError(f"days must be between 1 and {MAX_DAYS}")
+    if not 1 <= limit <= MAX_GROUPS:
+        raise ValueError(f"limit must be between 1 and {MAX_GROUPS}")
+
+    now = datetime.utcnow()
+    current_start = now - timedelta(days=days)
+    previous_start = current_start - timedelta(days=days)
+
+    group_columns = [getattr(ScanHistory, name) for name in GROUPINGS[group_by]]
+    period = case((ScanHistory.started_at >= current_start, "current"), else_="previous")
+    window = ScanHistory.started_at >= previous_start
+    if group_by == "path":
+        window = and_(window, ScanHistory.path.isnot(None))
+    if library_key:
+        window = and_(window, ScanHistory.library_key == library_key)
+
+    counts = await db.execute(
+        select(
+            *group_columns,
+            period.label("period"),
+            func.max(ScanHistory.library_name).label("library_name"),
+            func.count(ScanHistory.id).label("scans"),
+            func.sum(case((ScanHistory.status == "completed", 1), else_=0)).label("completed"),
+            func.sum(case((ScanHistory.status == "failed", 1), else_=0)).label("failures"),
+        ).where(window).group_by(*group_columns, period)
+    )
+
+    percentiles = {
+        (tuple(row[:len(group_columns)]), row.period): row._mapping
+        for row in await db.execute(_percentile_query(db.bind.dialect.name, group_columns, period, window))
+    }
+
+    stats: Dict[tuple, Dict[str, dict]] = {}
+    for row in counts:
+        key = tuple(row[:len(group_columns)])
+        values = percentiles.get((key, row.period), {})
+        stats.setdefault(key, {})[row.period] = {
+            "library_name": row.library_name,
+            "scans": row.scans,
+            "completed": row.completed,
+            "failures": row.failures,
+            "failure_rate": round(row.failures / row.scans, 3) if row.scans else 0.0,
+            **{f"{name}_duration_seconds": values.get(name) for name in PERCENTILES},
+        }
+
+    groups: List[dict] = []
+    for key, periods in stats.items():
+        current = periods.get("current")
+        if current is None:
+            continue  # No scans in this period
+        previous = periods.get("previous")
+        group = dict(zip(GROUPINGS[group_by], key))
+        group.update(current)
+        if previous is not None:
+            previous.pop("library_name")
+        group["previous"] = previous
+        group["trend"] = {
+            "p50_change": _change(current["p50_duration_seconds"], previous and previous["p50_duration_seconds"]),
+            "p95_change": _change(current["p95_duration_seconds"], previous and previous["p95_duration_seconds"]),
+            "failure_rate_change": (
+                round(current["failure_rate"] - previous["failure_rate"], 3) if previous is not None else None
+            ),
+        }
+        groups.append(group)
+
+    sort_value = {
+        "p95": lambda g: g["p95_duration_seconds"],
+        "p50": lambda g: g["p50_duration_seconds"],
+        "trend": lambda g: g["trend"]["p50_change"],
+        "failure_rate": lambda g: g["failure_rate"],
+        "scans": lambda g: g["scans"],
+    }[sort]
+    # Groups without a value go last
+    groups.sort(key=lambda g: (sort_value(g) is not None, sort_value(g) or 0), reverse=True)
+
+    return {
+        "group_by": group_by,
+        "days": days,
+        "current_start": current_start.isoformat(),
+        "previous_start": previous_start.isoformat(),
+        "groups": groups[:limit],
+        "total": len(groups),
+    }
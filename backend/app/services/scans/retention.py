@@ -0,0 +1,253 @@
+"""
+Scan history retention
+
+scan_history grows with every scan. Rows older than
+SCAN_HISTORY_RETENTION_DAYS are rolled up into scan_history_daily (one row
+per library and day: scan count, failures, duration percentiles) and then
+purged, so the detail table - and every query over it - stays bounded
+while long-term trends survive. Retention is opt-in: with the default of
+0 nothing is rolled up or deleted unless run() is given a number of days.
+
+Rows are processed oldest first, at most PURGE_BATCH per write
+transaction: a batch is folded into its day's rollup and deleted in the
+same commit, so a scan is never counted twice and the single writer is
+never held for long, however busy a day was. A day that takes several
+batches gets percentiles weighted across them (see _merge). When
+scan_history is a TimescaleDB hypertable
+(migrate_scan_history_hypertable.py) rows are not deleted individually -
+days are only rolled up, and whole chunks past the cutoff are dropped
+with drop_chunks.
+"""
+import asyncio
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from loguru import logger
+from sqlalchemy import and_, delete, func, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, async_engine
+from app.db.writer import db_writer
+from app.models.plex import ScanHistory, ScanHistoryDaily
+
+
+def percentile_cont(values: Sequence[float], fraction: float) -> Optional[float]:
+    """Linearly interpolated percentile, like SQL percentile_cont"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = fraction * (len(ordered) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+def _rollups(day: date, rows) -> List[dict]:
+    """Aggregate one day of scan_history rows per library"""
+    by_library: Dict[str, list] = {}
+    for row in rows:
+        by_library.setdefault(row.library_key, []).append(row)
+
+    rollups = []
+    for library_key, scans in by_library.items():
+        latest = max(scans, key=lambda scan: scan.started_at)
+        durations = [
+            scan.duration_seconds for scan in scans
+            if scan.status == "completed" and scan.duration_seconds is not None
+        ]
+        rollups.append({
+            "day": day,
+            "library_key": library_key,
+            "library_name": latest.library_name,
+            "library_type": latest.library_type,
+            "scans": len(scans),
+            "completed": sum(1 for scan in scans if scan.status == "completed"),
+            "failures": sum(1 for scan in scans if scan.status == "failed"),
+            "total_duration_seconds": sum(durations),
+            "p50_duration_seconds": percentile_cont(durations, 0.5),
+            "p95_duration_seconds": percentile_cont(durations, 0.95),
+            "max_duration_seconds": max(durations) if durations else None,
+        })
+    return rollups
+
+
+def _merge(current: ScanHistoryDaily, rollup: dict):
+    """Fold a later rollup of the same library and day into an existing row"""
+    weights = (current.completed, rollup["completed"])
+    # Percentiles cannot be combined exactly - weight them by completed scans
+    for column in ("p50_duration_seconds", "p95_duration_seconds"):
+        values = [(v, w) for v, w in zip((getattr(current, column), rollup[column]), weights) if v is not None and w]
+        if values:
+            setattr(current, column, sum(v * w for v, w in values) / sum(w for _, w in values))
+    maxima = [v for v in (current.max_duration_seconds, rollup["max_duration_seconds"]) if v is not None]
+    current.max_duration_seconds = max(maxima) if maxima else None
+    for column in ("scans", "completed", "failures", "total_duration_seconds"):
+        setattr(current, column, getattr(current, column) + rollup[column])
+    current.library_name = rollup["library_name"]
+    current.library_type = rollup["library_type"]
+
+
+class ScanRetention:
+    """Periodic rollup and purge of old scan history"""
+
+    name = "Scan history retention"
+    # Let startup syncs settle before the first pass
+    STARTUP_DELAY = 60.0
+    # Most scan_history rows rolled up and deleted per write transaction
+    PURGE_BATCH = 5000
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def uses_chunks(self) -> bool:
+        """Whether scan_history is a TimescaleDB hypertable"""
+        if async_engine.dialect.name != "postgresql":
+            return False
+        async with AsyncSessionLocal() as db:
+            return bool(await db.scalar(
+                text(
+                    "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb') "
+                    "AND EXISTS (SELECT 1 FROM timescaledb_information.hypertables "
+                    "WHERE hypertable_name = :table)"
+                ),
+                {"table": ScanHistory.__tablename__},
+            ))
+
+    def _roll_up_next_day(self, db: Session, cutoff: datetime, purge: bool) -> Optional[Tuple[date, int]]:
+        """
+        Roll up the oldest rows before cutoff (write job, see app.db.writer)
+
+        With purge up to PURGE_BATCH rows of the oldest day are rolled up and
+        deleted in the same transaction. Without (hypertable) rows stay until
+        their chunk is dropped, so the whole oldest day after the newest
+        rollup is rolled up.
+
+        Returns:
+            Tuple of (day, rows rolled up), or None when nothing is left
+        """
+        query = select(func.min(ScanHistory.started_at)).where(ScanHistory.started_at < cutoff)
+        if not purge:
+            newest = db.scalar(select(func.max(ScanHistoryDaily.day)))
+            if newest is not None:
+                query = query.where(ScanHistory.started_at >= _midnight(newest + timedelta(days=1)))
+        first = db.scalar(query)
+        if first is None:
+            return None
+
+        day = first.date()
+        in_day = and_(
+            ScanHistory.started_at >= _midnight(day),
+            ScanHistory.started_at < _midnight(day + timedelta(days=1)),
+        )
+        query = select(
+            ScanHistory.id,
+            ScanHistory.library_key,
+            ScanHistory.library_name,
+            ScanHistory.library_type,
+            ScanHistory.status,
+            ScanHistory.started_at,
+            ScanHistory.duration_seconds,
+        ).where(in_day)
+        if purge:
+            query = query.order_by(ScanHistory.started_at, ScanHistory.id).limit(self.PURGE_BATCH)
+        rows = db.execute(query).all()
+        existing = {
+            rollup.library_key: rollup
+            for rollup in db.scalars(select(ScanHistoryDaily).where(ScanHistoryDaily.day == day))
+        }
+        for rollup in _rollups(day, rows):
+            current = existing.get(rollup["library_key"])
+            if current is None:
+                db.add(ScanHistoryDaily(**rollup))
+            else:
+                _merge(current, rollup)
+        if purge:
+            db.execute(delete(ScanHistory).where(ScanHistory.id.in_([row.id for row in rows])))
+        return day, len(rows)
+
+    def _drop_chunks(self, db: Session, cutoff: datetime) -> int:
+        """Drop hypertable chunks entirely older than cutoff (write job)"""
+        return len(db.execute(
+            text(f"SELECT drop_chunks('{ScanHistory.__tablename__}', older_than => :cutoff)"),
+            {"cutoff": cutoff},
+        ).all())
+
+    async def run(self, days: Optional[int] = None) -> dict:
+        """
+        Roll up and purge scan history older than `days` whole days
+
+        Args:
+            days: Retention age (default SCAN_HISTORY_RETENTION_DAYS)
+
+        Returns:
+            Dict with the cutoff, days rolled up, rows purged and chunks dropped
+        """
+        if days is None:
+            days = settings.SCAN_HISTORY_RETENTION_DAYS
+            if days < 1:
+                raise ValueError("Scan history retention is off - pass days or set SCAN_HISTORY_RETENTION_DAYS")
+        if days < 1:
+            raise ValueError("Retention must be at least 1 day")
+        cutoff = _midnight(datetime.utcnow().date() - timedelta(days=days))
+        chunks = await self.uses_chunks()
+
+        days_seen, rows = set(), 0
+        async with self._lock:
+            while True:
+                result = await db_writer.run(lambda db: self._roll_up_next_day(db, cutoff, purge=not chunks))
+                if result is None:
+                    break
+                days_seen.add(result[0])
+                rows += result[1]
+            dropped = await db_writer.run(lambda db: self._drop_chunks(db, cutoff)) if chunks else 0
+
+        rolled_up = len(days_seen)
+        summary = {
+            "cutoff": cutoff.isoformat(),
+            "days_rolled_up": rolled_up,
+            "rows_rolled_up": rows,
+            "rows_purged": 0 if chunks else rows,
+            "chunks_dropped": dropped,
+        }
+        if rolled_up or dropped:
+            logger.info(
+                f"Scan history before {cutoff.date()}: {rolled_up} days ({rows} scans) rolled up, "
+                + (f"{dropped} chunks dropped" if chunks else f"{rows} rows purged")
+            )
+        return summary
+
+    def start(self):
+        """Start the periodic retention pass"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """Stop the periodic retention pass"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _loop(self):
+        await asyncio.sleep(self.STARTUP_DELAY)
+        while True:
+            try:
+                await self.run()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"{self.name} failed: {str(e)}")
+            await asyncio.sleep(settings.SCAN_HISTORY_RETENTION_INTERVAL_HOURS * 3600)
+
+
+# Global singleton instance
+scan_retention = ScanRetention()
@@ -0,0 +1,95 @@
+"""
+Telemetry recording
+Samples are buffered and written in batches (app.db.buffer). Request
+paths use record_nowait(), which costs a list append and never waits: when
+the database has fallen TELEMETRY_MAX_PENDING samples behind, new samples
+are dropped and counted (buffer.dropped). record() waits for room instead.
+Old samples are pruned periodically.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.buffer import WriteBuffer
+from app.db.writer import db_writer
+from app.models.telemetry import TelemetrySample
+
+PRUNE_INTERVAL = 3600.0
+
+
+class Telemetry:
+    """Buffered telemetry sample writer"""
+
+    def __init__(self):
+        self.buffer = WriteBuffer(
+            TelemetrySample.__table__,
+            batch_size=settings.TELEMETRY_BATCH_SIZE,
+            flush_interval=settings.TELEMETRY_FLUSH_INTERVAL,
+            max_pending=settings.TELEMETRY_MAX_PENDING,
+        )
+        self._prune_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _sample(metric: str, source: str, value: float, recorded_at: Optional[datetime]) -> dict:
+        return {
+            "metric": metric,
+            "source": source,
+            "value": float(value),
+            "recorded_at": recorded_at or datetime.utcnow(),
+        }
+
+    async def record(self, metric: str, source: str, value: float, recorded_at: Optional[datetime] = None):
+        """Record one sample, waiting while the buffer is full (no-op when telemetry is disabled)"""
+        if not settings.TELEMETRY_ENABLED or value is None:
+            return
+        await self.buffer.add(self._sample(metric, source, value, recorded_at))
+
+    def record_nowait(self, metric: str, source: str, value: float, recorded_at: Optional[datetime] = None):
+        """Record one sample, dropping it if the buffer is full (no-op when telemetry is disabled)"""
+        if not settings.TELEMETRY_ENABLED or value is None:
+            return
+        self.buffer.add_nowait(self._sample(metric, source, value, recorded_at))
+
+    def _prune(self, db: Session, days: int) -> int:
+        """Delete samples older than `days` (write job)"""
+        return db.execute(
+            delete(TelemetrySample).where(TelemetrySample.recorded_at < datetime.utcnow() - timedelta(days=days))
+        ).rowcount
+
+    def start(self):
+        """Start periodic pruning"""
+        if settings.TELEMETRY_RETENTION_DAYS > 0 and (self._prune_task is None or self._prune_task.done()):
+            self._prune_task = asyncio.create_task(self._prune_loop())
+
+    async def stop(self):
+        """Stop pruning and write out buffered samples"""
+        if self._prune_task is not None:
+            self._prune_task.cancel()
+            try:
+                await self._prune_task
+            except asyncio.CancelledError:
+                pass
+            self._prune_task = None
+        await self.buffer.close()
+
+    async def _prune_loop(self):
+        while True:
+            try:
+                days = settings.TELEMETRY_RETENTION_DAYS
+                removed = await db_writer.run(lambda db: self._prune(db, days))
+                if removed:
+                    logger.debug(f"Pruned {removed} telemetry samples older than {days} days")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Telemetry prune failed: {str(e)}")
+            await asyncio.sleep(PRUNE_INTERVAL)
+
+
+# Global singleton instance
+telemetry = Telemetry()
@@ -0,0 +1,262 @@
+"""
+Startup warm-up and readiness
+
+The server answers as soon as it has started (/api/health/live), but is
+only ready for traffic (/api/health/ready) once it is warm. The warm-up
+runs in the background after startup:
+
+1. database: schema bootstrap and the stored Plex configuration, in a
+   worker thread so the event loop keeps serving health checks. Retried
+   with backoff (up to DATABASE_RETRY_MAX_DELAY seconds apart) until it
+   succeeds - nothing else can start without it
+2. concurrently:
+   - plex: connect (plexapi, in a worker thread) and prime the section
+     list and recently added caches of the direct reader
+   - integrations: a status call to every enabled integration, which
+     opens keep-alive connections in the shared HTTP pool
+   - replica: the first read replica lag check
+   - any extra steps passed to start() (e.g. waiting for the routers)
+3. the background services (notifications, library index, ...) start
+
+Ready means the warm-up has finished and the database step and every
+extra step succeeded - a route module that failed to import keeps the
+server out of the load balancer. A database that is down at startup
+holds readiness back only until a retry succeeds. Plex and integration
+steps give up after WARMUP_TIMEOUT_SECONDS, and their failures are
+reported but don't hold readiness back - an unreachable upstream must not
+take the settings pages out of the load balancer.
+
+Heavy modules are imported inside the steps: this module is imported by
+the health routes, which are loaded before everything else.
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+from app.core.config import settings
+
+# Delay before the first database retry, doubled up to the max (seconds)
+DATABASE_RETRY_DELAY = 1.0
+DATABASE_RETRY_MAX_DELAY = 30.0
+
+
+class StepSkipped(Exception):
+    """Raised by a step with nothing to warm up"""
+
+
+class Warmup:
+    """Background warm-up and readiness state"""
+
+    def __init__(self):
+        self.steps: Dict[str, dict] = {}
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.required: Tuple[str, ...] = ("database",)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        """Warm-up finished and the database and extra steps succeeded"""
+        return self.finished_at is not None and all(
+            self.steps.get(name, {}).get("status") == "ok" for name in self.required
+        )
+
+    def status(self) -> dict:
+        """Readiness and per-step results (for /api/health/ready)"""
+        return {
+            "ready": self.ready,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "steps": self.steps,
+        }
+
+    def start(self, **steps: Callable[[], Awaitable]):
+        """
+        Start the warm-up in the background
+
+        Args:
+            **steps: Extra steps (name -> coroutine function) run
+                     concurrently with the upstream steps
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(steps))
+
+    async def stop(self):
+        """Cancel an unfinished warm-up"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _step(self, name: str, step: Callable[[], Awaitable], timeout: Optional[float] = None):
+        """Run one step and record its outcome"""
+        self.steps[name] = {"status": "running"}
+        started = time.perf_counter()
+        try:
+            detail = await asyncio.wait_for(step(), timeout)
+            self.steps[name] = {"status": "ok"}
+            if detail:
+                self.steps[name]["detail"] = detail
+        except StepSkipped as e:
+            self.steps[name] = {"status": "skipped", "detail": str(e)}
+        except asyncio.TimeoutError:
+            self.steps[name] = {"status": "failed", "error": f"timed out after {timeout:.0f}s"}
+        except Exception as e:
+            self.steps[name] = {"status": "failed", "error": str(e)}
+        self.steps[name]["seconds"] = round(time.perf_counter() - started, 3)
+        if self.steps[name]["status"] == "failed":
+            logger.warning(f"Warm-up step {name} failed: {self.steps[name]['error']}")
+
+    async def _run(self, extra: Dict[str, Callable[[], Awaitable]]):
+        self.steps = {}
+        self.required = ("database", *extra)
+        self.started_at = datetime.utcnow()
+        self.finished_at = None
+        started = time.perf_counter()
+
+        await self._wait_for_database()
+        timeout = settings.WARMUP_TIMEOUT_SECONDS
+        await asyncio.gather(
+            self._step("plex", self._plex, timeout),
+            self._step("integrations", self._integrations, timeout),
+            self._step("replica", self._replica, timeout),
+            *(self._step(name, step) for name, step in extra.items()),
+        )
+        # Only reached once the database step succeeded
+        self._start_services()
+
+        self.finished_at = datetime.utcnow()
+        if self.ready:
+            logger.info(f"Warm-up finished in {time.perf_counter() - started:.2f}s - ready")
+        else:
+            failed = [name for name in self.required if self.steps.get(name, {}).get("status") != "ok"]
+            logger.error(f"Warm-up finished in {time.perf_counter() - started:.2f}s - not ready ({', '.join(failed)} failed)")
+
+    async def _wait_for_database(self):
+        """Run the database step until it succeeds, backing off between attempts"""
+        delay, attempts = DATABASE_RETRY_DELAY, 0
+        while True:
+            await self._step("database", self._database)
+            attempts += 1
+            self.steps["database"]["attempts"] = attempts
+            if self.steps["database"]["status"] == "ok":
+                return
+            self.steps["database"]["retry_in"] = delay
+            logger.warning(f"Database unavailable, retrying warm-up in {delay:.0f}s (attempt {attempts})")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, DATABASE_RETRY_MAX_DELAY)
+
+    async def _database(self):
+        """Bootstrap the schema and load the stored Plex configuration"""
+        await asyncio.to_thread(self._load_database)
+
+    @staticmethod
+    def _load_database():
+        from app.db.session import SessionLocal, init_db
+        from app.models.plex import PlexServerConfig
+        from app.services.plex.connection import plex_connection
+
+        if not init_db():
+            logger.info("Database schema up to date")
+
+        db = SessionLocal()
+        try:
+            config = db.query(PlexServerConfig).first()
+            if config:
+                plex_connection.set_config(config.url, config.token)
+                logger.info(f"Loaded Plex config from database: {config.name}")
+            else:
+                logger.info("No Plex configuration found in database")
+        finally:
+            db.close()
+
+    async def _plex(self) -> dict:
+        """Connect to Plex and prime the reader's caches"""
+        from app.services.plex.connection import plex_connection
+        from app.services.plex.reader import plex_reader
+
+        if not plex_connection.is_configured():
+            raise StepSkipped("Plex not configured")
+        server, sections, _ = await asyncio.gather(
+            asyncio.to_thread(plex_connection.get_connection),
+            plex_reader.sections(),
+            plex_reader.recently_added(limit=10),  # Dashboard
+        )
+        return {"server_name": server.friendlyName, "libraries": len(sections)}
+
+    async def _integrations(self) -> dict:
+        """Open pooled connections to every enabled integration"""
+        from sqlalchemy import select
+
+        from app.db.session import AsyncSessionLocal
+        from app.models.integrations import IntegrationConfig
+        from app.services.integrations import CLIENTS
+
+        async with AsyncSessionLocal() as db:
+            configs = (await db.scalars(
+                select(IntegrationConfig).where(IntegrationConfig.enabled == True)
+            )).all()
+        configs = [config for config in configs if config.service_type.lower() in CLIENTS]
+        if not configs:
+            raise StepSkipped("No integrations enabled")
+
+        results = await asyncio.gather(*(
+            CLIENTS[config.service_type.lower()](config.url, config.api_key).test_connection()
+            for config in configs
+        ))
+        detail = {config.name: success for config, (success, _, _) in zip(configs, results)}
+        failed = [name for name, success in detail.items() if not success]
+        if failed:
+            raise RuntimeError(f"unreachable: {', '.join(failed)}")
+        return detail
+
+    async def _replica(self) -> dict:
+        """First replica lag check, so reads can use it right away"""
+        from app.db.session import async_read_engine, has_replica, replica
+
+        if not has_replica():
+            raise StepSkipped("No read replica configured")
+        usable = await replica.check_async(async_read_engine)
+        return {"usable": usable, "lag_seconds": replica.lag}
+
+    @staticmethod
+    def _start_services():
+        """Start the background services once the database is ready"""
+        # Listen for Plex change notifications to invalidate caches
+        if settings.PLEX_NOTIFICATIONS_ENABLED:
+            from app.services.plex.events import plex_notifications
+            plex_notifications.start()
+
+        # Build and maintain the local library search index
+        if settings.LIBRARY_INDEX_ENABLED:
+            from app.services.library.index import library_index
+            library_index.start()
+
+        # Build and maintain the media inventory (media_parts)
+        if settings.MEDIA_INVENTORY_ENABLED:
+            from app.services.library.inventory import media_inventory
+            media_inventory.start()
+
+        # Keep posters of recently added items in the artwork cache
+        if settings.IMAGE_PREFETCH_ENABLED:
+            from app.services.library.prefetch import poster_prefetcher
+            poster_prefetcher.start()
+
+        # Prune old telemetry samples
+        from app.services.telemetry import telemetry
+        telemetry.start()
+
+        # Roll up and purge old scan history
+        if settings.SCAN_HISTORY_RETENTION_DAYS > 0:
+            from app.services.scans.retention import scan_retention
+            scan_retention.start()
+
+
+# Global singleton instance
+warmup = Warmup()
@@ -0,0 +1,167 @@
+"""
+Benchmark: mixed read/write throughput on SQLite, default vs tuned profile
+
+Runs the same workload twice against a fresh database file:
+- default: stock SQLite settings (rollback journal), writers race each other
+- tuned:   WAL + pragmas from app.db.sqlite, writes through the single-writer queue
+
+Readers page through scan history the way /api/scan/scan-history does;
+writers record scans (insert, then mark completed) like the scan route.
+
+Usage:
+    python benchmark_sqlite.py [--seconds 10] [--readers 8] [--writers 4] [--rows 20000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Make the app package importable when run from anywhere
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# The app's own engines are not used, but importing settings needs a URL
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.db.sqlite import tune_engine
+from app.db.writer import WriteQueue
+from app.models.plex import ScanHistory
+
+LIBRARIES = 10
+
+
+def seed(url: str, rows: int, tuned: bool):
+    """Create scan_history and fill it with old scans"""
+    engine = create_engine(url)
+    if tuned:
+        tune_engine(engine)
+    ScanHistory.__table__.create(engine)
+    start = datetime.utcnow() - timedelta(days=365)
+    with engine.begin() as conn:
+        conn.execute(ScanHistory.__table__.insert(), [
+            {
+                "library_key": str(i % LIBRARIES),
+                "library_name": f"Library {i % LIBRARIES}",
+                "library_type": "movie",
+                "scan_type": "full",
+                "status": "completed",
+                "started_at": start + timedelta(minutes=i),
+                "completed_at": start + timedelta(minutes=i, seconds=30),
+                "duration_seconds": 30.0,
+                "created_at": start,
+                "updated_at": start,
+            }
+            for i in range(rows)
+        ])
+    engine.dispose()
+
+
+async def run(path: str, tuned: bool, seconds: float, readers: int, writers: int) -> dict:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    write_engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    if tuned:
+        tune_engine(engine.sync_engine)
+        tune_engine(write_engine)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    queue = WriteQueue(sessionmaker(bind=write_engine, expire_on_commit=False), serialize=True)
+    deadline = time.perf_counter() + seconds
+    stats = {"reads": [], "writes": [], "errors": 0}
+
+    async def reader():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                async with sessions() as db:
+                    query = (
+                        select(ScanHistory)
+                        .where(ScanHistory.library_key == str(random.randrange(LIBRARIES)))
+                        .order_by(ScanHistory.started_at.desc(), ScanHistory.id.desc())
+                        .limit(50)
+                    )
+                    (await db.scalars(query)).all()
+                stats["reads"].append(time.perf_counter() - started)
+            except Exception:
+                stats["errors"] += 1
+
+    async def write(scan: ScanHistory):
+        if tuned:
+            await queue.add(scan)
+        else:
+            async with sessions() as db:
+                db.add(scan)
+                await db.commit()
+
+    async def writer():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                scan = ScanHistory(
+                    library_key=str(random.randrange(LIBRARIES)),
+                    library_name="Benchmark",
+                    library_type="movie",
+                    scan_type="partial",
+                    status="started",
+                    started_at=datetime.utcnow(),
+                )
+                await write(scan)
+                scan.status = "completed"
+                scan.completed_at = datetime.utcnow()
+                await write(scan)
+                stats["writes"].append(time.perf_counter() - started)
+            except Exception:
+                stats["errors"] += 1
+
+    await asyncio.gather(*[reader() for _ in range(readers)], *[writer() for _ in range(writers)])
+    await queue.close()
+    await engine.dispose()
+    write_engine.dispose()
+    return stats
+
+
+def percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def report(name: str, stats: dict, seconds: float):
+    reads, writes = stats["reads"], stats["writes"]
+    print(
+        f"{name:<8} "
+        f"{len(reads) / seconds:>10.0f} {len(writes) / seconds:>10.0f} "
+        f"{percentile(reads, 0.5) * 1000:>9.1f} {percentile(reads, 0.95) * 1000:>9.1f} "
+        f"{percentile(writes, 0.5) * 1000:>9.1f} {percentile(writes, 0.95) * 1000:>9.1f} "
+        f"{stats['errors']:>7}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers, {args.writers} writers, {args.seconds:.0f}s each, {args.rows} seeded rows")
+    print(f"{'profile':<8} {'reads/s':>10} {'writes/s':>10} {'read p50':>9} {'read p95':>9} "
+          f"{'write p50':>9} {'write p95':>9} {'errors':>7}")
+    print(f"{'':<8} {'':>10} {'(scans)':>10} {'(ms)':>9} {'(ms)':>9} {'(ms)':>9} {'(ms)':>9}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, tuned in (("default", False), ("tuned", True)):
+            path = os.path.join(directory, f"{name}.db")
+            seed(f"sqlite:///{path}", args.rows, tuned)
+            stats = asyncio.run(run(path, tuned, args.seconds, args.readers, args.writers))
+            report(name, stats, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
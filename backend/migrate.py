@@ -0,0 +1,67 @@
+"""
+Database schema bootstrap and migrations
+
+Does what application startup does: creates missing tables, applies
+pending migrations (app/db/migrations.py) and records the schema
+fingerprint - or nothing, if the fingerprint already matches. Safe to run
+repeatedly. Use --status to inspect without changing anything.
+
+Usage:
+    python migrate.py [--status]
+"""
+import argparse
+import sys
+import os
+
+# Make the app package importable when run from anywhere
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from loguru import logger
+
+from app.db.session import engine, init_db
+
+
+def show_status():
+    """Log the fingerprint state and applied / pending migrations"""
+    from app.models import plex, integrations, library, telemetry  # Import all models
+    from sqlalchemy import inspect
+
+    from app.db.migrations import MIGRATIONS, applied_migrations, schema_migrations
+    from app.db.schema import schema_fingerprint, stored_fingerprint
+
+    fingerprint = schema_fingerprint(engine.dialect)
+    stored = stored_fingerprint(engine)
+    if stored == fingerprint:
+        logger.info(f"Schema fingerprint {fingerprint[:12]} matches - nothing to do")
+    else:
+        logger.info(f"Schema fingerprint {fingerprint[:12]} (stored: {stored[:12] if stored else 'none'})")
+    # applied_migrations creates its table - a never-migrated database has nothing applied
+    applied = set(applied_migrations(engine)) if inspect(engine).has_table(schema_migrations.name) else set()
+    for migration in MIGRATIONS:
+        logger.info(f"  {'✓' if migration.name in applied else '·'} {migration.name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--status", action="store_true", help="show state without changing anything")
+    args = parser.parse_args()
+
+    logger.info("=" * 60)
+    logger.info("Database Migrations")
+    logger.info("=" * 60)
+
+    try:
+        if args.status:
+            show_status()
+            return
+        if init_db():
+            logger.success("\n✓ Schema built and migrations applied")
+        else:
+            logger.success("\n✓ Schema already up to date")
+    except Exception as e:
+        logger.error(f"\n✗ Migration failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
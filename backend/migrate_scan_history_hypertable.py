@@ -0,0 +1,84 @@
+"""
+Database migration: Partition scan_history as a TimescaleDB hypertable
+
+Optional, PostgreSQL with the timescaledb extension only. Once scan_history
+is a hypertable it is stored in time chunks of started_at, and retention
+drops whole chunks past SCAN_HISTORY_RETENTION_DAYS instead of deleting
+rows (see app/services/scans/retention.py).
+
+TimescaleDB requires the partitioning column in every unique constraint,
+so the primary key becomes (id, started_at); ids stay unique since they
+come from the same sequence. Safe to run repeatedly.
+"""
+import sys
+import os
+
+# Make the app package importable when run from anywhere
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import inspect, text
+from loguru import logger
+
+from app.db.session import engine
+from app.models.plex import ScanHistory
+
+# Time range stored per chunk (the granularity chunks are dropped at)
+CHUNK_INTERVAL = "7 days"
+
+
+def run_migration():
+    """Convert scan_history to a hypertable partitioned on started_at"""
+    if engine.dialect.name != "postgresql":
+        logger.info("Not a PostgreSQL database - hypertables need TimescaleDB, nothing to do")
+        return
+
+    table = ScanHistory.__tablename__
+    inspector = inspect(engine)
+    if not inspector.has_table(table):
+        logger.info("scan_history table does not exist yet - start the app once first")
+        return
+
+    with engine.begin() as conn:
+        available = conn.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'timescaledb')"
+        )).scalar()
+        if not available:
+            raise RuntimeError("The timescaledb extension is not installed on this PostgreSQL server")
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS timescaledb"))
+
+        is_hypertable = conn.execute(
+            text("SELECT EXISTS (SELECT 1 FROM timescaledb_information.hypertables WHERE hypertable_name = :table)"),
+            {"table": table},
+        ).scalar()
+        if is_hypertable:
+            logger.info("✓ scan_history is already a hypertable")
+            return
+
+        primary_key = inspector.get_pk_constraint(table)
+        if primary_key["constrained_columns"] != ["id", "started_at"]:
+            logger.info("Extending the primary key to (id, started_at)...")
+            conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{primary_key["name"]}"'))
+            conn.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY (id, started_at)"))
+
+        logger.info(f"Creating hypertable ({CHUNK_INTERVAL} chunks, existing rows are moved)...")
+        conn.execute(
+            text(
+                "SELECT create_hypertable(:table, 'started_at', "
+                "chunk_time_interval => CAST(:interval AS INTERVAL), migrate_data => true)"
+            ),
+            {"table": table, "interval": CHUNK_INTERVAL},
+        )
+        logger.success("✓ scan_history is now a hypertable")
+
+
+if __name__ == "__main__":
+    logger.info("=" * 60)
+    logger.info("Scan History Hypertable Migration")
+    logger.info("=" * 60)
+
+    try:
+        run_migration()
+        logger.success("\n✓ Migration completed successfully!")
+    except Exception as e:
+        logger.error(f"\n✗ Migration failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,18 @@
+"""
+Database migration: Add composite indexes to scan_history
+
+Superseded by the migration runner - covered by 0002_scan_history_indexes,
+which startup applies automatically. Kept so existing instructions still
+work; equivalent to `python migrate.py`.
+"""
+import sys
+import os
+
+# Make the app package importable when run from anywhere
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from migrate import main
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Import-time profile of the backend
+
+Imports a module in a fresh interpreter with `python -X importtime` and
+shows where the time goes: the slowest imports (cumulative, including
+what they import) and the total self time per top-level package. By
+default it profiles app.main - what has to be imported before the server
+can answer /api/health. With --routes the route modules (loaded in the
+background after startup, see app.api.loader) are profiled as well.
+
+Usage:
+    python profile_imports.py [--module app.main] [--routes] [--top 25]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# "import time:  self [us] | cumulative | imported package"
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def profile(module: str, routes: bool) -> list:
+    """Run the import and return (module, depth, self_us, cumulative_us) rows"""
+    code = f"import {module}"
+    if routes:
+        code += (
+            "\nimport importlib\nfrom app.api.loader import ROUTERS\n"
+            "for name, _, _ in ROUTERS:\n    importlib.import_module('app.api.routes.' + name)"
+        )
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite://")  # Importing settings needs a URL
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"Import failed:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, len(indent) // 2, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main", help="module to import (default: app.main)")
+    parser.add_argument("--routes", action="store_true", help="also import every route module")
+    parser.add_argument("--top", type=int, default=25, help="rows per table")
+    args = parser.parse_args()
+
+    rows = profile(args.module, args.routes)
+    total = sum(cumulative for _, depth, _, cumulative in rows if depth == 0)
+    packages = defaultdict(int)
+    for name, _, self_us, _ in rows:
+        packages[name.split(".")[0]] += self_us
+
+    print(f"\nImporting {args.module}{' + routes' if args.routes else ''}: {total / 1000:.0f} ms, {len(rows)} modules")
+
+    print("\nSlowest imports (cumulative ms, self ms):")
+    for name, _, self_us, cumulative_us in sorted(rows, key=lambda row: row[3], reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} {self_us / 1000:8.1f}  {name}")
+
+    print("\nSelf time per package (ms):")
+    for name, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
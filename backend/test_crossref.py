@@ -0,0 +1,119 @@
+"""
+Plex vs Radarr / Sonarr cross-reference tests
+The Plex side is fed directly (no database, no Plex server), the *arr
+catalogs are plain dicts as returned by their APIs
+
+Run with: pytest test_crossref.py
+"""
+import asyncio
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(".")
+
+# The library index imports the DB session; an in-memory SQLite is enough here
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.services.library.crossref import CrossReference
+from app.services.library.index import IndexDiff
+
+
+def plex_item(rating_key: str, title: str, guids, section_key: str = "1", item_type: str = "movie") -> dict:
+    return {
+        "rating_key": rating_key,
+        "library_key": section_key,
+        "type": item_type,
+        "title": title,
+        "year": None,
+        "guids": list(guids),
+    }
+
+
+def crossref_with(*items) -> CrossReference:
+    crossref = CrossReference()
+    crossref.plex._read = lambda: {item["rating_key"]: dict(item, guids=list(item["guids"])) for item in items}
+    return crossref
+
+
+def radarr_movie(movie_id: int, title: str, tmdb_id: int = 0, imdb_id: str = "", monitored: bool = True) -> dict:
+    return {"id": movie_id, "title": title, "tmdbId": tmdb_id, "imdbId": imdb_id, "monitored": monitored, "hasFile": True}
+
+
+def test_every_plex_copy_of_a_movie_is_matched():
+    crossref = crossref_with(
+        plex_item("10", "Dune", ["tmdb://438631"], section_key="1"),
+        plex_item("20", "Dune", ["tmdb://438631", "imdb://tt1160419"], section_key="2"),  # 4K library
+    )
+
+    report = asyncio.run(crossref.report("radarr", [radarr_movie(1, "Dune", tmdb_id=438631)]))
+    assert report["matched"] == 2
+    assert report["unmanaged_in_plex"] == []
+    assert report["missing_from_plex"] == []
+
+
+def test_copies_matched_through_different_ids():
+    crossref = crossref_with(
+        plex_item("10", "Dune", ["tmdb://438631"]),
+        plex_item("20", "Dune", ["imdb://tt1160419"]),
+    )
+
+    report = asyncio.run(crossref.report("radarr", [radarr_movie(1, "Dune", tmdb_id=438631, imdb_id="tt1160419")]))
+    assert report["matched"] == 2
+    assert report["unmanaged_in_plex"] == []
+
+
+def test_removing_one_copy_keeps_the_other_matched():
+    crossref = crossref_with(
+        plex_item("10", "Dune", ["tmdb://438631"]),
+        plex_item("20", "Dune", ["tmdb://438631"]),
+    )
+    catalog = [radarr_movie(1, "Dune", tmdb_id=438631)]
+    asyncio.run(crossref.report("radarr", catalog))
+
+    diff = IndexDiff("1")
+    diff.removed = [{"id": 1, "rating_key": "10", "section_key": "1"}]
+    crossref.plex.on_index_diff(diff)
+
+    report = asyncio.run(crossref.report("radarr", catalog))
+    assert report["matched"] == 1
+    assert report["plex_items"] == 1
+
+
+def test_missing_and_unmanaged():
+    crossref = crossref_with(
+        plex_item("10", "Alien", ["tmdb://348"]),
+        plex_item("11", "Home Video", []),
+    )
+    catalog = [
+        radarr_movie(1, "Alien", tmdb_id=348),
+        radarr_movie(2, "Aliens", tmdb_id=679),
+        radarr_movie(3, "Alien 3", tmdb_id=8077, monitored=False),
+    ]
+
+    report = asyncio.run(crossref.report("radarr", catalog))
+    assert [entry["title"] for entry in report["missing_from_plex"]] == ["Aliens"]
+    assert [item["rating_key"] for item in report["unmanaged_in_plex"]] == ["11"]
+    assert report["plex_items_without_ids"] == 1
+
+    report = asyncio.run(crossref.report("radarr", catalog, monitored_only=False))
+    assert [entry["title"] for entry in report["missing_from_plex"]] == ["Alien 3", "Aliens"]
+
+
+def test_diffs_during_load_are_replayed():
+    crossref = crossref_with(plex_item("10", "Dune", ["tmdb://438631"]))
+    read = crossref.plex._read
+
+    def slow_read():
+        # An index write lands while the Plex side is being read
+        diff = IndexDiff("1")
+        diff.added = [{
+            "rating_key": "20", "section_key": "2", "type": "movie",
+            "title": "Dune", "year": None, "guids": ["tmdb://438631"],
+        }]
+        crossref.plex.on_index_diff(diff)
+        return read()
+
+    crossref.plex._read = slow_read
+    report = asyncio.run(crossref.report("radarr", [radarr_movie(1, "Dune", tmdb_id=438631)]))
+    assert report["matched"] == 2
@@ -0,0 +1,214 @@
+"""
+Local library index tests
+Index writes (added / updated / removed diffs, external ids), FTS5 search
+and the change feed cursor, run against a temporary SQLite database - no
+Plex server needed
+
+Run with: pytest test_library_index.py
+"""
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(".")
+
+# Search picks its SQL by the app engine's dialect; SQLite here
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.library import LibraryChange, LibraryItemGuid
+from app.services.library.index import LibraryIndex
+
+
+def item(rating_key: str, title: str, section_key: str = "1", **fields) -> dict:
+    """An index row as built from a Plex item"""
+    row = {
+        "rating_key": rating_key,
+        "section_key": section_key,
+        "type": "movie",
+        "title": title,
+        "original_title": None,
+        "year": None,
+        "file_path": None,
+        "plex_added_at": datetime(2024, 1, 1),
+        "plex_updated_at": datetime(2024, 1, 1),
+        "guids": [],
+    }
+    row.update(fields)
+    return row
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'index.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def index():
+    return LibraryIndex()
+
+
+def write(index, db, rows, section_key="1", complete=True, missing=()):
+    diff = index._write(db, section_key, rows, complete, missing)
+    db.commit()
+    return diff
+
+
+def test_write_reports_added_updated_and_removed(index, db):
+    diff = write(index, db, [item("1", "Alien"), item("2", "Aliens")])
+    assert [r["rating_key"] for r in diff.added] == ["1", "2"]
+    assert not diff.updated and not diff.removed
+
+    diff = write(index, db, [item("1", "Alien", year=1979), item("3", "Alien 3")])
+    assert [r["rating_key"] for r in diff.added] == ["3"]
+    assert [r["rating_key"] for r in diff.updated] == ["1"]
+    assert [r["rating_key"] for r in diff.removed] == ["2"]
+
+    # Same state again - nothing to do
+    assert not write(index, db, [item("1", "Alien", year=1979), item("3", "Alien 3")])
+
+
+def test_item_level_write_only_touches_given_items(index, db):
+    write(index, db, [item("1", "Alien"), item("2", "Aliens")])
+
+    diff = write(index, db, [item("1", "Alien (Director's Cut)")], complete=False, missing=["2"])
+    assert [r["rating_key"] for r in diff.updated] == ["1"]
+    assert [r["rating_key"] for r in diff.removed] == ["2"]
+
+    # Items neither given nor missing are left alone
+    write(index, db, [item("3", "Prometheus")])
+    diff = write(index, db, [item("4", "Covenant")], complete=False)
+    assert [r["rating_key"] for r in diff.added] == ["4"]
+    assert not diff.removed
+
+
+def test_external_id_change_is_an_update(index, db):
+    write(index, db, [item("1", "Alien", guids=["imdb://tt0078748"])])
+
+    diff = write(index, db, [item("1", "Alien", guids=["imdb://tt0078748", "tmdb://348"])])
+    assert [r["rating_key"] for r in diff.updated] == ["1"]
+    stored = {(g.provider, g.external_id) for g in db.query(LibraryItemGuid)}
+    assert stored == {("imdb", "tt0078748"), ("tmdb", "348")}
+
+
+def test_search_matches_every_word_as_prefix(index, db):
+    write(index, db, [
+        item("1", "The Matrix", year=1999),
+        item("2", "The Matrix Reloaded", year=2003),
+        item("3", "Inception", year=2010),
+    ])
+
+    assert {r["rating_key"] for r in index.search(db, "matr")} == {"1", "2"}
+    assert [r["rating_key"] for r in index.search(db, "matrix 1999")] == ["1"]
+    assert [r["rating_key"] for r in index.search(db, "the matrix reload")] == ["2"]
+    assert index.search(db, "matrices") == []
+    assert index.search(db, "  ?! ") == []
+
+
+def test_search_ranks_title_above_file_path(index, db):
+    write(index, db, [
+        item("1", "Inception", file_path="/movies/matrix collection/inception.mkv"),
+        item("2", "The Matrix", file_path="/movies/the.matrix.mkv"),
+    ])
+
+    assert [r["rating_key"] for r in index.search(db, "matrix")] == ["2", "1"]
+
+
+def test_search_within_one_section(index, db):
+    write(index, db, [item("1", "Planet Earth", section_key="1")], section_key="1")
+    write(index, db, [item("2", "Planet Earth II", section_key="2")], section_key="2")
+
+    assert {r["rating_key"] for r in index.search(db, "planet")} == {"1", "2"}
+    assert [r["rating_key"] for r in index.search(db, "planet", section_key="2")] == ["2"]
+
+
+def test_search_follows_updates_and_removals(index, db):
+    write(index, db, [item("1", "Alien"), item("2", "Aliens")])
+    write(index, db, [item("1", "Nostromo")])
+
+    assert index.search(db, "alien") == []
+    assert [r["rating_key"] for r in index.search(db, "nostromo")] == ["1"]
+
+
+def test_changes_cursor_advances_page_by_page(index, db):
+    baseline = index.changes(db)
+    assert baseline == {"cursor": 0, "changes": [], "has_more": False, "reset": False}
+
+    write(index, db, [item("1", "Alien"), item("2", "Aliens"), item("3", "Alien 3")])
+    first = index.changes(db, since=baseline["cursor"], limit=2)
+    assert [c["rating_key"] for c in first["changes"]] == ["1", "2"]
+    assert first["has_more"] and first["cursor"] == first["changes"][-1]["cursor"]
+
+    second = index.changes(db, since=first["cursor"], limit=2)
+    assert [c["rating_key"] for c in second["changes"]] == ["3"]
+    assert not second["has_more"] and not second["reset"]
+
+    # Caught up - nothing new, same cursor
+    assert index.changes(db, since=second["cursor"])["changes"] == []
+
+    write(index, db, [item("1", "Alien", year=1979), item("3", "Alien 3")])
+    third = index.changes(db, since=second["cursor"])
+    assert [(c["change"], c["rating_key"]) for c in third["changes"]] == [("updated", "1"), ("removed", "2")]
+    assert third["changes"][0]["item"]["year"] == 1979
+    assert third["changes"][1]["item"] is None
+
+
+def test_changes_filtered_by_section(index, db):
+    write(index, db, [item("1", "Planet Earth", section_key="1")], section_key="1")
+    write(index, db, [item("2", "Blue Planet", section_key="2")], section_key="2")
+
+    feed = index.changes(db, since=0, section_key="2")
+    assert [c["rating_key"] for c in feed["changes"]] == ["2"]
+
+
+def test_changes_reset_when_cursor_expired(index, db):
+    write(index, db, [item("1", "Alien"), item("2", "Aliens"), item("3", "Alien 3")])
+    write(index, db, [item("4", "Prometheus")], complete=False)
+
+    # Retention drops the first three entries
+    db.query(LibraryChange).filter(LibraryChange.id <= 3).delete()
+    db.commit()
+
+    expired = index.changes(db, since=1)
+    assert expired["reset"] and expired["changes"] == []
+    assert expired["cursor"] == 4  # Resume from here after a full reload
+
+    # A cursor right before the oldest retained entry is still valid
+    assert [c["rating_key"] for c in index.changes(db, since=3)["changes"]] == ["4"]
+
+    # A cursor ahead of the feed (e.g. from another database) is reset too
+    assert index.changes(db, since=100)["reset"]
+
+
+def test_changes_cursor_covers_writes_during_the_read(index, db):
+    write(index, db, [item("1", "Alien")])
+    since = index.changes(db)["cursor"]
+
+    # Another writer commits between the cursor query and the rows query
+    other = sessionmaker(bind=db.get_bind())()
+    queries = []
+
+    @event.listens_for(db, "do_orm_execute")
+    def concurrent_write(state):
+        queries.append(state.statement)
+        if len(queries) == 2:
+            write(index, other, [item("1", "Alien"), item("2", "Aliens")])
+
+    feed = index.changes(db, since=since)
+    event.remove(db, "do_orm_execute", concurrent_write)
+    other.close()
+
+    assert [c["rating_key"] for c in feed["changes"]] == ["2"]
+    assert feed["cursor"] == feed["changes"][-1]["cursor"]
+    assert index.changes(db, since=feed["cursor"])["changes"] == []
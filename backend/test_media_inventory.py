@@ -0,0 +1,159 @@
+"""
+Media inventory tests
+Part rewrites of changed items (added / changed / unchanged / removed) and
+the largest files query, run against a temporary SQLite database - no Plex
+server needed
+
+Run with: pytest test_media_inventory.py
+"""
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(".")
+
+# The inventory imports the DB session; SQLite is enough here
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.library import MediaPart
+from app.services.library.inventory import MediaInventory
+
+OLD = datetime(2024, 1, 1)
+NEW = datetime(2024, 6, 1)
+
+
+def part(rating_key: str, file: str, section_key: str = "1", updated_at: datetime = OLD, **fields) -> dict:
+    """A media_parts row as built by part_rows()"""
+    row = {
+        "rating_key": rating_key,
+        "section_key": section_key,
+        "item_type": "movie",
+        "title": f"Item {rating_key}",
+        "file": file,
+        "container": "mkv",
+        "video_codec": "h264",
+        "video_resolution": "1080",
+        "video_profile": None,
+        "audio_codec": "aac",
+        "audio_channels": 2,
+        "bitrate": 8000,
+        "width": 1920,
+        "height": 1080,
+        "duration": 7200000,
+        "size": 4_000_000_000,
+        "remux": False,
+        "plex_updated_at": updated_at,
+    }
+    row.update(fields)
+    return row
+
+
+def entry(rating_key: str, *files: str, updated_at: datetime = OLD, section_key: str = "1") -> tuple:
+    """(rating_key, updatedAt, part rows) as passed to _write"""
+    rows = [part(rating_key, file, section_key=section_key, updated_at=updated_at) for file in files]
+    return rating_key, updated_at, rows
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'inventory.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def inventory():
+    return MediaInventory()
+
+
+def write(inventory, db, items, section_key="1", complete=True, missing=()):
+    result = inventory._write(db, section_key, items, complete, missing)
+    db.commit()
+    return result
+
+
+def files(db) -> dict:
+    """rating_key -> sorted files currently stored"""
+    stored = {}
+    for rating_key, file in db.query(MediaPart.rating_key, MediaPart.file):
+        stored.setdefault(rating_key, []).append(file)
+    return {key: sorted(value) for key, value in stored.items()}
+
+
+def test_parts_added(inventory, db):
+    changed, removed = write(inventory, db, [entry("1", "/m/alien.mkv"), entry("2", "/m/aliens.mkv", "/m/aliens.4k.mkv")])
+    assert (changed, removed) == (2, 0)
+    assert files(db) == {"1": ["/m/alien.mkv"], "2": ["/m/aliens.4k.mkv", "/m/aliens.mkv"]}
+
+
+def test_unchanged_items_are_skipped(inventory, db):
+    write(inventory, db, [entry("1", "/m/alien.mkv"), entry("2", "/m/aliens.mkv")])
+    ids = {part.id for part in db.query(MediaPart)}
+
+    assert write(inventory, db, [entry("1", "/m/alien.mkv"), entry("2", "/m/aliens.mkv")]) == (0, 0)
+    assert {part.id for part in db.query(MediaPart)} == ids
+
+
+def test_items_without_parts_settle(inventory, db):
+    # e.g. a movie whose only file has been deleted, not yet removed from Plex
+    assert write(inventory, db, [entry("1", "/m/alien.mkv"), entry("2")]) == (1, 0)
+    assert write(inventory, db, [entry("1", "/m/alien.mkv"), entry("2")]) == (0, 0)
+
+    # Losing its last part is still a change
+    assert write(inventory, db, [entry("1", updated_at=NEW), entry("2")]) == (1, 0)
+    assert files(db) == {}
+    assert write(inventory, db, [entry("1", updated_at=NEW), entry("2")]) == (0, 0)
+
+
+def test_changed_item_parts_are_rewritten(inventory, db):
+    write(inventory, db, [entry("1", "/m/alien.mkv"), entry("2", "/m/aliens.mkv")])
+
+    # Upgraded to a remux with an extra version - Plex bumps updatedAt
+    changed, removed = write(inventory, db, [
+        entry("1", "/m/alien.remux.mkv", "/m/alien.mkv", updated_at=NEW),
+        entry("2", "/m/aliens.mkv"),
+    ])
+    assert (changed, removed) == (1, 0)
+    assert files(db) == {"1": ["/m/alien.mkv", "/m/alien.remux.mkv"], "2": ["/m/aliens.mkv"]}
+
+    # A version deleted
+    assert write(inventory, db, [entry("1", "/m/alien.remux.mkv", updated_at=datetime(2024, 7, 1)), entry("2", "/m/aliens.mkv")]) == (1, 0)
+    assert files(db)["1"] == ["/m/alien.remux.mkv"]
+
+
+def test_section_write_removes_items_not_given(inventory, db):
+    write(inventory, db, [entry("1", "/m/alien.mkv"), entry("2", "/m/aliens.mkv")])
+    write(inventory, db, [entry("9", "/tv/s01e01.mkv", section_key="2")], section_key="2")
+
+    assert write(inventory, db, [entry("1", "/m/alien.mkv")]) == (0, 1)
+    # Other sections are left alone
+    assert files(db) == {"1": ["/m/alien.mkv"], "9": ["/tv/s01e01.mkv"]}
+
+
+def test_item_level_write_removes_only_missing(inventory, db):
+    write(inventory, db, [entry("1", "/m/alien.mkv"), entry("2", "/m/aliens.mkv"), entry("3", "/m/alien3.mkv")])
+
+    changed, removed = write(inventory, db, [entry("1", "/m/alien.dc.mkv", updated_at=NEW)], complete=False, missing=["2", "404"])
+    assert (changed, removed) == (1, 1)
+    assert files(db) == {"1": ["/m/alien.dc.mkv"], "3": ["/m/alien3.mkv"]}
+
+
+def test_largest_files(inventory, db):
+    write(inventory, db, [
+        ("1", OLD, [part("1", "/m/alien.mkv", size=2_000)]),
+        ("2", OLD, [part("2", "/m/aliens.mkv", size=9_000), part("2", "/m/aliens.sample.mkv", size=None)]),
+    ])
+    write(inventory, db, [("9", OLD, [part("9", "/tv/big.mkv", section_key="2", size=50_000)])], section_key="2")
+
+    assert [p.file for p in inventory.largest(db, limit=2)] == ["/tv/big.mkv", "/m/aliens.mkv"]
+    assert [p.file for p in inventory.largest(db, section_key="1")] == ["/m/aliens.mkv", "/m/alien.mkv"]
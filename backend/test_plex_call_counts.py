@@ -0,0 +1,210 @@
+"""
+Upstream call-count tests for the Plex read path
+Runs against an in-process fake Plex server (httpx.MockTransport for the
+direct reader, a local HTTP server for plexapi), so no real Plex server is
+needed
+
+Run with: pytest test_plex_call_counts.py
+"""
+import asyncio
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+# Add parent directory to path
+sys.path.append(".")
+
+# Route modules import the DB session; an in-memory SQLite is enough here
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.services.http import set_http_client
+from app.services.plex.connection import plex_connection
+from app.services.plex.reader import PlexReader, plex_reader
+from app.api.routes import dashboard, library
+
+
+class FakePlex:
+    """Minimal fake Plex server that records every request it receives"""
+
+    def __init__(self, section_count: int = 12, items_per_section: int = 25):
+        self.section_count = section_count
+        self.items_per_section = items_per_section
+        self.requests = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request.url.path)
+        path = request.url.path
+
+        if path == "/":
+            return self._xml(
+                '<MediaContainer friendlyName="Fake Plex" machineIdentifier="fake" version="1.40.0" '
+                'platform="Linux" platformVersion="6.0" myPlexUsername="" size="0"/>'
+            )
+
+        if path == "/library":
+            return self._xml('<MediaContainer size="0" title1="Plex Library"/>')
+
+        if path == "/library/sections":
+            directories = "".join(
+                f'<Directory key="{i}" title="Library {i}" type="movie" uuid="uuid-{i}">'
+                f'<Location id="{i}" path="/media/{i}"/></Directory>'
+                for i in range(1, self.section_count + 1)
+            )
+            return self._xml(f'<MediaContainer size="{self.section_count}">{directories}</MediaContainer>')
+
+        if path.startswith("/library/sections/") and path.endswith("/all"):
+            start = int(request.url.params.get("X-Plex-Container-Start", 0))
+            size = int(request.url.params.get("X-Plex-Container-Size", self.items_per_section))
+            count = max(0, min(size, self.items_per_section - start))
+            return self._xml(
+                f'<MediaContainer size="{count}" totalSize="{self.items_per_section}" '
+                f'librarySectionTitle="Library">{self._videos(count, start)}</MediaContainer>'
+            )
+
+        if path == "/library/recentlyAdded":
+            size = int(request.url.params.get("X-Plex-Container-Size", 50))
+            return self._xml(f'<MediaContainer size="{size}">{self._videos(size)}</MediaContainer>')
+
+        return httpx.Response(404)
+
+    @staticmethod
+    def _videos(count: int, start: int = 0) -> str:
+        """
+        Partial item XML as Plex returns it in listings
+
+        Odd items lack year, rating and thumb - exactly the attributes that
+        make plexapi fall back to a per-item reload().
+        """
+        videos = []
+        for i in range(start, start + count):
+            extra = "" if i % 2 else f' year="{2000 + i}" rating="7.5" thumb="/library/metadata/{i}/thumb/1"'
+            videos.append(
+                f'<Video ratingKey="{i}" key="/library/metadata/{i}" type="movie" title="Movie {i}" '
+                f'librarySectionID="1" librarySectionTitle="Movies" addedAt="{1700000000 + i}"{extra}/>'
+            )
+        return "".join(videos)
+
+    @staticmethod
+    def _xml(body: str) -> httpx.Response:
+        return httpx.Response(200, content=body.encode(), headers={"Content-Type": "application/xml"})
+
+
+def _reset_reader():
+    """Drop the shared reader's cached sections and recently added lists"""
+    plex_reader.invalidate_sections()
+    plex_reader._recent_cache.clear()
+
+
+@pytest.fixture
+def fake_plex():
+    """Point the shared HTTP client and Plex config at a fake server"""
+    fake = FakePlex()
+    _reset_reader()
+    plex_connection.set_config("http://plex.test:32400", "test-token")
+    set_http_client(httpx.AsyncClient(transport=httpx.MockTransport(fake.handler)))
+    yield fake
+    set_http_client(None)
+    _reset_reader()
+
+
+@pytest.fixture
+def fake_plex_server():
+    """Serve the fake over real HTTP for plexapi (which uses requests)"""
+    fake = FakePlex()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            response = fake.handler(httpx.Request("GET", f"http://plex.test{self.path}"))
+            self.send_response(response.status_code)
+            self.send_header("Content-Type", response.headers.get("Content-Type", "application/xml"))
+            self.send_header("Content-Length", str(len(response.content)))
+            self.end_headers()
+            self.wfile.write(response.content)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    plex_connection.set_config(f"http://127.0.0.1:{server.server_port}", "test-token")
+    yield fake
+    server.shutdown()
+    server.server_close()
+    plex_connection.set_config(None, None)
+
+
+def test_section_counts_cost_one_request_per_section(fake_plex):
+    """Cold fetch: one section list plus one size-0 count per section"""
+    reader = PlexReader()
+    sections = asyncio.run(reader.sections())
+
+    assert len(sections) == 12
+    assert all(section.total_size == 25 for section in sections)
+    assert fake_plex.requests.count("/library/sections") == 1
+    assert len(fake_plex.requests) == 1 + 12
+
+
+def test_cached_sections_cost_no_requests(fake_plex):
+    """Warm polls (dashboard, library lists) reuse the cached counts"""
+    reader = PlexReader()
+
+    async def poll_twice():
+        await reader.sections()
+        before = len(fake_plex.requests)
+        await reader.sections()
+        await reader.section("3")
+        return before
+
+    before = asyncio.run(poll_twice())
+    assert len(fake_plex.requests) == before == 13
+
+
+def test_invalidate_sections_refetches(fake_plex):
+    """Invalidation forces a fresh section list and counts"""
+    reader = PlexReader()
+
+    async def fetch_invalidate_fetch():
+        await reader.sections()
+        reader.invalidate_sections()
+        await reader.sections()
+
+    asyncio.run(fetch_invalidate_fetch())
+    assert len(fake_plex.requests) == 2 * 13
+
+
+def test_recently_added_costs_exactly_one_request(fake_plex):
+    """10 partial items serialise without any per-item reload"""
+    result = asyncio.run(dashboard.get_recently_added())
+
+    assert len(result["items"]) == 10
+    assert all(item["library"] == "Movies" for item in result["items"])
+    assert result["items"][1]["year"] is None
+    assert fake_plex.requests == ["/library/recentlyAdded"]
+
+
+def test_library_content_page_costs_exactly_one_request(fake_plex):
+    """A content page fetches only that page, with no per-item reloads"""
+    result = asyncio.run(library.get_library_content("1", limit=10, offset=5))
+
+    assert len(result["items"]) == 10
+    assert result["total"] == 25
+    assert result["items"][0].title == "Movie 5"
+    assert fake_plex.requests == ["/library/sections/1/all"]
+
+
+def test_plexapi_connection_does_not_autoreload(fake_plex_server):
+    """Attributes missing from listing XML read as None instead of a reload"""
+    server = plex_connection.get_connection()
+    movies = server.library.sectionByID(1).all()
+    before = list(fake_plex_server.requests)
+
+    assert len(movies) == 25
+    assert movies[1].year is None and movies[1].rating is None
+    assert movies[0].year == 2000
+    assert fake_plex_server.requests == before
+    assert not any(path.startswith("/library/metadata/") for path in fake_plex_server.requests)
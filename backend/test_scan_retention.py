@@ -0,0 +1,87 @@
+"""
+Scan history retention tests
+Rollup and batched purge of old scan_history rows, run against a
+temporary SQLite database
+
+Run with: pytest test_scan_retention.py
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(".")
+
+# The retention service imports the DB session; SQLite is enough here
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.plex import ScanHistory, ScanHistoryDaily
+from app.services.scans.retention import ScanRetention
+
+DAY = datetime(2024, 1, 1)
+CUTOFF = datetime(2024, 2, 1)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'retention.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def scan(started_at: datetime, status: str = "completed", duration: float = 10.0, library_key: str = "1") -> ScanHistory:
+    return ScanHistory(
+        library_key=library_key, library_name="Movies", library_type="movie",
+        status=status, started_at=started_at, duration_seconds=duration,
+    )
+
+
+def purge_all(retention: ScanRetention, db) -> list:
+    """Run write jobs until nothing is left, one commit each"""
+    results = []
+    while True:
+        result = retention._roll_up_next_day(db, CUTOFF, purge=True)
+        db.commit()
+        if result is None:
+            return results
+        results.append(result)
+
+
+def test_busy_day_is_purged_in_batches(db):
+    db.add_all([scan(DAY + timedelta(minutes=i), duration=float(i)) for i in range(12)])
+    db.add(scan(DAY + timedelta(hours=20), status="failed", duration=None))
+    db.add(scan(DAY + timedelta(days=1)))
+    db.add(scan(CUTOFF + timedelta(hours=1)))  # Inside retention
+    db.commit()
+
+    retention = ScanRetention()
+    retention.PURGE_BATCH = 5
+    results = purge_all(retention, db)
+
+    assert [rows for _, rows in results] == [5, 5, 3, 1]
+    assert [day for day, _ in results] == [DAY.date()] * 3 + [(DAY + timedelta(days=1)).date()]
+    assert db.query(ScanHistory).count() == 1
+
+    first = db.query(ScanHistoryDaily).filter(ScanHistoryDaily.day == DAY.date()).one()
+    assert (first.scans, first.completed, first.failures) == (13, 12, 1)
+    assert first.total_duration_seconds == sum(range(12))
+    assert first.max_duration_seconds == 11.0
+
+
+def test_small_day_keeps_exact_percentiles(db):
+    db.add_all([scan(DAY + timedelta(minutes=i), duration=float(i)) for i in range(5)])
+    db.commit()
+
+    purge_all(ScanRetention(), db)
+    rollup = db.query(ScanHistoryDaily).one()
+    assert rollup.p50_duration_seconds == 2.0
+    assert rollup.p95_duration_seconds == pytest.approx(3.8)
@@ -0,0 +1,111 @@
+"""
+Startup-time budget tests
+Fail when importing the app or getting the first healthy response from a
+freshly started server takes longer than its budget, or when a heavy
+dependency creeps back into the import of app.main. Use
+profile_imports.py to see where the time went.
+
+Budgets (seconds) can be adjusted for slow machines:
+    STARTUP_IMPORT_BUDGET   import app.main            (default 1.5)
+    STARTUP_HEALTHY_BUDGET  process start -> /api/health 200 (default 5.0)
+
+Run with: pytest test_startup_budget.py
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT_BUDGET = float(os.environ.get("STARTUP_IMPORT_BUDGET", "1.5"))
+HEALTHY_BUDGET = float(os.environ.get("STARTUP_HEALTHY_BUDGET", "5.0"))
+
+# Loaded lazily - must not be imported by app.main itself
+HEAVY_MODULES = ("plexapi", "numpy", "httpx", "sqlalchemy", "app.services.integrations")
+
+IMPORT_PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import app.main
+print(json.dumps({{
+    "seconds": time.perf_counter() - started,
+    "heavy": [name for name in {HEAVY_MODULES!r} if name in sys.modules],
+}}))
+"""
+
+
+def _env(tmp_path) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = BACKEND_DIR
+    env["DATABASE_URL"] = f"sqlite:///{tmp_path / 'startup.db'}"
+    return env
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def import_probe(tmp_path_factory):
+    """Best of three cold imports of app.main, each in a fresh interpreter"""
+    tmp_path = tmp_path_factory.mktemp("import")
+    runs = []
+    for _ in range(3):
+        result = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE],
+            cwd=tmp_path, env=_env(tmp_path), capture_output=True, text=True, check=True,
+        )
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return min(runs, key=lambda run: run["seconds"])
+
+
+def test_import_time_within_budget(import_probe):
+    assert import_probe["seconds"] <= IMPORT_BUDGET, (
+        f"import app.main took {import_probe['seconds']:.2f}s (budget {IMPORT_BUDGET}s)"
+    )
+
+
+def test_heavy_modules_not_imported(import_probe):
+    assert import_probe["heavy"] == []
+
+
+def test_time_to_first_healthy_response(tmp_path):
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=tmp_path, env=_env(tmp_path), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        healthy_after = None
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+            while time.perf_counter() - started < HEALTHY_BUDGET + 10:
+                assert server.poll() is None, "server exited during startup"
+                try:
+                    if client.get("/api/health").status_code == 200:
+                        healthy_after = time.perf_counter() - started
+                        break
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.02)
+
+            assert healthy_after is not None, "server never became healthy"
+            assert healthy_after <= HEALTHY_BUDGET, (
+                f"first healthy response after {healthy_after:.2f}s (budget {HEALTHY_BUDGET}s)"
+            )
+
+            # Lazily loaded routers are registered (requests wait for them)
+            paths = client.get("/api/openapi.json", timeout=30.0).json()["paths"]
+            assert any(path.startswith("/api/plex/") for path in paths)
+            assert any(path.startswith("/api/scan/") for path in paths)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
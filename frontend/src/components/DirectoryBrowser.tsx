@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import {
   Dialog,
   DialogTitle,
@@ -22,6 +22,7 @@ import {
   Snackbar,
   Collapse,
   LinearProgress,
+  TextField,
 } from '@mui/material';
 import {
   Folder as FolderIcon,
@@ -35,6 +36,10 @@ import {
 import { apiClient } from '../services/api';
 import { DirectoryListing, Directory } from '../types';
 
+const PAGE_SIZE = 200;
+// Wait for typing to pause before searching (ms)
+const FILTER_DEBOUNCE_MS = 250;
+
 interface DirectoryBrowserProps {
   open: boolean;
   onClose: () => void;
@@ -61,13 +66,32 @@ const DirectoryBrowser: React.FC<DirectoryBrowserProps> = ({
   const [showActivities, setShowActivities] = useState(false);
   const [activities, setActivities] = useState<any[]>([]);
   const [activityInterval, setActivityInterval] = useState<NodeJS.Timeout | null>(null);
+  const [filter, setFilter] = useState<string>('');
+  // Filter as last searched for (debounced), and the latest listing request
+  const [query, setQuery] = useState<string>('');
+  const requestSeq = useRef(0);
+  // Client-side listing cache (path + filter) and path -> ratingKey lookup
+  const listingCache = useRef<Map<string, DirectoryListing>>(new Map());
+  const ratingKeys = useRef<Map<string, string>>(new Map());
+
+  // Drop cached listings when switching libraries
+  useEffect(() => {
+    listingCache.current.clear();
+    ratingKeys.current.clear();
+  }, [libraryKey]);
 
-  // Load directories when dialog opens or path changes
+  // Load directories when dialog opens, path or filter changes
   useEffect(() => {
     if (open) {
       loadDirectories(currentPath);
     }
-  }, [open, currentPath, libraryKey]);
+  }, [open, currentPath, libraryKey, query]);
+
+  // Search once typing pauses, not on every keystroke
+  useEffect(() => {
+    const timer = setTimeout(() => setQuery(filter), FILTER_DEBOUNCE_MS);
+    return () => clearTimeout(timer);
+  }, [filter]);
 
   // Cleanup activity polling on unmount
   useEffect(() => {
@@ -78,16 +102,51 @@ const DirectoryBrowser: React.FC<DirectoryBrowserProps> = ({
     };
   }, [activityInterval]);
 
-  const loadDirectories = async (path: string) => {
+  const loadDirectories = async (
+    path: string,
+    { refresh = false, append = false }: { refresh?: boolean; append?: boolean } = {}
+  ) => {
+    const seq = ++requestSeq.current;
+    const cacheKey = `${path}|${query}`;
+    const cached = listingCache.current.get(cacheKey);
+    if (cached && !refresh && !append) {
+      setCurrentListing(cached);
+      setLoading(false);
+      return;
+    }
+
     setLoading(true);
     setError(null);
     try {
-      const listing = await apiClient.getLibraryDirectories(libraryKey, path);
+      const offset = append && cached ? cached.directories.length : 0;
+      const page = await apiClient.getLibraryDirectories(libraryKey, path, {
+        ratingKey: ratingKeys.current.get(path),
+        q: query,
+        offset,
+        limit: PAGE_SIZE,
+        refresh,
+      });
+      const listing = append && cached
+        ? { ...page, directories: [...cached.directories, ...page.directories] }
+        : page;
+      listing.directories.forEach((dir) => {
+        if (dir.rating_key) {
+          ratingKeys.current.set(dir.path, dir.rating_key);
+        }
+      });
+      listingCache.current.set(cacheKey, listing);
+      if (seq !== requestSeq.current) {
+        return; // A newer request (path or filter) has been made since
+      }
       setCurrentListing(listing);
     } catch (err: any) {
-      setError(err.response?.data?.detail || err.message || 'Failed to load directories');
+      if (seq === requestSeq.current) {
+        setError(err.response?.data?.detail || err.message || 'Failed to load directories');
+      }
     } finally {
-      setLoading(false);
+      if (seq === requestSeq.current) {
+        setLoading(false);
+      }
     }
   };
 
@@ -116,16 +175,23 @@ const DirectoryBrowser: React.FC<DirectoryBrowserProps> = ({
   };
 
   const handleRefresh = () => {
-    loadDirectories(currentPath);
+    listingCache.current.clear();
+    loadDirectories(currentPath, { refresh: true });
+  };
+
+  const handleLoadMore = () => {
+    loadDirectories(currentPath, { append: true });
   };
 
   const handleNavigate = (path: string) => {
+    setFilter('');
+    setQuery('');
     setCurrentPath(path);
   };
 
   const handleNavigateUp = () => {
     if (currentListing && currentListing.parent_path !== null) {
-      setCurrentPath(currentListing.parent_path || '/');
+      handleNavigate(currentListing.parent_path || '/');
     }
   };
 
@@ -289,6 +355,16 @@ const DirectoryBrowser: React.FC<DirectoryBrowserProps> = ({
             </Alert>
           )}
 
+          {/* Title prefix search */}
+          <TextField
+            fullWidth
+            size="small"
+            placeholder="Filter by title prefix..."
+            value={filter}
+            onChange={(e) => setFilter(e.target.value)}
+            sx={{ mb: 2 }}
+          />
+
           {/* Loading state */}
           {loading && (
             <Box display="flex" justifyContent="center" alignItems="center" minHeight="200px">
@@ -301,7 +377,7 @@ const DirectoryBrowser: React.FC<DirectoryBrowserProps> = ({
             <Box>
               <Box display="flex" justifyContent="space-between" alignItems="center" mb={1}>
                 <Typography variant="body2" color="text.secondary">
-                  {currentListing.directories.length} {currentListing.directories.length === 1 ? 'folder' : 'folders'}
+                  {currentListing.total ?? currentListing.directories.length} {(currentListing.total ?? currentListing.directories.length) === 1 ? 'folder' : 'folders'}
                 </Typography>
                 <Button
                   variant="contained"
@@ -350,6 +426,17 @@ const DirectoryBrowser: React.FC<DirectoryBrowserProps> = ({
                     </ListItemButton>
                   </ListItem>
                 ))}
+
+                {currentListing.has_more && (
+                  <ListItem disablePadding>
+                    <ListItemButton onClick={handleLoadMore}>
+                      <ListItemText
+                        primary="Load more..."
+                        secondary={`Showing ${currentListing.directories.length} of ${currentListing.total}`}
+                      />
+                    </ListItemButton>
+                  </ListItem>
+                )}
               </List>
             </Box>
           )}
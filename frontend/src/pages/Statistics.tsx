@@ -37,7 +37,7 @@ import {
   AccessTime as TimeIcon,
   Info as InfoIcon
 } from '@mui/icons-material';
-import axios from 'axios';
+import { apiClient } from '../services/api';
 
 interface StatCardProps {
   title: string;
@@ -111,9 +111,8 @@ const Statistics: React.FC = () => {
       }
       setError(null);
 
-      const response = await axios.get('/api/statistics/overview');
-      console.log('Statistics response:', response.data);
-      setStatistics(response.data);
+      const data = await apiClient.getStatisticsOverview();
+      setStatistics(data);
     } catch (err: any) {
       setError(err.response?.data?.detail || 'Failed to load statistics');
       console.error('Failed to fetch statistics:', err);
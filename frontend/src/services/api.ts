@@ -1,7 +1,7 @@
 /**
  * API client for Plex Toolbox backend
  */
-import axios, { AxiosInstance } from 'axios';
+import axios, { AxiosInstance, InternalAxiosRequestConfig } from 'axios';
 import {
   PlexServerConfig,
   PlexLibrary,
@@ -12,10 +12,13 @@ import {
   RecentItemsResponse,
   ServerStatus,
   DirectoryListing,
+  LibrarySearchResponse,
 } from '../types';
 
 class ApiClient {
   private client: AxiosInstance;
+  // Last ETag and body per GET url, used for conditional requests
+  private etagCache = new Map<string, { etag: string; data: any }>();
 
   constructor() {
     this.client = axios.create({
@@ -24,9 +27,43 @@ class ApiClient {
       headers: {
         'Content-Type': 'application/json',
       },
+      validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+    });
+
+    // Send If-None-Match for GETs we have a cached ETag for
+    this.client.interceptors.request.use((config) => {
+      if ((config.method || 'get').toLowerCase() === 'get') {
+        const cached = this.etagCache.get(this.etagKey(config));
+        if (cached) {
+          config.headers.set('If-None-Match', cached.etag);
+        }
+      }
+      return config;
+    });
+
+    // On 304 replay the cached body; otherwise remember the new ETag
+    this.client.interceptors.response.use((response) => {
+      const key = this.etagKey(response.config);
+      if (response.status === 304) {
+        const cached = this.etagCache.get(key);
+        if (cached) {
+          response.data = cached.data;
+          response.status = 200;
+        }
+      } else if ((response.config.method || 'get').toLowerCase() === 'get') {
+        const etag = response.headers['etag'];
+        if (etag) {
+          this.etagCache.set(key, { etag, data: response.data });
+        }
+      }
+      return response;
     });
   }
 
+  private etagKey(config: InternalAxiosRequestConfig): string {
+    return `${config.url}|${JSON.stringify(config.params || {})}`;
+  }
+
   // Health check
   async healthCheck() {
     const response = await this.client.get('/health');
@@ -86,19 +123,60 @@ class ApiClient {
     return response.data;
   }
 
+  async getLibraryRecentlyAdded(
+    libraryKey: string,
+    limit: number = 10
+  ): Promise<{ library_key: string; items: PlexMediaItem[]; count: number }> {
+    const response = await this.client.get(`/library/libraries/${libraryKey}/recently-added`, {
+      params: { limit },
+    });
+    return response.data;
+  }
+
   async scanLibrary(libraryKey: string): Promise<{ status: string; message: string }> {
     const response = await this.client.post(`/plex/libraries/${libraryKey}/scan`);
     return response.data;
   }
 
+  // Library search and change feed
+  async searchLibraries(
+    q: string,
+    options: { libraryKey?: string; limit?: number } = {}
+  ): Promise<LibrarySearchResponse> {
+    const response = await this.client.get<LibrarySearchResponse>('/library/search', {
+      params: { q, library_key: options.libraryKey, limit: options.limit },
+    });
+    return response.data;
+  }
+
+  async getLibraryChanges(
+    since?: number,
+    options: { libraryKey?: string; limit?: number } = {}
+  ): Promise<any> {
+    const response = await this.client.get('/library/changes', {
+      params: { since, library_key: options.libraryKey, limit: options.limit },
+    });
+    return response.data;
+  }
+
   // Directory browsing
   async getLibraryDirectories(
     libraryKey: string,
-    path: string = '/'
+    path: string = '/',
+    options: { ratingKey?: string; q?: string; offset?: number; limit?: number; refresh?: boolean } = {}
   ): Promise<DirectoryListing> {
     const response = await this.client.get<DirectoryListing>(
       `/library/libraries/${libraryKey}/directories`,
-      { params: { path } }
+      {
+        params: {
+          path,
+          rating_key: options.ratingKey,
+          q: options.q || undefined,
+          offset: options.offset,
+          limit: options.limit,
+          refresh: options.refresh || undefined,
+        },
+      }
     );
     return response.data;
   }
@@ -127,12 +205,15 @@ class ApiClient {
   }
 
   // Scan history
-  async getScanHistory(libraryKey?: string, limit: number = 50): Promise<ScanHistoryResponse> {
+  async getScanHistory(libraryKey?: string, limit: number = 50, cursor?: string): Promise<ScanHistoryResponse> {
     const params = new URLSearchParams();
     params.append('limit', limit.toString());
     if (libraryKey) {
       params.append('library_key', libraryKey);
     }
+    if (cursor) {
+      params.append('cursor', cursor);
+    }
     
     const response = await this.client.get<ScanHistoryResponse>(
       `/scan/scan-history?${params.toString()}`
@@ -172,6 +253,12 @@ class ApiClient {
     return response.data;
   }
 
+  // Statistics
+  async getStatisticsOverview(): Promise<any> {
+    const response = await this.client.get('/statistics/overview');
+    return response.data;
+  }
+
   // Plex activities
   async getPlexActivities(): Promise<{ activities: any[] }> {
     const response = await this.client.get('/scan/plex-activities');
@@ -277,6 +364,17 @@ class ApiClient {
     return response.data;
   }
 
+  // Cross-reference (Plex vs Radarr / Sonarr)
+  async getCrossref(
+    service: 'radarr' | 'sonarr',
+    options: { monitoredOnly?: boolean; refresh?: boolean } = {}
+  ): Promise<any> {
+    const response = await this.client.get(`/crossref/${service}`, {
+      params: { monitored_only: options.monitoredOnly, refresh: options.refresh },
+    });
+    return response.data;
+  }
+
   // Prowlarr
   async getProwlarrIndexers(): Promise<any[]> {
     const response = await this.client.get('/prowlarr/indexers');
@@ -83,6 +83,7 @@ export interface ScanHistory {
 export interface ScanHistoryResponse {
   scans: ScanHistory[];
   total: number;
+  next_cursor: string | null;
 }
 
 export interface Directory {
@@ -90,6 +91,7 @@ export interface Directory {
   path: string;
   full_path: string;
   is_directory: boolean;
+  rating_key?: string;
 }
 
 export interface DirectoryListing {
@@ -98,6 +100,29 @@ export interface DirectoryListing {
   current_path: string;
   parent_path: string | null;
   directories: Directory[];
+  total?: number;
+  offset?: number;
+  limit?: number;
+  has_more?: boolean;
+  etag?: string | null;
+}
+
+export interface LibrarySearchResult {
+  rating_key: string;
+  section_key: string;
+  type: string;
+  title: string;
+  original_title: string | null;
+  year: number | null;
+  file_path: string | null;
+  rank: number;
+}
+
+export interface LibrarySearchResponse {
+  query: string;
+  results: LibrarySearchResult[];
+  count: number;
+  took_ms: number;
 }
 
 export interface ApiResponse<T> {